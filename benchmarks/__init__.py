@@ -0,0 +1,3 @@
+"""
+ベンチマーク（python -m benchmarks.run）
+"""
@@ -0,0 +1,239 @@
+"""
+ベンチマーク実行
+
+合成データ（benchmarks/synthetic.py）で監査・CSV解析・レポート生成・エクスポートの
+処理時間とピークメモリを計測し、JSONに保存する。基準（baseline）があれば比較し、
+しきい値より遅くなった項目を回帰として報告する（終了コード 1）。
+
+    python -m benchmarks.run                        # 1k / 100k で計測し、基準と比較
+    python -m benchmarks.run --sizes 1k,100k,1m     # 100万件も計測
+    python -m benchmarks.run --only inspect         # 名前が inspect で始まる項目だけ
+    python -m benchmarks.run --save-baseline        # 今回の結果を基準として保存
+
+結果は benchmarks/results/（git管理外）に保存する。処理時間は --repeat 回の最小値、
+ピークメモリは tracemalloc で別に1回計測した値（計測中に確保された分のみ）。
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from core.bank_parser import BankCSVParser  # noqa: E402
+from core.export import audit_result_to_csv, audit_result_to_json, issue_to_dict  # noqa: E402
+from core.tax_inspector import TaxInspector  # noqa: E402
+from benchmarks.synthetic import ACCOUNT_MAP, TAX_MAP, generate_bank_csv, generate_deals  # noqa: E402
+
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+BASELINE_FILE = RESULTS_DIR / "baseline.json"
+
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+DEFAULT_SIZES = "1k,100k"
+# 基準よりこの倍率以上遅ければ回帰とみなす
+DEFAULT_THRESHOLD = 1.2
+# 取引データを使う項目（deal_benchmarks の名前）
+DEAL_BENCHMARKS = ("inspect_scan", "inspect_columnar", "inspect_parallel", "inspect_consumption_tax",
+                   "report", "export_csv", "export_json")
+# inspect_parallel（列指向・チェックの並列集計）のスレッド数
+PARALLEL_WORKERS = max(2, os.cpu_count() or 1)
+# 差がこれ未満（秒）なら倍率に関係なく回帰としない（数ミリ秒の項目の揺らぎ対策）
+MIN_REGRESSION_SECONDS = 0.005
+# inspect_consumption_tax（消費税のチェックだけ）で実行するチェック
+CONSUMPTION_TAX_CHECKS = ("15", "16", "17")
+
+
+def measure(fn: Callable[[], Any], repeat: int, memory: bool) -> Dict[str, Any]:
+    """fn の処理時間（repeat 回の最小値）とピークメモリ"""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    result = {'seconds': min(times)}
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn()
+            result['peak_mib'] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def benchmarks_for(size: int, only: Optional[str] = None) -> List[Tuple[str, Callable[[], Any]]]:
+    """
+    size 件のデータで計測する項目 [(名前, 関数), ...]
+
+    only を指定すると、名前がその文字列で始まる項目のデータだけを生成する。
+    """
+    items = []
+    if not only or any(name.startswith(only) for name in DEAL_BENCHMARKS):
+        items += deal_benchmarks(size)
+    # bank_parse の目安（1CPU、10万行、不正な行 2%・カンマ区切りの金額 約1割を含む合成CSV）:
+    # 列単位の一括変換で 0.29〜0.41秒（3回の最小値）。1行ずつ解釈していた旧実装は同じCSVで
+    # 9.9〜12.4秒（1回）で、銀行により 27〜43倍。結果（取引・エラー行）は旧実装と一致する
+    for bank_type in BankCSVParser.BANK_CONFIGS:
+        name = f"bank_parse[{bank_type}]"
+        if only and not name.startswith(only):
+            continue
+        content = generate_bank_csv(bank_type, size)
+        items.append((name, lambda bank_type=bank_type, content=content: BankCSVParser(bank_type).parse(content)))
+    return [(name, fn) for name, fn in items if not only or name.startswith(only)]
+
+
+def deal_benchmarks(size: int) -> List[Tuple[str, Callable[[], Any]]]:
+    """取引データ（明細 size 件）を使う項目"""
+    deals = list(generate_deals(size))
+    account_index = TaxInspector.build_account_index(ACCOUNT_MAP)
+
+    def inspect(columnar=False, parallel=0, checks=None):
+        inspector = TaxInspector(ACCOUNT_MAP, TAX_MAP, account_index=account_index)
+        return inspector, inspector.inspect_all(deals, fiscal_year_start="2024-04-01",
+                                                period_boundary="2025-04-01", columnar=columnar,
+                                                parallel=parallel, checks=checks)
+
+    # レポート生成・エクスポートは監査済みの結果で計測する
+    inspector, result = inspect()
+    result_data = {
+        'deal_count': result.details['total_deals'],
+        'errors': result.errors,
+        'warnings': result.warnings,
+        'issues': [issue_to_dict(issue) for issue in result.issues],
+        'report': result.report,
+        'details': result.details,
+    }
+
+    return [
+        ("inspect_scan", lambda: inspect()),
+        ("inspect_columnar", lambda: inspect(columnar=True)),
+        ("inspect_parallel", lambda: inspect(columnar=True, parallel=PARALLEL_WORKERS)),
+        ("inspect_consumption_tax", lambda: inspect(checks=CONSUMPTION_TAX_CHECKS)),
+        ("report", inspector._generate_report),
+        ("export_csv", lambda: audit_result_to_csv(result_data)),
+        ("export_json", lambda: audit_result_to_json(result_data)),
+    ]
+
+
+def run(sizes: List[str], only: Optional[str], repeat: int, memory: bool) -> Dict[str, Any]:
+    """ベンチマークを実行して結果（JSONに保存する形）を返す"""
+    results = {}
+    for label in sizes:
+        size = SIZES[label]
+        for name, fn in benchmarks_for(size, only):
+            key = f"{name}/{label}"
+            results[key] = dict(measure(fn, repeat, memory), size=size)
+            print(f"  {key:<40} {format_result(results[key])}", flush=True)
+    return {'meta': metadata(repeat), 'results': results}
+
+
+def metadata(repeat: int) -> Dict[str, Any]:
+    """実行環境（比較時に環境の違いに気づけるように）"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec="seconds"),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+    }
+
+
+def format_result(result: Dict[str, Any]) -> str:
+    text = f"{result['seconds'] * 1000:10.1f} ms"
+    if 'peak_mib' in result:
+        text += f"  {result['peak_mib']:9.1f} MiB"
+    return text
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    基準との比較を表示し、回帰した項目名を返す
+
+    時間・ピークメモリのどちらかが基準の threshold 倍以上なら回帰とする
+    （時間の差が MIN_REGRESSION_SECONDS 未満なら時間は回帰としない）。
+    """
+    regressions = []
+    print(f"\n基準: {baseline['meta'].get('commit')} ({baseline['meta'].get('timestamp')})")
+    print(f"  {'項目':<38} {'時間':>9} {'メモリ':>9}")
+    for key, now in current['results'].items():
+        base = baseline['results'].get(key)
+        if base is None:
+            print(f"  {key:<40} （基準なし）")
+            continue
+        time_ratio = now['seconds'] / base['seconds'] if base['seconds'] else 1.0
+        mem_ratio = None
+        if 'peak_mib' in now and base.get('peak_mib'):
+            mem_ratio = now['peak_mib'] / base['peak_mib']
+        slower = (time_ratio >= threshold
+                  and now['seconds'] - base['seconds'] >= MIN_REGRESSION_SECONDS)
+        regressed = slower or (mem_ratio is not None and mem_ratio >= threshold)
+        if regressed:
+            regressions.append(key)
+        mem_text = f"{mem_ratio:8.2f}x" if mem_ratio is not None else f"{'-':>9}"
+        print(f"  {key:<40} {time_ratio:8.2f}x {mem_text}{'  ← 回帰' if regressed else ''}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="監査・CSV解析のベンチマーク")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help=f"データ件数（{', '.join(SIZES)} をカンマ区切り。既定: {DEFAULT_SIZES}）")
+    parser.add_argument("--only", help="名前がこの文字列で始まる項目だけ計測（例: inspect, bank_parse）")
+    parser.add_argument("--repeat", type=int, default=3, help="計測回数（最小値を採用）")
+    parser.add_argument("--no-memory", action="store_true", help="ピークメモリを計測しない")
+    parser.add_argument("--output", type=Path, help="結果の保存先（既定: benchmarks/results/<日時>.json）")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE, help="比較する基準の結果")
+    parser.add_argument("--save-baseline", action="store_true", help="今回の結果を基準として保存")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"回帰とみなす倍率（既定: {DEFAULT_THRESHOLD}）")
+    args = parser.parse_args(argv)
+
+    sizes = [s.strip().lower() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        parser.error(f"不明な件数: {', '.join(unknown)}")
+
+    current = run(sizes, args.only, args.repeat, not args.no_memory)
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    output = args.output or RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.write_text(json.dumps(current, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\n結果を保存しました: {output}")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(current, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"基準を保存しました: {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print("基準がありません（--save-baseline で保存できます）")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions = compare(current, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)}項目が基準より {args.threshold}倍以上悪化しました")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
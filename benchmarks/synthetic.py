@@ -0,0 +1,200 @@
+"""
+ベンチマーク用の合成データ
+
+freeeの取引（deal → details）と、BANK_CONFIGS の各形式の銀行CSVを乱数で生成する。
+科目・摘要・金額の分布は実際の中小企業の帳簿に寄せ、各チェックが一通り反応するようにしている。
+同じ seed なら同じデータになる。
+
+    deals = generate_deals(100_000, seed=0)          # 明細10万件分の取引（イテレータ）
+    content = generate_bank_csv("楽天銀行", 100_000)  # 10万行のCSV（bytes）
+"""
+import random
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Tuple
+
+from core.bank_parser import BankCSVParser
+
+# 勘定科目ID → 名称
+ACCOUNT_MAP: Dict[int, str] = {
+    101: "売上高",
+    102: "雑収入",
+    111: "現金",
+    121: "給料手当",
+    122: "役員報酬",
+    123: "役員賞与",
+    124: "賞与",
+    131: "外注費",
+    132: "支払報酬",
+    133: "顧問料",
+    141: "役員貸付金",
+    151: "福利厚生費",
+    152: "保険料",
+    153: "車両費",
+    161: "接待交際費",
+    162: "会議費",
+    171: "仕入高",
+    172: "棚卸資産",
+    181: "消耗品費",
+    182: "旅費交通費",
+    183: "通信費",
+    184: "地代家賃",
+    185: "水道光熱費",
+    186: "新聞図書費",
+    187: "支払手数料",
+}
+
+# 税区分コード → 名称（TaxInspector.TAX_CODES と同じ体系: 21/23 は売上、136/138 は仕入）
+TAX_MAP: Dict[int, str] = {
+    0: "対象外",
+    2: "不課税",
+    3: "非課税",
+    15: "非課税仕入",
+    21: "課税売上10%",
+    23: "課税売上8%(軽減)",
+    136: "課税仕入10%",
+    138: "課税仕入8%(軽減)",
+}
+
+# 経費の明細のうち、税区分を誤って登録する割合の既定値（generate_deals の tax_error_rate）
+TAX_ERROR_RATE = 0.01
+# 誤った税区分の候補（経費に課税売上10%・飲食料品以外の仕入に軽減税率）
+WRONG_EXPENSE_TAX_CODES = (21, 21, 21, 138)
+
+# (勘定科目ID, 重み, 税区分の候補, 金額の範囲)
+INCOME_ACCOUNTS: List[Tuple[int, int, Tuple[int, ...], Tuple[int, int]]] = [
+    (101, 90, (21,), (10_000, 3_000_000)),
+    (102, 10, (0, 21), (1_000, 200_000)),
+]
+EXPENSE_ACCOUNTS: List[Tuple[int, int, Tuple[int, ...], Tuple[int, int]]] = [
+    (181, 18, (136,), (500, 80_000)),
+    (182, 12, (136,), (300, 150_000)),
+    (183, 6, (136,), (3_000, 30_000)),
+    (184, 3, (136, 15), (80_000, 400_000)),
+    (185, 3, (136,), (5_000, 60_000)),
+    (186, 2, (136,), (500, 10_000)),
+    (187, 6, (136, 0), (110, 880)),
+    (162, 5, (136,), (1_000, 40_000)),
+    (161, 5, (136,), (3_000, 120_000)),
+    (171, 10, (136, 138), (10_000, 1_500_000)),
+    (172, 1, (0,), (100_000, 2_000_000)),
+    (121, 6, (2,), (180_000, 450_000)),
+    (124, 1, (2,), (200_000, 900_000)),
+    (122, 3, (2,), (300_000, 300_000)),
+    (123, 1, (2,), (500_000, 1_000_000)),
+    (131, 6, (136,), (50_000, 600_000)),
+    (132, 2, (136,), (30_000, 300_000)),
+    (133, 2, (136,), (30_000, 100_000)),
+    (141, 1, (0,), (100_000, 1_000_000)),
+    (151, 3, (136, 15), (2_000, 100_000)),
+    (152, 2, (15,), (10_000, 200_000)),
+    (153, 2, (136,), (5_000, 120_000)),
+    (111, 2, (0,), (1_000, 50_000)),
+]
+
+EXPENSE_DESCRIPTIONS = [
+    "", "", "", "Amazon 購入", "文房具", "タクシー代", "新幹線 東京-大阪", "会議 お茶代",
+    "取引先 会食", "ゴルフ接待", "家族旅行", "私用 立替", "自宅 光熱費", "外注 A社 月額",
+    "外注 B社 デザイン", "XYZ コンサル", "顧問料 10月分", "田中 報酬", "妻 給与", "父への支払",
+    "関連会社 手数料", "同族会社 仕入", "社宅 家賃", "保険 契約", "ガソリン代", "食品 仕入",
+]
+INCOME_DESCRIPTIONS = ["", "売上 ABC商事", "売上 DEF株式会社", "業務委託料", "関連会社 売上", "現金売上"]
+
+BANK_DESCRIPTIONS = [
+    "振込 カ)ヤマダショウジ", "振込 ABCシヨウジ(カ", "カード 楽天市場", "ATM", "給与振込",
+    "振込手数料", "口座振替 電気料金", "口座振替 家賃", "ﾃｽﾄｼｮｳｼﾞ ｶ)", "デビット AMAZON",
+]
+
+
+def generate_deals(n_details: int, seed: int = 0, start: date = date(2024, 4, 1),
+                   days: int = 365, tax_error_rate: float = TAX_ERROR_RATE) -> Iterator[Dict]:
+    """
+    明細が合計 n_details 件になるまで取引を生成（freee API の取引と同じ形）
+
+    Args:
+        n_details: 明細の総数
+        seed: 乱数シード
+        start: 最初の発生日
+        days: 発生日の範囲（日数）
+        tax_error_rate: 経費の明細で税区分を誤って登録する割合（チェック15・16が検出する）
+    """
+    r = random.Random(seed)
+    income_weights = [w for _, w, _, _ in INCOME_ACCOUNTS]
+    expense_weights = [w for _, w, _, _ in EXPENSE_ACCOUNTS]
+    produced = 0
+    deal_id = 0
+    while produced < n_details:
+        deal_id += 1
+        deal_type = "income" if r.random() < 0.3 else "expense"
+        accounts, weights, descriptions = (
+            (INCOME_ACCOUNTS, income_weights, INCOME_DESCRIPTIONS) if deal_type == "income"
+            else (EXPENSE_ACCOUNTS, expense_weights, EXPENSE_DESCRIPTIONS)
+        )
+        count = min(r.choice((1, 1, 1, 2, 2, 3)), n_details - produced)
+        details = []
+        for _ in range(count):
+            account_id, _, tax_codes, (low, high) = r.choices(accounts, weights)[0]
+            amount = low if low == high else r.randrange(low, high, 10 if high > 1000 else 1)
+            tax_code = r.choice(tax_codes)
+            if deal_type == "expense" and tax_code == 136 and r.random() < tax_error_rate:
+                tax_code = r.choice(WRONG_EXPENSE_TAX_CODES)
+            details.append({
+                "account_item_id": account_id,
+                "tax_code": tax_code,
+                "amount": amount,
+                "description": r.choice(descriptions),
+            })
+        produced += count
+        yield {
+            "id": deal_id,
+            "issue_date": (start + timedelta(days=r.randrange(days))).isoformat(),
+            "type": deal_type,
+            "amount": sum(d["amount"] for d in details),
+            "details": details,
+            "payments": [],
+        }
+
+
+def generate_bank_csv(bank_type: str, n_rows: int, seed: int = 0,
+                      start: date = date(2024, 4, 1), days: int = 365) -> bytes:
+    """
+    BANK_CONFIGS[bank_type] の形式の銀行CSVを生成
+
+    Args:
+        bank_type: 銀行タイプ（"楽天銀行", "freee形式" など）
+        n_rows: データ行数
+        seed: 乱数シード
+    """
+    config = BankCSVParser.BANK_CONFIGS[bank_type]
+    r = random.Random(seed)
+    dates = sorted(start + timedelta(days=r.randrange(days)) for _ in range(n_rows))
+
+    if "amount_col" in config:
+        lines = [",".join([config["date_col"], config["type_col"], config["amount_col"],
+                           config["description_col"], "勘定科目"])]
+        for day in dates:
+            income = r.random() < 0.35
+            amount = r.randrange(1_000, 2_000_000) if income else r.randrange(100, 300_000)
+            lines.append(",".join([
+                day.strftime(config["date_format"]), "income" if income else "expense", str(amount),
+                r.choice(BANK_DESCRIPTIONS), "売上高" if income else "消耗品費",
+            ]))
+    else:
+        lines = [",".join([config["date_col"], config["description_col"], config["deposit_col"],
+                           config["withdrawal_col"], config["balance_col"]])]
+        balance = 5_000_000
+        for day in dates:
+            if r.random() < 0.35:
+                amount = r.randrange(1_000, 2_000_000)
+                balance += amount
+                # 桁区切りのカンマ付き（引用符で囲む）も混ぜる
+                deposit, withdrawal = (f'"{amount:,}"' if r.random() < 0.3 else str(amount)), ""
+            else:
+                amount = r.randrange(100, 300_000)
+                balance -= amount
+                deposit, withdrawal = "", str(amount)
+            lines.append(",".join([
+                day.strftime(config["date_format"]), r.choice(BANK_DESCRIPTIONS),
+                deposit, withdrawal, str(balance),
+            ]))
+
+    return ("\n".join(lines) + "\n").encode(config["encoding"])
@@ -2,22 +2,91 @@
 銀行CSV パーサー
 各銀行のCSVフォーマットを統一形式に変換
 """
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Optional
-from dataclasses import dataclass
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from dataclasses import dataclass, field
 from datetime import datetime
+from itertools import repeat
+from pathlib import Path
+import csv
 import io
+import sys
+
+
+class RawRows:
+    """
+    CSVの元データ（パース時の DataFrame）
+
+    1ファイル分を全取引で共有し、行ごとの dict は Transaction.raw_data の参照時にだけ作る。
+    """
+    __slots__ = ("frame",)
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+
+    def row(self, position: int) -> Dict:
+        """position 行目の元データ（列名 → 値）"""
+        return self.frame.iloc[position].to_dict()
 
 
-@dataclass
 class Transaction:
-    """統一取引フォーマット"""
-    date: str
-    description: str
-    amount: int
-    balance: Optional[int] = None
-    type: str = ""  # income or expense
-    raw_data: Dict = None
+    """
+    統一取引フォーマット
+
+    明細数が多い（数年分の入出金）ため __slots__ で1件あたりのメモリを抑える。
+    raw_data（CSVの元の行）は共有の RawRows から参照時に組み立てる。
+    """
+    __slots__ = ("date", "description", "amount", "balance", "type", "_raw_data", "_raw_rows", "_row")
+
+    def __init__(
+        self,
+        date: str,
+        description: str,
+        amount: int,
+        balance: Optional[int] = None,
+        type: str = "",  # income or expense
+        raw_data: Optional[Dict] = None,
+        raw_rows: Optional[RawRows] = None,
+        row: int = -1
+    ):
+        self.date = date
+        self.description = description
+        self.amount = amount
+        self.balance = balance
+        self.type = type
+        self._raw_data = raw_data
+        self._raw_rows = raw_rows
+        self._row = row
+
+    @property
+    def raw_data(self) -> Optional[Dict]:
+        """CSVの元の行（列名 → 値）"""
+        if self._raw_data is None and self._raw_rows is not None:
+            return self._raw_rows.row(self._row)
+        return self._raw_data
+
+    def _key(self):
+        return (self.date, self.description, self.amount, self.balance, self.type, self.raw_data)
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __repr__(self):
+        return (f"Transaction(date={self.date!r}, description={self.description!r}, "
+                f"amount={self.amount!r}, balance={self.balance!r}, type={self.type!r})")
+
+
+@dataclass
+class ParseResult:
+    """CSVのパース結果"""
+    transactions: List[Transaction]
+    bank_type: str
+    total_rows: int = 0
+    # パースできなかった行 [{'row': データ行番号（ヘッダーを除き1始まり。列不足は None）, 'reason': 理由}]
+    errors: List[Dict] = field(default_factory=list)
 
 
 class BankCSVParser:
@@ -76,58 +145,268 @@ class BankCSVParser:
         },
     }
 
+    # iter_parse の1チャンクの行数
+    DEFAULT_CHUNKSIZE = 50_000
+    # 銀行の自動検出に使う先頭バイト数（ヘッダー行だけを見る）
+    DETECT_HEAD_BYTES = 8 * 1024
+    # 自動検出の確信度がこれ未満なら判別不能として扱う
+    MIN_DETECT_CONFIDENCE = 0.6
+    # ヘッダーで判別できず、ファイル名だけで推測したときの確信度
+    FILENAME_CONFIDENCE = 0.5
+    # ファイル名から銀行を推測するキーワード
+    FILENAME_HINTS = (
+        (("rakuten", "楽天"), "楽天銀行"),
+        (("sbi",), "住信SBIネット銀行"),
+        (("mufg", "三菱"), "三菱UFJ銀行"),
+        (("mizuho", "みずほ"), "みずほ銀行"),
+        (("freee",), "freee形式"),
+    )
+
     def __init__(self, bank_type: str = "自動検出"):
+        """
+        Args:
+            bank_type: 銀行タイプ。"自動検出" ならファイルごとに判別する
+                （判別結果は ParseResult.bank_type に入り、このインスタンスは変わらない）
+        """
         self.bank_type = bank_type
 
     def parse(self, file_content: bytes, filename: str = "") -> List[Transaction]:
-        """CSVをパース"""
-        # 自動検出
-        if self.bank_type == "自動検出":
-            self.bank_type = self._detect_bank_type(file_content, filename)
+        """CSVをパース（パースできなかった行は除外。理由が必要なら parse_detailed）"""
+        return self.parse_detailed(file_content, filename).transactions
 
-        if self.bank_type == "freee形式":
+    def parse_detailed(self, file_content: bytes, filename: str = "") -> ParseResult:
+        """CSVをパースし、パースできなかった行とその理由も返す"""
+        bank_type, config = self._resolve_config(
+            lambda: self._trim_head(file_content[:self.DETECT_HEAD_BYTES]), filename)
+
+        if bank_type == "freee形式":
             return self._parse_freee(file_content)
+        return self._parse_bank_csv(file_content, bank_type, config)
 
-        config = self.BANK_CONFIGS.get(self.bank_type)
-        if not config:
-            raise ValueError(f"未対応の銀行: {self.bank_type}")
+    def iter_parse(
+        self,
+        source: Union[str, Path, BinaryIO, bytes],
+        filename: str = "",
+        chunksize: int = DEFAULT_CHUNKSIZE,
+        memory_map: bool = False
+    ) -> Iterator[ParseResult]:
+        """
+        CSVをチャンク単位で読み、チャンクごとの ParseResult を返す（全件をメモリに持たない）
 
-        return self._parse_bank_csv(file_content, config)
+        Args:
+            source: ファイルパス、バイナリのファイルオブジェクト、または bytes
+            filename: 自動検出に使うファイル名（パス指定時は省略するとそのファイル名）
+            chunksize: 1チャンクの行数
+            memory_map: True ならファイルをメモリマップして読む（パス指定時のみ。
+                data/uploads/csv に保存済みの大きなファイル向け）
+
+        Yields:
+            チャンクごとのパース結果（errors の行番号はファイル全体での通し番号）
+        """
+        if isinstance(source, bytes):
+            source = io.BytesIO(source)
+        is_path = isinstance(source, (str, Path))
+        if is_path and not filename:
+            filename = Path(source).name
+
+        bank_type, config = self._resolve_config(lambda: self._read_head(source), filename)
 
-    def _detect_bank_type(self, content: bytes, filename: str) -> str:
-        """銀行タイプを自動検出"""
-        # ファイル名から推測
-        filename_lower = filename.lower()
-        if "rakuten" in filename_lower or "楽天" in filename_lower:
-            return "楽天銀行"
-        if "sbi" in filename_lower:
-            return "住信SBIネット銀行"
-        if "mufg" in filename_lower or "三菱" in filename_lower:
-            return "三菱UFJ銀行"
-        if "mizuho" in filename_lower or "みずほ" in filename_lower:
-            return "みずほ銀行"
-        if "freee" in filename_lower:
-            return "freee形式"
-
-        # 内容から推測
         try:
-            text = content.decode("utf-8")
-            if "発生日" in text and "収支区分" in text:
-                return "freee形式"
-        except UnicodeDecodeError:
-            pass
+            reader = pd.read_csv(
+                source,
+                encoding=config["encoding"],
+                skiprows=config.get("skiprows", 0),
+                chunksize=chunksize,
+                memory_map=memory_map and is_path
+            )
+        except Exception as e:
+            raise ValueError(f"CSV読み込みエラー: {e}")
+
+        row_offset = 0
+        with reader:
+            while True:
+                try:
+                    df = next(reader)
+                except StopIteration:
+                    return
+                except Exception as e:
+                    raise ValueError(f"CSV読み込みエラー: {e}")
+
+                if bank_type == "freee形式":
+                    result = self._parse_freee_frame(df, row_offset)
+                else:
+                    result = self._parse_bank_frame(df, bank_type, config, row_offset)
+                yield result
+
+                # 必須列がない（行番号なしのエラー）なら残りのチャンクも読めないので打ち切る
+                if result.errors and result.errors[0]['row'] is None:
+                    return
+                row_offset += len(df)
+
+    def summarize(
+        self,
+        source: Union[str, Path, BinaryIO, bytes],
+        filename: str = "",
+        memory_map: bool = False,
+        max_errors: Optional[int] = None
+    ) -> Dict:
+        """
+        CSVをチャンク単位で解析して件数・入出金の合計を集計（取引を全件メモリに持たない）
+
+        Args:
+            source, filename, memory_map: iter_parse と同じ
+            max_errors: errors に残す件数の上限（None なら全件。error_count は常に全件数）
+
+        Returns:
+            {'filename', 'bank_type', 'transaction_count', 'total_income', 'total_expense',
+             'error_count', 'errors'}
+        """
+        summary = {
+            'filename': filename,
+            'bank_type': None,
+            'transaction_count': 0,
+            'total_income': 0,
+            'total_expense': 0,
+            # 読み飛ばした行（件数と先頭の数件の理由）
+            'error_count': 0,
+            'errors': []
+        }
+        for batch in self.iter_parse(source, filename, memory_map=memory_map):
+            summary['bank_type'] = batch.bank_type
+            for t in batch.transactions:
+                if t.type == 'income':
+                    summary['total_income'] += t.amount
+                elif t.type == 'expense':
+                    summary['total_expense'] += t.amount
+            summary['transaction_count'] += len(batch.transactions)
+            summary['error_count'] += len(batch.errors)
+            room = len(batch.errors) if max_errors is None else max_errors - len(summary['errors'])
+            if room > 0:
+                summary['errors'].extend(batch.errors[:room])
+        return summary
+
+    def _resolve_config(self, read_head: Callable[[], bytes], filename: str) -> Tuple[str, Dict]:
+        """
+        このファイルの銀行タイプと設定（自動検出なら read_head() の先頭から判別）
+
+        Raises:
+            ValueError: 未対応の銀行、または形式を判別できない
+        """
+        bank_type = self.bank_type
+        if bank_type == "自動検出":
+            bank_type = self._detect_bank_type(read_head(), filename)
+
+        config = self.BANK_CONFIGS.get(bank_type)
+        if not config:
+            raise ValueError(f"未対応の銀行: {bank_type}")
+        return bank_type, config
+
+    def _read_head(self, source: Union[str, Path, BinaryIO]) -> bytes:
+        """
+        先頭 DETECT_HEAD_BYTES バイトを行単位で読む（ファイルオブジェクトは読み取り位置を戻す）
+
+        途中で切れた行は捨てる（マルチバイト文字の途中で切らないため）。
+        """
+        if isinstance(source, (str, Path)):
+            with open(source, "rb") as f:
+                head = f.read(self.DETECT_HEAD_BYTES)
+        else:
+            position = source.tell()
+            head = source.read(self.DETECT_HEAD_BYTES)
+            source.seek(position)
+        return self._trim_head(head)
+
+    def _trim_head(self, head: bytes) -> bytes:
+        """DETECT_HEAD_BYTES で切った先頭から、途中で切れた最終行を除く"""
+        if len(head) == self.DETECT_HEAD_BYTES and b"\n" in head:
+            head = head[:head.rfind(b"\n") + 1]
+        return head
+
+    def detect_bank_type(self, head: bytes, filename: str = "") -> Tuple[Optional[str], float]:
+        """
+        CSVのヘッダー行から銀行を推測
 
+        各 BANK_CONFIGS の列名とヘッダー行を突き合わせ、一致した列の割合を確信度とする。
+        ファイル名は同点の決着と、ヘッダーで判別できないときの推測にだけ使う。
+
+        Args:
+            head: ファイルの先頭（ヘッダー行を含む数KB。全体を渡す必要はない）
+            filename: ファイル名
+
+        Returns:
+            (銀行タイプ, 確信度 0.0〜1.0)。判別できなければ (None, 0.0)
+        """
+        scores = self._header_scores(head)
+        hint = self._bank_from_filename(filename)
+        best = max(scores.values(), default=0.0)
+
+        if best == 0.0:
+            if hint is not None:
+                return hint, self.FILENAME_CONFIDENCE
+            return None, 0.0
+
+        leaders = [bank for bank, score in scores.items() if score == best]
+        if hint in leaders:
+            return hint, best
+        if len(leaders) > 1:
+            # 同点が複数あれば確信度を割り引く（先頭を返すが MIN_DETECT_CONFIDENCE で弾かれやすい）
+            return leaders[0], best / len(leaders)
+        return leaders[0], best
+
+    def _detect_bank_type(self, head: bytes, filename: str) -> str:
+        """
+        銀行タイプを自動検出
+
+        Raises:
+            ValueError: 確信度が MIN_DETECT_CONFIDENCE 未満（誤った形式で読むより明示的に失敗させる）
+        """
+        bank_type, confidence = self.detect_bank_type(head, filename)
+        if bank_type is None or confidence < self.MIN_DETECT_CONFIDENCE:
+            raise ValueError("銀行の形式を判別できません。銀行を指定してください")
+        return bank_type
+
+    def _header_scores(self, head: bytes) -> Dict[str, float]:
+        """銀行ごとの、ヘッダー行と一致した列の割合"""
+        lines = head.split(b"\n")
+        headers: Dict[Tuple[str, int], Optional[set]] = {}
+        scores = {}
+        for bank, config in self.BANK_CONFIGS.items():
+            key = (config["encoding"], config.get("skiprows", 0))
+            if key not in headers:
+                headers[key] = self._header_columns(lines, *key)
+            columns = headers[key]
+            if not columns:
+                continue
+
+            signature = [v for k, v in config.items() if k.endswith("_col")]
+            # 日付列がなければ読めないので候補にしない
+            if config["date_col"] not in columns:
+                continue
+            scores[bank] = sum(col in columns for col in signature) / len(signature)
+        return scores
+
+    @staticmethod
+    def _header_columns(lines: List[bytes], encoding: str, skiprows: int) -> Optional[set]:
+        """skiprows 行目をヘッダーとして列名の集合にする（その文字コードで読めなければ None）"""
+        if len(lines) <= skiprows:
+            return None
+        # 改行（0x0A）は Shift_JIS の2バイト目にも現れないため、行単位で切ってから復号してよい
         try:
-            text = content.decode("shift_jis")
-            if "入金額" in text and "出金額" in text:
-                return "楽天銀行"
+            line = lines[skiprows].decode(encoding).lstrip("\ufeff").rstrip("\r")
         except UnicodeDecodeError:
-            pass
+            return None
+        return set(next(csv.reader([line]), []))
 
-        return "楽天銀行"  # デフォルト
+    def _bank_from_filename(self, filename: str) -> Optional[str]:
+        """ファイル名のキーワードから銀行を推測"""
+        filename_lower = filename.lower()
+        for keywords, bank in self.FILENAME_HINTS:
+            if any(keyword in filename_lower for keyword in keywords):
+                return bank
+        return None
 
-    def _parse_bank_csv(self, content: bytes, config: Dict) -> List[Transaction]:
-        """銀行CSVをパース"""
+    def _parse_bank_csv(self, content: bytes, bank_type: str, config: Dict) -> ParseResult:
+        """銀行CSVをパース（列単位で一括変換）"""
         try:
             df = pd.read_csv(
                 io.BytesIO(content),
@@ -137,72 +416,224 @@ class BankCSVParser:
         except Exception as e:
             raise ValueError(f"CSV読み込みエラー: {e}")
 
-        transactions = []
-        for _, row in df.iterrows():
-            try:
-                # 日付
-                date_str = str(row[config["date_col"]])
-                date = datetime.strptime(date_str, config["date_format"])
+        return self._parse_bank_frame(df, bank_type, config)
 
-                # 金額
-                deposit = self._parse_amount(row.get(config.get("deposit_col", ""), 0))
-                withdrawal = self._parse_amount(row.get(config.get("withdrawal_col", ""), 0))
+    def _parse_bank_frame(
+        self, df: pd.DataFrame, bank_type: str, config: Dict, row_offset: int = 0
+    ) -> ParseResult:
+        """
+        銀行CSVの DataFrame を列単位で一括変換
 
-                if deposit > 0:
-                    amount = deposit
-                    tx_type = "income"
-                else:
-                    amount = withdrawal
-                    tx_type = "expense"
-
-                # 残高
-                balance = self._parse_amount(row.get(config.get("balance_col", ""), 0))
-
-                transactions.append(Transaction(
-                    date=date.strftime("%Y-%m-%d"),
-                    description=str(row[config["description_col"]]),
-                    amount=amount,
-                    balance=balance if balance else None,
-                    type=tx_type,
-                    raw_data=row.to_dict()
-                ))
-            except (KeyError, ValueError, TypeError) as e:
-                # パースエラーの行はスキップ
-                continue
+        Args:
+            df: CSV（またはそのチャンク）
+            bank_type: 銀行タイプ
+            config: BANK_CONFIGS の設定
+            row_offset: チャンクより前の行数（errors の行番号をファイル全体の通し番号にする）
+        """
+        result = ParseResult(transactions=[], bank_type=bank_type, total_rows=len(df))
+        missing = [config[key] for key in ("date_col", "description_col") if config[key] not in df.columns]
+        if missing:
+            result.errors.append({'row': None, 'reason': f"必須列がありません: {', '.join(missing)}"})
+            return result
+
+        # 日付
+        dates, bad_date = self._parse_dates(df[config["date_col"]], config["date_format"])
 
-        return transactions
+        # 金額（列がなければ0）
+        deposit, bad_deposit = self._parse_amounts(df.get(config.get("deposit_col", "")), len(df))
+        withdrawal, bad_withdrawal = self._parse_amounts(df.get(config.get("withdrawal_col", "")), len(df))
+        balance, bad_balance = self._parse_amounts(df.get(config.get("balance_col", "")), len(df))
 
-    def _parse_freee(self, content: bytes) -> List[Transaction]:
-        """freee形式をパース"""
+        income = deposit > 0
+        bad_amount = bad_deposit | bad_withdrawal | bad_balance
+        self._report_errors(result, bad_date, "日付を解釈できません", row_offset)
+        self._report_errors(result, bad_amount & ~bad_date, "金額を解釈できません", row_offset)
+
+        ok = np.flatnonzero(~(bad_date | bad_amount))
+        # balance は 0 を None にする（行ごとの `or None` を避けて列で置き換える）
+        balances = balance[ok].astype(object)
+        balances[balances == 0] = None
+        result.transactions = list(map(
+            Transaction,
+            dates[ok].tolist(),
+            self._interned(df[config["description_col"]], ok),
+            np.where(income, deposit, withdrawal)[ok].tolist(),
+            balances.tolist(),
+            np.where(income[ok], "income", "expense").tolist(),
+            repeat(None),
+            repeat(RawRows(df)),
+            ok.tolist()
+        ))
+        return result
+
+    def _parse_freee(self, content: bytes) -> ParseResult:
+        """freee形式をパース（列単位で一括変換）"""
         try:
             df = pd.read_csv(io.BytesIO(content), encoding="utf-8")
         except UnicodeDecodeError:
             df = pd.read_csv(io.BytesIO(content), encoding="utf-8-sig")
 
-        transactions = []
-        for _, row in df.iterrows():
+        return self._parse_freee_frame(df)
+
+    def _parse_freee_frame(self, df: pd.DataFrame, row_offset: int = 0) -> ParseResult:
+        """freee形式の DataFrame を列単位で一括変換（row_offset は _parse_bank_frame と同じ）"""
+        result = ParseResult(transactions=[], bank_type="freee形式", total_rows=len(df))
+        missing = [col for col in ("発生日", "金額") if col not in df.columns]
+        if missing:
+            result.errors.append({'row': None, 'reason': f"必須列がありません: {', '.join(missing)}"})
+            return result
+
+        amounts, bad_amount = self._parse_integers(df["金額"])
+        if "収支区分" in df.columns:
+            income = (df["収支区分"] == "income").fillna(False).to_numpy(dtype=bool)
+        else:
+            income = np.zeros(len(df), dtype=bool)
+
+        self._report_errors(result, bad_amount, "金額を解釈できません", row_offset)
+
+        ok = np.flatnonzero(~bad_amount)
+        descriptions = (self._interned(df["詳細"], ok)
+                        if "詳細" in df.columns else [""] * len(ok))
+        result.transactions = list(map(
+            Transaction,
+            self._interned(df["発生日"], ok),
+            descriptions,
+            amounts[ok].tolist(),
+            repeat(None),
+            np.where(income[ok], "income", "expense").tolist(),
+            repeat(None),
+            repeat(RawRows(df)),
+            ok.tolist()
+        ))
+        return result
+
+    @staticmethod
+    def _interned(values: pd.Series, positions: np.ndarray) -> List[str]:
+        """
+        列の positions 行を文字列にして intern して返す（str() と同じ表記、欠損は "nan"）
+
+        日付・摘要は同じ文字列が何度も出るため、種類ごとに1回だけ変換・intern して全行で共有する。
+        """
+        codes, uniques = pd.factorize(values.to_numpy(dtype=object)[positions], use_na_sentinel=False)
+        interned = np.array([sys.intern(str(v)) for v in uniques], dtype=object)
+        return interned[codes].tolist()
+
+    @staticmethod
+    def _report_errors(result: ParseResult, mask: np.ndarray, reason: str, row_offset: int = 0):
+        """パースできなかった行を結果に記録（行番号順）"""
+        result.errors.extend({'row': row_offset + position + 1, 'reason': reason}
+                             for position in np.flatnonzero(mask).tolist())
+        result.errors.sort(key=lambda e: e['row'] or 0)
+
+    @staticmethod
+    def _parse_dates(values: pd.Series, date_format: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        日付列を YYYY-MM-DD に一括変換
+
+        明細の日付は種類が少ない（数年分でも千数百日）ため、異なる値ごとに1回だけ解釈して
+        全行に配る。
+
+        Returns:
+            (日付文字列の配列（intern 済み）, 解釈できなかった行のマスク)
+        """
+        codes, uniques = pd.factorize(values.to_numpy(dtype=object), use_na_sentinel=False)
+        text = [str(v) for v in uniques]
+        parsed = pd.to_datetime(pd.Series(text, dtype=object), format=date_format, errors="coerce")
+        bad = parsed.isna().to_numpy(copy=True)
+        dates = [sys.intern(date) for date in np.datetime_as_string(parsed.to_numpy(), unit="D").tolist()]
+
+        # pandas で扱えない日付（範囲外の年など）は1件ずつ strptime で解釈し直す
+        for position in np.flatnonzero(bad).tolist():
+            try:
+                date = datetime.strptime(text[position], date_format)
+            except ValueError:
+                continue
+            dates[position] = date.strftime("%Y-%m-%d")
+            bad[position] = False
+        return np.array(dates, dtype=object)[codes], bad[codes]
+
+    def _parse_amounts(self, values: Optional[pd.Series], length: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        金額列を一括変換（欠損・空・"-" は0、カンマ・円・¥を除去、小数は切り捨て）
+
+        Returns:
+            (金額の int64 配列, 解釈できなかった行のマスク)
+        """
+        if values is None:
+            return np.zeros(length, dtype=np.int64), np.zeros(length, dtype=bool)
+
+        if pd.api.types.is_numeric_dtype(values):
+            numbers = values.to_numpy(dtype=float, na_value=0.0)
+        else:
+            text = values.astype(object)
+            missing = text.isna().to_numpy()
+            # 記号のない数字はそのまま読み、読めなかった行だけ記号を除いて解釈し直す
+            numbers = pd.to_numeric(text, errors="coerce").to_numpy(dtype=float, copy=True)
+            numbers[missing] = 0.0
+            retry = np.flatnonzero(np.isnan(numbers))
+            if len(retry):
+                numbers[retry] = self._parse_amount_text(text.iloc[retry])
+
+        bad = ~np.isfinite(numbers)
+        return np.trunc(np.where(bad, 0.0, numbers)).astype(np.int64), bad
+
+    @staticmethod
+    def _parse_amount_text(text: pd.Series) -> np.ndarray:
+        """金額の文字列を解釈（空・"-" は0、カンマ・円・¥を除去、読めなければ NaN）"""
+        cleaned = text.astype(str).str.replace("[,円¥]", "", regex=True).str.strip()
+        zero = cleaned.isin(["", "-"]).to_numpy()
+        numbers = pd.to_numeric(cleaned.where(~zero, "0"), errors="coerce").to_numpy(dtype=float, copy=True)
+        # to_numeric で読めない表記（全角数字など）は float() で解釈し直す
+        for position in np.flatnonzero(np.isnan(numbers)).tolist():
             try:
-                transactions.append(Transaction(
-                    date=str(row["発生日"]),
-                    description=str(row.get("詳細", "")),
-                    amount=int(row["金額"]),
-                    type="income" if row.get("収支区分") == "income" else "expense",
-                    raw_data=row.to_dict()
-                ))
-            except (KeyError, ValueError, TypeError) as e:
-                # パースエラーの行はスキップ
+                number = float(cleaned.iat[position])
+            except ValueError:
                 continue
+            numbers[position] = number
+        return numbers
+
+    @staticmethod
+    def _parse_integers(values: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        整数列を一括変換（int() と同じ規則: 欠損・小数表記の文字列は不可、数値の小数は切り捨て）
+
+        Returns:
+            (int64 配列, 解釈できなかった行のマスク)
+        """
+        if pd.api.types.is_numeric_dtype(values):
+            numbers = values.to_numpy(dtype=float, na_value=np.nan)
+        else:
+            text = values.astype(object)
+            missing = text.isna().to_numpy()
+            stripped = text.where(~missing, "").astype(str).str.strip()
+            is_integer = stripped.str.fullmatch(r"[+-]?\d+").fillna(False).to_numpy(dtype=bool)
+            numbers = pd.to_numeric(stripped.where(is_integer, ""), errors="coerce").to_numpy(dtype=float, copy=True)
+            # 全角数字・区切りの _ など int() だけが受け付ける表記は1件ずつ解釈し直す
+            for position in np.flatnonzero(np.isnan(numbers) & ~missing).tolist():
+                try:
+                    number = int(stripped.iat[position])
+                except ValueError:
+                    continue
+                numbers[position] = number
+
+        bad = ~np.isfinite(numbers)
+        return np.trunc(np.where(bad, 0.0, numbers)).astype(np.int64), bad
+
+
+def summarize_csv_file(
+    bank_type: str,
+    source: Union[str, Path, bytes],
+    filename: str = "",
+    memory_map: bool = False,
+    max_errors: Optional[int] = None
+) -> Dict:
+    """
+    1ファイルを新しいパーサーで集計（プロセスプールから呼ぶためモジュール関数にしている）
 
-        return transactions
-
-    def _parse_amount(self, value) -> int:
-        """金額をパース"""
-        if pd.isna(value):
-            return 0
-        if isinstance(value, (int, float)):
-            return int(value)
-        # 文字列の場合、カンマや円を除去
-        value = str(value).replace(",", "").replace("円", "").replace("¥", "").strip()
-        if not value or value == "-":
-            return 0
-        return int(float(value))
+    読めないファイルは例外にせず {'filename', 'error'} を返す（他のファイルの集計を止めない）。
+    引数は BankCSVParser と BankCSVParser.summarize と同じ。
+    """
+    try:
+        return BankCSVParser(bank_type).summarize(source, filename, memory_map, max_errors)
+    except ValueError as e:
+        return {'filename': filename, 'error': str(e)}
@@ -0,0 +1,349 @@
+"""
+複数事業所の一括監査
+
+会計事務所が顧問先の事業所をまとめて監査する。freeeからの取得はスレッドで並列に行い
+（全事業所で1つの RateLimiter を共有し、合計のリクエスト数を freee API の上限内に収める）、
+取得が終わった事業所から順にプロセスプールで検査（TaxInspector.inspect_all）する。
+検査は全コアに分散し、取得と並行して進む。
+
+サーバーからは client_factory にクライアントの取得関数（server.get_freee_client）を渡し、
+画面からの監査と接続プール・レート制限を共有する（一括監査だけで API の上限を使い切らない）。
+
+    runner = BatchAuditRunner(token, deal_store, master_cache=master_cache)
+    summary = runner.run([BatchTarget(1, "2024-04-01", "2025-03-31"), ...], output_dir=Path("data/batch/x"))
+
+output_dir には事業所ごとの結果（<事業所ID>_<開始日>_<終了日>.json）と、
+全事業所の集計（summary.json / summary.csv）を書き出す。
+
+コマンドラインからも実行できる:
+
+    python -m core.batch --token TOKEN --targets targets.csv
+    python -m core.batch --token TOKEN --company 123,2024-04-01,2025-03-31,4 --company 456
+
+targets.csv は company_id,start_date,end_date,fiscal_month の列（見出し行つき。日付・期首月は省略可）。
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from .deal_store import DealStore
+from .export import audit_result_to_json, issue_to_dict
+from .freee_client import FreeeClient, RateLimiter
+from .master_cache import MasterDataCache
+
+
+@dataclass
+class BatchTarget:
+    """一括監査の対象（事業所と期間）"""
+    company_id: int
+    start_date: Optional[str] = None    # YYYY-MM-DD（None なら期間の下限なし）
+    end_date: Optional[str] = None      # YYYY-MM-DD（None なら期間の上限なし）
+    fiscal_month: int = 5               # 期首月（/api/analyze の fiscal_month と同じ）
+
+    @property
+    def label(self) -> str:
+        """結果ファイル名に使う識別子"""
+        return f"{self.company_id}_{self.start_date or 'start'}_{self.end_date or 'end'}"
+
+    @property
+    def period_boundary(self) -> str:
+        """期の境界日（/api/analyze と同じく今年の期首月1日）"""
+        return f"{datetime.now().year}-{self.fiscal_month:02d}-01"
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BatchTarget":
+        """{'company_id', 'start_date', 'end_date', 'fiscal_month'} から作成（値の検証つき）"""
+        try:
+            company_id = int(data['company_id'])
+            fiscal_month = int(data.get('fiscal_month') or 5)
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"事業所IDと期首月は数値で指定してください: {data}")
+        if not 1 <= fiscal_month <= 12:
+            raise ValueError(f"期首月は1〜12で指定してください: {fiscal_month}")
+        return cls(company_id, data.get('start_date') or None, data.get('end_date') or None, fiscal_month)
+
+
+def audit_company(store_path: str, target: BatchTarget,
+                  account_map: Dict[int, str], tax_map: Dict[int, str]) -> Dict[str, Any]:
+    """
+    1事業所を検査（プロセスプールのワーカーで実行。引数・戻り値は pickle できる形）
+
+    Returns:
+        /api/analyze と同じ形の結果 dict
+    """
+    from .tax_inspector import TaxInspector
+
+    store = DealStore(store_path)
+    deals = (d.to_dict() for d in store.iter_deals(target.company_id, target.start_date, target.end_date))
+    inspector = TaxInspector(account_map=account_map, tax_map=tax_map)
+    result = inspector.inspect_all(deals, period_boundary=target.period_boundary)
+    return {
+        'success': True,
+        'deal_count': result.details['total_deals'],
+        'errors': result.errors,
+        'warnings': result.warnings,
+        'issues': [issue_to_dict(issue) for issue in result.issues],
+        'report': result.report,
+        'details': result.details,
+    }
+
+
+class BatchAuditRunner:
+    """複数事業所の一括監査（取得はスレッド・共有レート制限、検査はプロセスプール）"""
+
+    # 同時に取得する事業所数
+    DEFAULT_FETCH_WORKERS = 4
+    # 1事業所あたりの取引一覧の並列取得数
+    DEFAULT_FETCH_CONCURRENCY = 2
+    SUMMARY_COLUMNS = ['company_id', 'company_name', 'start_date', 'end_date', 'status',
+                       'deal_count', 'errors', 'warnings', 'issues', 'high_risk', 'seconds', 'error']
+
+    def __init__(self, token: str, deal_store: DealStore,
+                 master_cache: Optional[MasterDataCache] = None,
+                 workers: Optional[int] = None,
+                 fetch_workers: int = DEFAULT_FETCH_WORKERS,
+                 fetch_concurrency: int = DEFAULT_FETCH_CONCURRENCY,
+                 rate_limit: float = FreeeClient.DEFAULT_RATE_LIMIT,
+                 full_sync: bool = False,
+                 client_factory: Optional[Callable[[int], FreeeClient]] = None):
+        """
+        Args:
+            token: freeeアクセストークン（全事業所にアクセスできるもの）
+            deal_store: 取引のローカルキャッシュ（ワーカープロセスは同じファイルを読む）
+            master_cache: 勘定科目・税区分マスタのキャッシュ
+            workers: 検査のプロセス数（None ならCPUコア数）
+            fetch_workers: 同時に取得する事業所数
+            fetch_concurrency: 1事業所あたりの取引一覧の並列取得数
+            rate_limit: 全事業所合計の1秒あたりの最大リクエスト数（client_factory 指定時は無視）
+            full_sync: True なら全件を取り直す
+            client_factory: 事業所IDから FreeeClient を返す関数（使い回すクライアント。close() しない）。
+                None なら事業所ごとに作成し、rate_limit の RateLimiter を全事業所で共有する
+        """
+        self.token = token
+        self.deal_store = deal_store
+        self.master_cache = master_cache
+        self.workers = workers or os.cpu_count() or 1
+        self.fetch_workers = max(1, fetch_workers)
+        self.fetch_concurrency = fetch_concurrency
+        self.rate_limit = rate_limit
+        self.full_sync = full_sync
+        self.client_factory = client_factory
+
+    def run(self, targets: List[BatchTarget],
+            output_dir: Optional[Union[str, Path]] = None,
+            on_progress: Optional[Callable[[int, int, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        全事業所を監査
+
+        Args:
+            targets: 監査対象
+            output_dir: 結果の書き出し先（None なら書き出さない）
+            on_progress: 事業所の監査が終わるたびに (完了数, 総数, 集計行) で呼ばれる
+
+        Returns:
+            集計 {'total', 'succeeded', 'failed', 'errors', 'warnings', 'issues', 'seconds', 'companies': [...]}
+            （companies は targets の順。事業所ごとの結果本体は results に同じ順で入る）
+        """
+        started = time.perf_counter()
+        if output_dir is not None:
+            output_dir = Path(output_dir)
+            output_dir.mkdir(parents=True, exist_ok=True)
+
+        rate_limiter = RateLimiter(self.rate_limit)
+        rows: List[Optional[Dict[str, Any]]] = [None] * len(targets)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(targets)
+        done = 0
+
+        def finish(i: int, result: Dict[str, Any], row: Dict[str, Any]) -> None:
+            nonlocal done
+            if output_dir is not None and result.get('success'):
+                (output_dir / f"{targets[i].label}.json").write_text(
+                    audit_result_to_json(result), encoding="utf-8")
+            results[i], rows[i] = result, row
+            done += 1
+            if on_progress:
+                on_progress(done, len(targets), row)
+
+        with ThreadPoolExecutor(max_workers=self.fetch_workers) as fetchers, \
+                ProcessPoolExecutor(max_workers=self.workers) as pool:
+            # 取得が終わった事業所から検査に回す（取得と検査を並行させる）
+            fetches = {fetchers.submit(self._fetch, target, rate_limiter): i
+                       for i, target in enumerate(targets)}
+            audits = {}
+            for future in as_completed(fetches):
+                i = fetches[future]
+                try:
+                    company_name, account_map, tax_map, fetch_started = future.result()
+                except Exception as e:
+                    finish(i, {'success': False, 'error': str(e)}, self._row(targets[i], '', error=e))
+                    continue
+                audit = pool.submit(audit_company, str(self.deal_store.path), targets[i], account_map, tax_map)
+                audits[audit] = (i, company_name, fetch_started)
+
+            for future in as_completed(audits):
+                i, company_name, fetch_started = audits[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    finish(i, {'success': False, 'error': str(e)}, self._row(targets[i], company_name, error=e))
+                    continue
+                seconds = time.perf_counter() - fetch_started
+                finish(i, result, self._row(targets[i], company_name, result, seconds))
+
+        summary = {
+            'total': len(targets),
+            'succeeded': sum(1 for row in rows if row['status'] == 'succeeded'),
+            'failed': sum(1 for row in rows if row['status'] == 'failed'),
+            'errors': sum(row['errors'] for row in rows),
+            'warnings': sum(row['warnings'] for row in rows),
+            'issues': sum(row['issues'] for row in rows),
+            'seconds': time.perf_counter() - started,
+            'companies': rows,
+        }
+        if output_dir is not None:
+            (output_dir / "summary.json").write_text(
+                json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8")
+            (output_dir / "summary.csv").write_text(self.summary_csv(rows), encoding="utf-8")
+        summary['results'] = results
+        return summary
+
+    def _fetch(self, target: BatchTarget, rate_limiter: RateLimiter) -> tuple:
+        """
+        1事業所のマスタ・取引をfreeeから取得してストアへ保存
+
+        Returns:
+            (事業所名, 勘定科目マップ, 税区分マップ, 取得開始時刻)
+        """
+        started = time.perf_counter()
+        if self.client_factory is not None:
+            company, account_map, tax_map = self._sync(self.client_factory(target.company_id), target)
+        else:
+            with FreeeClient(access_token=self.token, company_id=target.company_id,
+                             master_cache=self.master_cache, rate_limiter=rate_limiter) as client:
+                company, account_map, tax_map = self._sync(client, target)
+        name = company.get('display_name', company.get('name', '')) if company else ''
+        return name, account_map, tax_map, started
+
+    def _sync(self, client: FreeeClient, target: BatchTarget) -> tuple:
+        """事業所情報・マスタを取得し、取引をストアへ同期（(事業所, 勘定科目マップ, 税区分マップ) を返す）"""
+        company = client.get_company()
+        if self.full_sync and self.master_cache is not None:
+            self.master_cache.invalidate(target.company_id)
+        account_map = client.get_account_items()
+        tax_map = client.get_tax_codes()
+        self.deal_store.sync(client, full=self.full_sync, concurrency=self.fetch_concurrency,
+                             start_date=target.start_date, end_date=target.end_date)
+        return company, account_map, tax_map
+
+    @staticmethod
+    def _row(target: BatchTarget, company_name: str, result: Optional[Dict[str, Any]] = None,
+             seconds: float = 0.0, error: Optional[Exception] = None) -> Dict[str, Any]:
+        """集計の1行"""
+        result = result or {}
+        issues = result.get('issues', [])
+        return {
+            'company_id': target.company_id,
+            'company_name': company_name,
+            'start_date': target.start_date,
+            'end_date': target.end_date,
+            'status': 'failed' if error is not None else 'succeeded',
+            'deal_count': result.get('deal_count', 0),
+            'errors': result.get('errors', 0),
+            'warnings': result.get('warnings', 0),
+            'issues': len(issues),
+            'high_risk': sum(1 for issue in issues if issue['risk_level'] == 'high'),
+            'seconds': round(seconds, 3),
+            'error': str(error) if error is not None else None,
+        }
+
+    @classmethod
+    def summary_csv(cls, rows: List[Dict[str, Any]]) -> str:
+        """集計のCSV（BOM付き。Excelでも文字化けしないように）"""
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=cls.SUMMARY_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+        return '\ufeff' + output.getvalue()
+
+
+def load_targets(path: Path) -> List[BatchTarget]:
+    """監査対象をファイルから読み込む（.json はオブジェクトの配列、それ以外はCSV）"""
+    text = path.read_text(encoding="utf-8-sig")
+    if path.suffix.lower() == ".json":
+        rows = json.loads(text)
+    else:
+        rows = list(csv.DictReader(io.StringIO(text)))
+    return [BatchTarget.from_dict(row) for row in rows]
+
+
+def parse_company(value: str) -> BatchTarget:
+    """--company の値（事業所ID[,開始日,終了日[,期首月]]）"""
+    parts = [p.strip() for p in value.split(",")]
+    keys = ['company_id', 'start_date', 'end_date', 'fiscal_month']
+    if len(parts) > len(keys):
+        raise argparse.ArgumentTypeError(f"形式が不正です: {value}")
+    try:
+        return BatchTarget.from_dict(dict(zip(keys, parts)))
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    data_dir = Path(__file__).resolve().parent.parent / "data"
+
+    parser = argparse.ArgumentParser(description="複数事業所の一括監査")
+    parser.add_argument("--token", default=os.getenv("FREEE_ACCESS_TOKEN"),
+                        help="freeeアクセストークン（既定: 環境変数 FREEE_ACCESS_TOKEN）")
+    parser.add_argument("--targets", type=Path, help="監査対象のCSV / JSON")
+    parser.add_argument("--company", type=parse_company, action="append", default=[],
+                        help="監査対象（事業所ID[,開始日,終了日[,期首月]]。複数指定可）")
+    parser.add_argument("--output", type=Path, help="結果の書き出し先（既定: data/batch/<日時>）")
+    parser.add_argument("--workers", type=int, help="検査のプロセス数（既定: CPUコア数）")
+    parser.add_argument("--fetch-workers", type=int, default=BatchAuditRunner.DEFAULT_FETCH_WORKERS,
+                        help="同時に取得する事業所数")
+    parser.add_argument("--rate-limit", type=float, default=FreeeClient.DEFAULT_RATE_LIMIT,
+                        help="全事業所合計の1秒あたりの最大リクエスト数")
+    parser.add_argument("--full-sync", action="store_true", help="取引を全件取り直す")
+    args = parser.parse_args(argv)
+
+    if not args.token:
+        parser.error("freeeアクセストークンを --token か FREEE_ACCESS_TOKEN で指定してください")
+    targets = list(args.company)
+    if args.targets:
+        try:
+            targets += load_targets(args.targets)
+        except (OSError, ValueError) as e:
+            parser.error(f"監査対象を読み込めません: {e}")
+    if not targets:
+        parser.error("監査対象を --targets か --company で指定してください")
+
+    output = args.output or data_dir / "batch" / f"{datetime.now():%Y%m%d-%H%M%S}"
+    runner = BatchAuditRunner(
+        args.token, DealStore(data_dir / "deals.sqlite3"),
+        master_cache=MasterDataCache(data_dir / "cache"),
+        workers=args.workers, fetch_workers=args.fetch_workers,
+        rate_limit=args.rate_limit, full_sync=args.full_sync,
+    )
+
+    def progress(done, total, row):
+        status = "OK " if row['status'] == 'succeeded' else "NG "
+        detail = row['error'] or f"取引{row['deal_count']}件 / 問題{row['issues']}件（高リスク{row['high_risk']}件）"
+        print(f"[{done}/{total}] {status}{row['company_id']} {row['company_name']}: {detail}", flush=True)
+
+    summary = runner.run(targets, output_dir=output, on_progress=progress)
+    print(f"\n{summary['succeeded']}/{summary['total']}事業所を監査しました"
+          f"（{summary['seconds']:.1f}秒）: {output}")
+    return 0 if summary['failed'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
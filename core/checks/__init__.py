@@ -0,0 +1,30 @@
+"""
+税務チェック群（厳選20項目 + 参考情報）
+
+チェックの一覧と実行順は registry.RULES に宣言する。TaxInspector はその順にチェックを実行し、
+結果もこの順で出力する。各チェックのモジュールは実行するときに初めて読み込む
+（DEFAULT_CHECKS やチェックのクラスをこのパッケージから参照したときも、その時点で読み込む）。
+"""
+from .base import BaseCheck, DetailContext
+from .registry import RULES, RuleSpec, get_rules, load_checks, register
+
+
+def __getattr__(name):
+    # DEFAULT_CHECKS・チェックのクラスは参照されたときに読み込む（PEP 562）
+    if name == "DEFAULT_CHECKS":
+        return load_checks()
+    for spec in list(RULES):
+        if spec.class_name == name:
+            return spec.load()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = [
+    "BaseCheck",
+    "DetailContext",
+    "DEFAULT_CHECKS",
+    "RuleSpec",
+    "get_rules",
+    "load_checks",
+    "register",
+]
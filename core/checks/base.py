@@ -0,0 +1,113 @@
+"""
+チェック基盤
+
+各チェックは「明細を1件ずつ受け取るビジター」として実装する。
+TaxInspector は取引・明細を1回だけ走査し、登録済みの全チェックへ配信する。
+
+    visit(ctx)  : 明細1件を受け取り、集計対象ならエントリを返す（対象外は None）
+    finish(...) : 集めたエントリから details / issues を組み立てる
+
+列指向モード（core.ledger.ColumnarLedger）では visit() の代わりに
+collect_columnar() が同じエントリを一括抽出する。集計型のチェックは
+evaluate_columnar() を上書きして group-by で直接集計する。
+
+差分再監査（core.incremental）では、取引ごとに加減算できる集計（月別合計・件数など）を
+new_partial() / fold_partial() / finish_partial() で持つチェックは、全エントリを集計し直さずに
+部分集計から結果を出す。上書きしないチェックは保持しているエントリで finish() をやり直す。
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..tax_inspector import InspectionResult
+from .matcher import NO_HITS
+
+
+class DetailContext:
+    """明細1件分の共通情報（全チェックで共有し、1回だけ計算する）"""
+
+    __slots__ = (
+        "deal", "detail", "deal_id", "deal_type", "issue_date",
+        "account_id", "account_name", "account_flags", "amount", "tax_code",
+        "description", "keyword_hits",
+    )
+
+    def __init__(self, deal: Dict, detail: Dict, account: Tuple[str, int]):
+        self.deal = deal
+        self.detail = detail
+        self.deal_id = deal.get('id')
+        self.deal_type = deal.get('type')
+        self.issue_date = deal['issue_date']
+        self.account_id = detail.get('account_item_id')
+        # 勘定科目は TaxInspector.account_index で分類済み（科目名の部分一致は不要）
+        self.account_name, self.account_flags = account
+        self.amount = detail.get('amount', 0)
+        self.tax_code = detail.get('tax_code')
+        self.description = detail.get('description') or ''
+        # 摘要キーワードのヒット（チェック番号 → キーワード）。エンジンが KeywordMatcher で設定
+        self.keyword_hits = NO_HITS
+
+
+class BaseCheck:
+    """
+    チェックの基底クラス
+
+    Attributes:
+        code: チェック番号（"01"〜"20"、参考情報は "summary"）
+        name: チェック名
+        deal_types: 対象の取引種別（None なら全種別）。対象外の明細は配信されない
+        account_mask: 対象の勘定科目の分類（AccountCategory の OR。0 なら全科目）。
+            レジストリの RuleSpec.accounts から設定され、どれにも該当しない科目の明細は配信されない
+        DESCRIPTION_KEYWORDS: 摘要の照合キーワード（先頭ほど優先）。
+            ヒットすると ctx.keyword_hits[code] に最優先のキーワードが入る
+    """
+
+    code: str = ""
+    name: str = ""
+    deal_types: Optional[Tuple[str, ...]] = None
+    account_mask: int = 0
+    DESCRIPTION_KEYWORDS: Optional[List[str]] = None
+
+    def __init__(self, inspector, params: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            inspector: 呼び出し元の TaxInspector（勘定科目マップ等を参照）
+            params: inspect_all の引数（fiscal_year_start, period_boundary, bank_data）
+        """
+        self.inspector = inspector
+        self.params = params or {}
+
+    def applies(self) -> bool:
+        """このチェックを実行するか（パラメータ不足なら False）"""
+        return True
+
+    def visit(self, ctx: DetailContext) -> Any:
+        """明細1件を受け取り、集計対象ならエントリを返す"""
+        return None
+
+    def finish(self, entries: List[Any], out: InspectionResult) -> None:
+        """エントリを集計して out に details / issues を書き込む"""
+        raise NotImplementedError
+
+    def collect_columnar(self, ledger) -> List[Any]:
+        """列指向台帳から visit() と同じエントリを一括抽出"""
+        raise NotImplementedError
+
+    def evaluate_columnar(self, ledger, out: InspectionResult) -> None:
+        """列指向台帳で集計（既定は collect_columnar() → finish()）"""
+        self.finish(self.collect_columnar(ledger), out)
+
+    def new_partial(self) -> Any:
+        """差分再監査用の空の部分集計（None なら部分集計に対応しない）"""
+        return None
+
+    def fold_partial(self, partial: Any, entries: List[Any], sign: int) -> None:
+        """1取引分のエントリを部分集計に加える（sign=1）/ 取り除く（sign=-1）"""
+        raise NotImplementedError
+
+    def finish_partial(self, partial: Any, out: InspectionResult) -> bool:
+        """
+        部分集計から finish() と同じ結果を書き込む
+
+        Returns:
+            False なら書き込まずに finish() での集計に任せる（部分集計だけでは並び順が決まらない場合など）
+        """
+        raise NotImplementedError
@@ -0,0 +1,122 @@
+"""
+【消費税】15-17: インボイス後の重点項目
+"""
+from ..tax_inspector import AccountCategory, Issue, RiskLevel
+from .base import BaseCheck
+
+
+class TaxCodeErrorCheck(BaseCheck):
+    """15. 税区分エラー: 経費が課税売上で登録"""
+
+    code = "15"
+    name = "税区分エラー"
+    deal_types = ('expense',)
+
+    def visit(self, ctx):
+        if ctx.tax_code == 21:  # 課税売上10%
+            return {
+                'date': ctx.issue_date,
+                'amount': ctx.amount,
+                'account': ctx.account_name,
+            }
+        return None
+
+    def collect_columnar(self, ledger):
+        rows = ledger.select(self.deal_types)
+        rows = rows[rows["tax_code"].isin([21])]
+        return ledger.records(rows, date="date", amount="amount", account="account_name")
+
+    def finish(self, entries, out):
+        self._report(len(entries), out)
+
+    def new_partial(self):
+        return [0]  # 件数
+
+    def fold_partial(self, partial, entries, sign):
+        partial[0] += sign * len(entries)
+
+    def finish_partial(self, partial, out):
+        self._report(partial[0], out)
+        return True
+
+    def _report(self, count, out):
+        out.details['15_tax_code'] = count
+        if count:
+            out.errors += 1
+            out.issues.append(Issue(
+                category="15.税区分",
+                title="経費が課税売上で登録",
+                description=f"{count}件 | 税区分:21→136に修正",
+                risk_level=RiskLevel.HIGH,
+                suggestion="消費税の計算が狂う。修正必須",
+                auto_fixable=True
+            ))
+
+
+class ReducedTaxErrorCheck(BaseCheck):
+    """16. 軽減税率の誤適用: 飲食料品以外に8%適用"""
+
+    code = "16"
+    name = "軽減税率の誤適用"
+
+    def visit(self, ctx):
+        if ctx.tax_code in [23, 138]:  # 軽減税率8%
+            # 飲食料品以外で軽減税率
+            if not ctx.account_flags & AccountCategory.FOOD:
+                return {
+                    'date': ctx.issue_date,
+                    'amount': ctx.amount,
+                    'account': ctx.account_name,
+                }
+        return None
+
+    def collect_columnar(self, ledger):
+        rows = ledger.select(self.deal_types)
+        rows = rows[rows["tax_code"].isin([23, 138]) & ~ledger.has_flag(rows, AccountCategory.FOOD)]
+        return ledger.records(rows, date="date", amount="amount", account="account_name")
+
+    def finish(self, entries, out):
+        out.details['16_reduced_tax'] = entries
+        if entries:
+            out.warnings += 1
+            out.issues.append(Issue(
+                category="16.軽減税率",
+                title="軽減税率の適用確認",
+                description=f"{len(entries)}件の8%適用（飲食料品以外？）",
+                risk_level=RiskLevel.MEDIUM,
+                suggestion="飲食料品以外は10%。2%の差額追徴リスク"
+            ))
+
+
+class InvoiceDenialCheck(BaseCheck):
+    """17. 仕入税額控除の否認: 30万円超でインボイスなし"""
+
+    code = "17"
+    name = "仕入税額控除の否認"
+    deal_types = ('expense',)
+
+    def visit(self, ctx):
+        if ctx.tax_code in [136, 138] and ctx.amount >= 300000:
+            return {
+                'date': ctx.issue_date,
+                'amount': ctx.amount,
+                'account': ctx.account_name,
+            }
+        return None
+
+    def collect_columnar(self, ledger):
+        rows = ledger.select(self.deal_types)
+        rows = rows[rows["tax_code"].isin([136, 138]) & (rows["amount"] >= 300000)]
+        return ledger.records(rows, date="date", amount="amount", account="account_name")
+
+    def finish(self, entries, out):
+        out.details['17_invoice'] = entries
+        if entries:
+            out.warnings += 1
+            out.issues.append(Issue(
+                category="17.インボイス",
+                title="高額課税仕入のインボイス確認",
+                description=f"{len(entries)}件の30万円以上の課税仕入",
+                risk_level=RiskLevel.MEDIUM,
+                suggestion="インボイス(T+13桁)の保管確認。なければ仕入税額控除否認"
+            ))
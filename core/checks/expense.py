@@ -0,0 +1,179 @@
+"""
+【経費】11-14: 否認されやすい項目
+"""
+from ..tax_inspector import AccountCategory, Issue, RiskLevel
+from .base import BaseCheck
+
+
+class EntertainmentCheck(BaseCheck):
+    """11. 交際費の損金不算入: 800万円超・5万円超"""
+
+    code = "11"
+    name = "交際費の損金不算入"
+
+    # 1件あたりの記録が必要になる金額
+    LARGE_AMOUNT = 50000
+
+    def visit(self, ctx):
+        if ctx.account_flags & AccountCategory.ENTERTAINMENT:
+            return ctx.amount
+        return None
+
+    def collect_columnar(self, ledger):
+        rows = ledger.select(self.deal_types)
+        return rows["amount"][ledger.has_flag(rows, AccountCategory.ENTERTAINMENT)].tolist()
+
+    def finish(self, entries, out):
+        large = sum(1 for amount in entries if amount >= self.LARGE_AMOUNT)
+        self._report(sum(entries), len(entries), large, out)
+
+    def new_partial(self):
+        return [0, 0, 0]  # [合計, 件数, 5万円超の件数]
+
+    def fold_partial(self, partial, entries, sign):
+        for amount in entries:
+            partial[0] += sign * amount
+            partial[1] += sign
+            if amount >= self.LARGE_AMOUNT:
+                partial[2] += sign
+
+    def finish_partial(self, partial, out):
+        self._report(*partial, out)
+        return True
+
+    def _report(self, total, count, large, out):
+        out.details['11_entertainment'] = {'total': total, 'count': count}
+
+        if total > 8000000:
+            out.errors += 1
+            out.issues.append(Issue(
+                category="11.交際費",
+                title="交際費が年800万円超",
+                description=f"合計: {total:,}円（超過分は損金不算入）",
+                risk_level=RiskLevel.HIGH,
+                suggestion="飲食費50%特例の適用検討"
+            ))
+        if large:
+            out.warnings += 1
+            out.issues.append(Issue(
+                category="11.交際費",
+                title="5万円超の交際費",
+                description=f"{large}件（参加者・目的の記録必要）",
+                risk_level=RiskLevel.MEDIUM,
+                suggestion="議事録・参加者リストを保管"
+            ))
+
+
+class PrivateExpenseCheck(BaseCheck):
+    """12. 私的経費の混入: 休日・家族名"""
+
+    code = "12"
+    name = "私的経費の混入"
+
+    DESCRIPTION_KEYWORDS = ['家族', '私用', '個人', '自宅']
+
+    def visit(self, ctx):
+        # キーワードマッチ
+        if self.code in ctx.keyword_hits:
+            return {
+                'date': ctx.issue_date,
+                'amount': ctx.amount,
+                'desc': ctx.description.lower(),
+            }
+        return None
+
+    def collect_columnar(self, ledger):
+        rows = ledger.select(self.deal_types)
+        rows = rows[ledger.keyword_hits(rows, self.code).notna()]
+        entries = ledger.records(rows, date="date", amount="amount", desc="description")
+        for entry in entries:
+            entry['desc'] = entry['desc'].lower()
+        return entries
+
+    def finish(self, entries, out):
+        out.details['12_private'] = entries
+        if entries:
+            out.errors += 1
+            out.issues.append(Issue(
+                category="12.私的経費",
+                title="私的経費の混入疑い",
+                description=f"{len(entries)}件に「家族」「私用」等のキーワード",
+                risk_level=RiskLevel.HIGH,
+                suggestion="私的経費は全額損金不算入＋給与課税"
+            ))
+
+
+class FakeExpenseCheck(BaseCheck):
+    """13. 架空経費: 摘要なし・同一取引先への集中"""
+
+    code = "13"
+    name = "架空経費"
+    deal_types = ('expense',)
+
+    def visit(self, ctx):
+        if not ctx.description and ctx.amount >= 100000:
+            return {
+                'date': ctx.issue_date,
+                'amount': ctx.amount,
+                'account': ctx.account_name,
+            }
+        return None
+
+    def collect_columnar(self, ledger):
+        rows = ledger.select(self.deal_types)
+        rows = rows[(rows["description"] == '') & (rows["amount"] >= 100000)]
+        return ledger.records(rows, date="date", amount="amount", account="account_name")
+
+    def finish(self, entries, out):
+        out.details['13_fake_expense'] = entries
+        if entries:
+            total = sum(e['amount'] for e in entries)
+            out.errors += 1
+            out.issues.append(Issue(
+                category="13.架空経費",
+                title="摘要なし高額経費",
+                description=f"{len(entries)}件 / 合計: {total:,}円",
+                risk_level=RiskLevel.HIGH,
+                suggestion="架空経費と認定されると重加算税35%"
+            ))
+
+
+class InventoryOmissionCheck(BaseCheck):
+    """14. 在庫計上漏れ: 期末に仕入があるのに在庫ゼロ"""
+
+    code = "14"
+    name = "在庫計上漏れ"
+
+    def visit(self, ctx):
+        flags = ctx.account_flags
+        if flags & (AccountCategory.PURCHASE | AccountCategory.INVENTORY):
+            return (bool(flags & AccountCategory.PURCHASE),
+                    bool(flags & AccountCategory.INVENTORY),
+                    ctx.amount)
+        return None
+
+    def collect_columnar(self, ledger):
+        rows = ledger.select(self.deal_types)
+        is_purchase = ledger.has_flag(rows, AccountCategory.PURCHASE)
+        is_inventory = ledger.has_flag(rows, AccountCategory.INVENTORY)
+        matched = is_purchase | is_inventory
+        return list(zip(is_purchase[matched].tolist(), is_inventory[matched].tolist(),
+                        rows["amount"][matched].tolist()))
+
+    def finish(self, entries, out):
+        total_purchase = sum(amount for is_purchase, _, amount in entries if is_purchase)
+        has_inventory = any(is_inventory for _, is_inventory, _ in entries)
+        out.details['14_inventory'] = {
+            'total_purchase': total_purchase,
+            'has_inventory': has_inventory
+        }
+
+        if total_purchase > 1000000 and not has_inventory:
+            out.warnings += 1
+            out.issues.append(Issue(
+                category="14.在庫漏れ",
+                title="仕入があるのに在庫計上なし",
+                description=f"仕入合計: {total_purchase:,}円 | 棚卸資産の計上なし",
+                risk_level=RiskLevel.MEDIUM,
+                suggestion="飲食・小売は期末在庫の計上必須"
+            ))
@@ -0,0 +1,74 @@
+"""
+摘要キーワードの一括マッチャー
+
+複数チェックのキーワード（ファミリー）を1本の正規表現にまとめ、
+摘要を1回走査するだけでヒットした全ファミリーを返す。
+定期取引は同じ摘要が何千回も繰り返されるため、結果は摘要文字列ごとにキャッシュする。
+"""
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, Sequence, Tuple
+
+# ヒットなしの共有結果（呼び出し側は変更しないこと）
+NO_HITS: Dict[str, str] = {}
+
+
+class KeywordMatcher:
+    """
+    摘要キーワードの一括マッチャー
+
+    先読み付きの選択 (?=(kw1|kw2|...)) を全位置で評価し、各位置で最長のキーワードを得る。
+    短いキーワードは最長キーワードの部分文字列として補完するため、
+    「親族」の中の「親」のような重なりも取りこぼさない。
+    摘要は小文字化してから照合する（キーワード側は小文字で定義すること）。
+    """
+
+    def __init__(self, families: Sequence[Tuple[str, Sequence[str]]], cache_size: int = 100_000):
+        """
+        Args:
+            families: (ファミリー名, キーワードリスト) の並び。リスト内の順序が優先順位
+            cache_size: 摘要ごとの結果キャッシュ件数上限
+        """
+        self.families = [(name, list(keywords)) for name, keywords in families]
+        keywords = sorted({kw for _, kws in self.families for kw in kws},
+                          key=lambda kw: (-len(kw), kw))
+        self._pattern = re.compile(
+            "(?=(" + "|".join(re.escape(kw) for kw in keywords) + "))"
+        ) if keywords else None
+        # キーワード → そのキーワードに含まれる全キーワード（自身を含む）
+        self._contained = {kw: frozenset(k for k in keywords if k in kw) for kw in keywords}
+        self.match = lru_cache(maxsize=cache_size)(self._match)
+
+    def _match(self, description: str) -> Dict[str, str]:
+        """摘要にヒットしたファミリー → ファミリー内で最優先のキーワード"""
+        if not description or self._pattern is None:
+            return NO_HITS
+
+        found = set()
+        for m in self._pattern.finditer(description.lower()):
+            found |= self._contained[m.group(1)]
+        if not found:
+            return NO_HITS
+
+        hits = {}
+        for name, keywords in self.families:
+            for kw in keywords:
+                if kw in found:
+                    hits[name] = kw
+                    break
+        return hits or NO_HITS
+
+
+@lru_cache(maxsize=16)
+def _cached_matcher(families: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> KeywordMatcher:
+    return KeywordMatcher(families)
+
+
+def get_matcher(families: Iterable[Tuple[str, Sequence[str]]]) -> KeywordMatcher:
+    """
+    ファミリー構成ごとに共有のマッチャーを取得
+
+    同じチェック構成なら監査をまたいで摘要キャッシュを再利用する。
+    """
+    key = tuple((name, tuple(keywords)) for name, keywords in families)
+    return _cached_matcher(key)
@@ -0,0 +1,173 @@
+"""
+【役員関連】7-10: 損金不算入の宝庫
+"""
+from collections import defaultdict
+
+from ..tax_inspector import AccountCategory, Issue, RiskLevel
+from .base import BaseCheck
+
+
+class OfficerCompensationChangeCheck(BaseCheck):
+    """7. 役員報酬の期中変更: 定期同額違反"""
+
+    code = "07"
+    name = "役員報酬の期中変更"
+
+    def visit(self, ctx):
+        if ctx.account_flags & AccountCategory.OFFICER_COMPENSATION:
+            return (ctx.issue_date[:7], ctx.amount)
+        return None
+
+    def evaluate_columnar(self, ledger, out):
+        rows = ledger.select(self.deal_types)
+        rows = rows[ledger.has_flag(rows, AccountCategory.OFFICER_COMPENSATION)]
+        # 月別集計
+        monthly = rows["amount"].groupby(ledger.months(rows), sort=False).sum()
+        self._report({month: int(amount) for month, amount in monthly.items()}, out)
+
+    def finish(self, entries, out):
+        # 月別集計
+        monthly = defaultdict(int)
+        for month, amount in entries:
+            monthly[month] += amount
+
+        self._report(dict(monthly), out)
+
+    def new_partial(self):
+        return {}  # 月 → [合計, 件数]
+
+    def fold_partial(self, partial, entries, sign):
+        for month, amount in entries:
+            total = partial.setdefault(month, [0, 0])
+            total[0] += sign * amount
+            total[1] += sign
+            if not total[1]:
+                del partial[month]
+
+    def finish_partial(self, partial, out):
+        # エントリは日付順なので finish() の月別集計も月の昇順になる
+        self._report({month: total[0] for month, total in sorted(partial.items())}, out)
+        return True
+
+    def _report(self, monthly, out):
+        out.details['07_officer_compensation'] = monthly
+
+        # 期首3ヶ月以降で変動があるか
+        sorted_months = sorted(monthly.items())
+        if len(sorted_months) > 3:
+            main_amounts = [amt for _, amt in sorted_months[3:]]
+            if len(set(main_amounts)) > 1:
+                out.errors += 1
+                out.issues.append(Issue(
+                    category="07.役員報酬",
+                    title="役員報酬の期中変更",
+                    description=f"期首3ヶ月以降で変動: {sorted(set(main_amounts))}",
+                    risk_level=RiskLevel.HIGH,
+                    suggestion="臨時改定事由の議事録がなければ損金不算入"
+                ))
+
+
+class OfficerBonusCheck(BaseCheck):
+    """8. 役員賞与（届出なし）: 全額損金不算入"""
+
+    code = "08"
+    name = "役員賞与"
+
+    def visit(self, ctx):
+        if ctx.account_flags & AccountCategory.OFFICER_BONUS:
+            return {
+                'date': ctx.issue_date,
+                'amount': ctx.amount,
+            }
+        return None
+
+    def collect_columnar(self, ledger):
+        rows = ledger.select(self.deal_types)
+        rows = rows[ledger.has_flag(rows, AccountCategory.OFFICER_BONUS)]
+        return ledger.records(rows, date="date", amount="amount")
+
+    def finish(self, entries, out):
+        out.details['08_officer_bonus'] = entries
+        if entries:
+            total = sum(b['amount'] for b in entries)
+            out.errors += 1
+            out.issues.append(Issue(
+                category="08.役員賞与",
+                title="役員賞与あり（届出確認）",
+                description=f"{len(entries)}件 / 合計: {total:,}円",
+                risk_level=RiskLevel.HIGH,
+                suggestion="事前確定届出給与の届出書がなければ全額損金不算入"
+            ))
+
+
+class OfficerLoanCheck(BaseCheck):
+    """9. 役員貸付金: 認定利息・給与認定"""
+
+    code = "09"
+    name = "役員貸付金"
+
+    def visit(self, ctx):
+        if ctx.account_flags & AccountCategory.OFFICER_LOAN:
+            return (ctx.deal_type, ctx.amount)
+        return None
+
+    def collect_columnar(self, ledger):
+        rows = ledger.select(self.deal_types)
+        rows = rows[ledger.has_flag(rows, AccountCategory.OFFICER_LOAN)]
+        return list(zip(rows["type"].tolist(), rows["amount"].tolist()))
+
+    def finish(self, entries, out):
+        # 残高計算
+        balance = sum(amount for tx_type, amount in entries if tx_type == 'expense') - \
+                  sum(amount for tx_type, amount in entries if tx_type == 'income')
+
+        out.details['09_officer_loans'] = {'balance': balance, 'count': len(entries)}
+
+        if balance > 0:
+            out.errors += 1
+            out.issues.append(Issue(
+                category="09.役員貸付",
+                title="役員貸付金残高あり",
+                description=f"残高: {balance:,}円 | 認定利息(年1%程度)の計上が必要",
+                risk_level=RiskLevel.HIGH,
+                suggestion="長期滞留・使途不明は役員賞与認定リスク"
+            ))
+
+
+class OfficerBenefitCheck(BaseCheck):
+    """10. 役員への経済的利益: 社宅・保険の過大負担"""
+
+    code = "10"
+    name = "役員への経済的利益"
+
+    # 摘要側のキーワード（科目名側は AccountCategory.BENEFIT で分類済み）
+    DESCRIPTION_KEYWORDS = ['社宅', '保険', '車両', '福利厚生']
+
+    def visit(self, ctx):
+        if ctx.amount < 50000:
+            return None
+        if ctx.account_flags & AccountCategory.BENEFIT or self.code in ctx.keyword_hits:
+            return {
+                'date': ctx.issue_date,
+                'amount': ctx.amount,
+                'account': ctx.account_name,
+            }
+        return None
+
+    def collect_columnar(self, ledger):
+        rows = ledger.select(self.deal_types)
+        matched = ledger.has_flag(rows, AccountCategory.BENEFIT) | ledger.keyword_hits(rows, self.code).notna()
+        rows = rows[(rows["amount"] >= 50000) & matched]
+        return ledger.records(rows, date="date", amount="amount", account="account_name")
+
+    def finish(self, entries, out):
+        out.details['10_officer_benefit'] = entries
+        if entries:
+            out.warnings += 1
+            out.issues.append(Issue(
+                category="10.経済的利益",
+                title="役員への経済的利益の可能性",
+                description=f"{len(entries)}件の社宅・保険等の支出",
+                risk_level=RiskLevel.MEDIUM,
+                suggestion="社宅は賃貸料相当額、保険は受取人要確認"
+            ))
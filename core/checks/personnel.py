@@ -0,0 +1,142 @@
+"""
+【人件費】4-6: 架空・水増しは重加算税
+"""
+from collections import defaultdict
+
+from ..tax_inspector import AccountCategory, Issue, RiskLevel
+from .base import BaseCheck
+
+
+class FakePersonnelCheck(BaseCheck):
+    """4. 架空人件費: 支払先不明・摘要なし"""
+
+    code = "04"
+    name = "架空人件費"
+
+    def visit(self, ctx):
+        if ctx.account_flags & AccountCategory.PERSONNEL:
+            return {
+                'date': ctx.issue_date,
+                'amount': ctx.amount,
+                'desc': ctx.description,
+                'account': ctx.account_name,
+                'id': ctx.deal['id']
+            }
+        return None
+
+    def collect_columnar(self, ledger):
+        rows = ledger.select(self.deal_types)
+        rows = rows[ledger.has_flag(rows, AccountCategory.PERSONNEL)]
+        return ledger.records(rows, date="date", amount="amount", desc="description",
+                              account="account_name", id="deal_id")
+
+    def finish(self, entries, out):
+        no_desc = [e for e in entries if not e['desc'] and e['amount'] >= 50000]
+
+        out.details['04_personnel'] = {'total': len(entries), 'no_desc': len(no_desc)}
+
+        if no_desc:
+            out.errors += 1
+            out.issues.append(Issue(
+                category="04.架空人件費",
+                title="支払先不明の人件費",
+                description=f"{len(no_desc)}件の5万円以上の人件費に摘要なし",
+                risk_level=RiskLevel.HIGH,
+                suggestion="架空人件費と認定されると重加算税35%の対象"
+            ))
+
+
+class OutsourcingAsSalaryCheck(BaseCheck):
+    """5. 外注費の給与認定: 毎月同額・特定1社への継続支払"""
+
+    code = "05"
+    name = "外注費の給与認定"
+
+    def visit(self, ctx):
+        if ctx.account_flags & AccountCategory.OUTSOURCING:
+            return (ctx.description[:30], ctx.issue_date[:7], ctx.amount)
+        return None
+
+    def evaluate_columnar(self, ledger, out):
+        rows = ledger.select(self.deal_types)
+        rows = rows[ledger.has_flag(rows, AccountCategory.OUTSOURCING)]
+
+        # 摘要(先頭30文字)×月 の合計 → 摘要ごとの月数・金額の種類数・最初の月の金額
+        monthly = rows["amount"].groupby(
+            [rows["description"].astype(str).str[:30], ledger.months(rows)], sort=False
+        ).sum()
+        per_desc = monthly.groupby(level=0, sort=False).agg(['size', 'nunique', 'first'])
+
+        # 毎月同額パターン（給与性が疑われる）
+        wage_like = [
+            {'desc': desc, 'amount': int(row['first']), 'months': int(row['size'])}
+            for desc, row in per_desc[(per_desc['size'] >= 3) & (per_desc['nunique'] == 1)].iterrows()
+        ]
+        self._report(int(rows["amount"].sum()), len(rows), wage_like, out)
+
+    def finish(self, entries, out):
+        monthly_by_desc = defaultdict(lambda: defaultdict(int))
+        total = 0
+        for desc, month, amount in entries:
+            monthly_by_desc[desc][month] += amount
+            total += amount
+
+        # 毎月同額パターン（給与性が疑われる）
+        wage_like = []
+        for desc, months in monthly_by_desc.items():
+            if len(months) >= 3:
+                amounts = list(months.values())
+                if len(set(amounts)) == 1:  # 全月同額
+                    wage_like.append({'desc': desc, 'amount': amounts[0], 'months': len(months)})
+
+        self._report(total, len(entries), wage_like, out)
+
+    def _report(self, total, count, wage_like, out):
+        out.details['05_outsourcing'] = {
+            'total': total,
+            'count': count,
+            'wage_like': wage_like
+        }
+
+        if wage_like:
+            out.errors += 1
+            out.issues.append(Issue(
+                category="05.外注費→給与",
+                title="外注費の給与認定リスク",
+                description=f"{len(wage_like)}件の毎月定額外注（{wage_like[0]['desc']}等）",
+                risk_level=RiskLevel.HIGH,
+                suggestion="給与認定→源泉税+不納付加算税10%+社保遡及のリスク"
+            ))
+
+
+class WithholdingOmissionCheck(BaseCheck):
+    """6. 源泉徴収漏れ: 報酬・料金で源泉税の計上なし"""
+
+    code = "06"
+    name = "源泉徴収漏れ"
+
+    def visit(self, ctx):
+        if ctx.account_flags & AccountCategory.WITHHOLDING and ctx.amount >= 50000:
+            return {
+                'date': ctx.issue_date,
+                'amount': ctx.amount,
+                'account': ctx.account_name,
+            }
+        return None
+
+    def collect_columnar(self, ledger):
+        rows = ledger.select(self.deal_types)
+        rows = rows[ledger.has_flag(rows, AccountCategory.WITHHOLDING) & (rows["amount"] >= 50000)]
+        return ledger.records(rows, date="date", amount="amount", account="account_name")
+
+    def finish(self, entries, out):
+        out.details['06_withholding'] = entries
+        if entries:
+            out.warnings += 1
+            out.issues.append(Issue(
+                category="06.源泉漏れ",
+                title="源泉徴収対象の可能性",
+                description=f"{len(entries)}件の報酬・料金（個人への支払は源泉必要）",
+                risk_level=RiskLevel.MEDIUM,
+                suggestion="法人への支払なら不要。個人なら10.21%源泉"
+            ))
@@ -0,0 +1,41 @@
+"""
+【帳簿】20: 基本だが重要
+"""
+from ..tax_inspector import Issue, RiskLevel
+from .base import BaseCheck
+
+
+class PoorRecordsCheck(BaseCheck):
+    """20. 帳簿不備・説明不能: 高額取引で摘要なし"""
+
+    code = "20"
+    name = "帳簿不備"
+
+    def visit(self, ctx):
+        if not ctx.description and ctx.amount >= 50000:
+            return {
+                'date': ctx.issue_date,
+                'amount': ctx.amount,
+                'account': ctx.account_name,
+            }
+        return None
+
+    def collect_columnar(self, ledger):
+        rows = ledger.select(self.deal_types)
+        rows = rows[(rows["description"] == '') & (rows["amount"] >= 50000)]
+        return ledger.records(rows, date="date", amount="amount", account="account_name")
+
+    def finish(self, entries, out):
+        poor = sorted(entries, key=lambda x: -x['amount'])
+        out.details['20_poor_records'] = poor[:30]
+
+        if len(poor) > 20:
+            out.warnings += 1
+            out.issues.append(Issue(
+                category="20.帳簿不備",
+                title="摘要なし高額取引が多数",
+                description=f"{len(poor)}件の5万円以上の取引に摘要なし",
+                risk_level=RiskLevel.MEDIUM,
+                suggestion="税務調査では「何のための支出か」が必ず問われる"
+            ))
+
@@ -0,0 +1,185 @@
+"""
+チェックのレジストリ
+
+各チェックの番号・名称・実装の場所（モジュールとクラス名）と、必要とする勘定科目の分類・
+明細の項目・処理コスト・既定で実行するかを宣言する。チェックのモジュールは実行するときに
+初めて読み込むため、消費税だけの確認（checks=["15", "16", "17"]）で他のチェックは読み込まない。
+
+    specs = get_rules(["15", "16", "17"])        # 宣言だけ（モジュールは読み込まない）
+    classes = load_checks(["15", "16", "17"])     # 該当モジュールだけを読み込んでクラスを返す
+
+拡張のチェックは register() で追加する（同じ番号なら置き換え）。
+
+    register(RuleSpec("21", "独自チェック", "mypkg.rules", "MyCheck", cost=COST_LIGHT))
+"""
+import importlib
+import threading
+from dataclasses import dataclass, replace
+from typing import Iterable, List, Tuple, Type, Union
+
+from ..tax_inspector import AccountCategory
+
+# 処理コストの区分
+COST_LIGHT = "light"    # 明細の判定と件数・合計の集計だけ
+COST_HEAVY = "heavy"    # 銀行明細との突合など、明細の走査以外にも時間がかかる
+
+
+@dataclass(frozen=True)
+class RuleSpec:
+    """
+    チェックの宣言
+
+    Attributes:
+        code: チェック番号（"01"〜"20"、参考情報は "summary"）
+        name: チェック名
+        module: 実装のモジュール（"." で始まれば core.checks からの相対）
+        class_name: 実装のクラス名（BaseCheck のサブクラス）
+        accounts: 明細を受け取る勘定科目の分類（AccountCategory の属性名）。
+            指定すると、どれにも該当しない科目の明細は配信しない（空なら全科目）
+        fields: visit() が参照する明細の項目（DetailContext の属性名）
+        cost: 処理コストの区分（COST_LIGHT / COST_HEAVY）
+        enabled: 既定で実行するか（False でもチェック番号を指定すれば実行する）
+    """
+    code: str
+    name: str
+    module: str
+    class_name: str
+    accounts: Tuple[str, ...] = ()
+    fields: Tuple[str, ...] = ()
+    cost: str = COST_LIGHT
+    enabled: bool = True
+
+    @property
+    def account_mask(self) -> int:
+        """accounts の分類ビットの OR（0 なら全科目）"""
+        mask = 0
+        for name in self.accounts:
+            mask |= getattr(AccountCategory, name)
+        return mask
+
+    def load(self) -> Type:
+        """実装のクラス（このときモジュールを読み込む）"""
+        module = importlib.import_module(self.module, __package__)
+        return getattr(module, self.class_name)
+
+    def to_dict(self) -> dict:
+        return {
+            'code': self.code,
+            'name': self.name,
+            'accounts': list(self.accounts),
+            'fields': list(self.fields),
+            'cost': self.cost,
+            'enabled': self.enabled,
+        }
+
+
+# 実行順（結果もこの順で出力する）
+RULES: List[RuleSpec] = [
+    # 【売上・現金】1-3
+    RuleSpec("01", "売上計上漏れ", ".sales", "SalesOmissionCheck",
+             fields=("deal_id", "issue_date", "amount"), cost=COST_HEAVY),
+    RuleSpec("02", "現金売上の除外", ".sales", "CashSalesExclusionCheck",
+             accounts=("CASH",), fields=("issue_date", "amount", "deal_type", "description")),
+    RuleSpec("03", "期ズレ", ".sales", "PeriodShiftCheck",
+             fields=("issue_date", "amount")),
+    # 【人件費】4-6
+    RuleSpec("04", "架空人件費", ".personnel", "FakePersonnelCheck",
+             accounts=("PERSONNEL",), fields=("deal_id", "issue_date", "amount", "account_name", "description")),
+    RuleSpec("05", "外注費の給与認定", ".personnel", "OutsourcingAsSalaryCheck",
+             accounts=("OUTSOURCING",), fields=("issue_date", "amount", "description")),
+    RuleSpec("06", "源泉徴収漏れ", ".personnel", "WithholdingOmissionCheck",
+             accounts=("WITHHOLDING",), fields=("issue_date", "amount", "account_name")),
+    # 【役員関連】7-10
+    RuleSpec("07", "役員報酬の期中変更", ".officer", "OfficerCompensationChangeCheck",
+             accounts=("OFFICER_COMPENSATION",), fields=("issue_date", "amount")),
+    RuleSpec("08", "役員賞与", ".officer", "OfficerBonusCheck",
+             accounts=("OFFICER_BONUS",), fields=("issue_date", "amount")),
+    RuleSpec("09", "役員貸付金", ".officer", "OfficerLoanCheck",
+             accounts=("OFFICER_LOAN",), fields=("deal_type", "amount")),
+    RuleSpec("10", "役員への経済的利益", ".officer", "OfficerBenefitCheck",
+             fields=("issue_date", "amount", "account_name", "account_flags", "keyword_hits")),
+    # 【経費】11-14
+    RuleSpec("11", "交際費の損金不算入", ".expense", "EntertainmentCheck",
+             accounts=("ENTERTAINMENT",), fields=("amount",)),
+    RuleSpec("12", "私的経費の混入", ".expense", "PrivateExpenseCheck",
+             fields=("issue_date", "amount", "description", "keyword_hits")),
+    RuleSpec("13", "架空経費", ".expense", "FakeExpenseCheck",
+             fields=("issue_date", "amount", "account_name", "description")),
+    RuleSpec("14", "在庫計上漏れ", ".expense", "InventoryOmissionCheck",
+             accounts=("PURCHASE", "INVENTORY"), fields=("account_flags", "amount")),
+    # 【消費税】15-17
+    RuleSpec("15", "税区分エラー", ".consumption_tax", "TaxCodeErrorCheck",
+             fields=("issue_date", "amount", "account_name", "tax_code")),
+    RuleSpec("16", "軽減税率の誤適用", ".consumption_tax", "ReducedTaxErrorCheck",
+             fields=("issue_date", "amount", "account_name", "account_flags", "tax_code")),
+    RuleSpec("17", "仕入税額控除の否認", ".consumption_tax", "InvoiceDenialCheck",
+             fields=("issue_date", "amount", "account_name", "tax_code")),
+    # 【関係者取引】18-19
+    RuleSpec("18", "関係者への高額支払", ".related_party", "RelatedPartyPaymentCheck",
+             fields=("issue_date", "amount", "keyword_hits")),
+    RuleSpec("19", "関係者からの低額仕入", ".related_party", "RelatedPartyPurchaseCheck",
+             fields=("issue_date", "amount", "keyword_hits")),
+    # 【帳簿】20
+    RuleSpec("20", "帳簿不備", ".records", "PoorRecordsCheck",
+             fields=("issue_date", "amount", "account_name", "description")),
+    # 勘定科目別集計（参考情報）
+    RuleSpec("summary", "勘定科目別集計", ".summary", "AccountSummary",
+             fields=("account_name", "amount")),
+]
+
+_lock = threading.Lock()
+
+
+def register(spec: RuleSpec) -> None:
+    """チェックを登録（同じ番号があれば置き換え、なければ末尾に追加）"""
+    with _lock:
+        for i, current in enumerate(RULES):
+            if current.code == spec.code:
+                RULES[i] = spec
+                return
+        RULES.append(spec)
+
+
+def set_enabled(code: str, enabled: bool = True) -> None:
+    """既定で実行するかを切り替える"""
+    with _lock:
+        for i, current in enumerate(RULES):
+            if current.code == code:
+                RULES[i] = replace(current, enabled=enabled)
+                return
+    raise ValueError(f"不明なチェック番号: {code}")
+
+
+def get_rules(codes: Union[str, Iterable[str], None] = None) -> List[RuleSpec]:
+    """
+    実行するチェックの宣言（実行順）
+
+    Args:
+        codes: チェック番号（None なら enabled のもの全て）。数字は "1" も "01" も可。
+            文字列1つならカンマ区切り（"15,16,17"）。並びや重複に関わらず実行順で返す
+
+    Raises:
+        ValueError: 登録されていないチェック番号
+    """
+    rules = list(RULES)
+    if codes is None:
+        return [spec for spec in rules if spec.enabled]
+
+    if isinstance(codes, str):
+        # 文字列を1文字ずつのチェック番号として扱わない（"15" が 01 と 05 になる）
+        codes = [code for code in codes.split(",") if code.strip()]
+    wanted = {_normalize(code) for code in codes}
+    unknown = wanted - {spec.code for spec in rules}
+    if unknown:
+        raise ValueError(f"不明なチェック番号: {', '.join(sorted(unknown))}")
+    return [spec for spec in rules if spec.code in wanted]
+
+
+def load_checks(codes: Union[str, Iterable[str], None] = None) -> List[Type]:
+    """実行するチェックのクラス（該当するモジュールだけを読み込む）"""
+    return [spec.load() for spec in get_rules(codes)]
+
+
+def _normalize(code) -> str:
+    code = str(code).strip()
+    return code.zfill(2) if code.isdigit() else code
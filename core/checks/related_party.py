@@ -0,0 +1,81 @@
+"""
+【関係者取引】18-19: 同族会社の定番指摘
+"""
+from ..tax_inspector import Issue, RiskLevel
+from .base import BaseCheck
+
+
+class RelatedPartyPaymentCheck(BaseCheck):
+    """18. 関係者への高額支払: 親族・関連会社への支出"""
+
+    code = "18"
+    name = "関係者への高額支払"
+    deal_types = ('expense',)
+
+    DESCRIPTION_KEYWORDS = ['父', '母', '親', '妻', '夫', '子', '兄', '弟', '姉', '妹',
+                            '親族', '家族', '同族', '関連']
+
+    def visit(self, ctx):
+        kw = ctx.keyword_hits.get(self.code)
+        if kw is not None:
+            return {
+                'date': ctx.issue_date,
+                'amount': ctx.amount,
+                'keyword': kw,
+            }
+        return None
+
+    def collect_columnar(self, ledger):
+        rows = ledger.select(self.deal_types)
+        rows = rows.assign(keyword=ledger.keyword_hits(rows, self.code))
+        rows = rows[rows["keyword"].notna()]
+        return ledger.records(rows, date="date", amount="amount", keyword="keyword")
+
+    def finish(self, entries, out):
+        out.details['18_related_payment'] = entries
+        if entries:
+            total = sum(r['amount'] for r in entries)
+            out.errors += 1
+            out.issues.append(Issue(
+                category="18.関係者支払",
+                title="関係者への支払検出",
+                description=f"{len(entries)}件 / 合計: {total:,}円",
+                risk_level=RiskLevel.HIGH,
+                suggestion="時価との比較・契約書で適正取引を証明"
+            ))
+
+
+class RelatedPartyPurchaseCheck(BaseCheck):
+    """19. 関係者からの低額仕入: 時価との乖離"""
+
+    code = "19"
+    name = "関係者からの低額仕入"
+    deal_types = ('income',)
+
+    # 売上で関係者キーワードを検出
+    DESCRIPTION_KEYWORDS = ['父', '母', '親', '妻', '夫', '同族', '関連']
+
+    def visit(self, ctx):
+        if self.code in ctx.keyword_hits:
+            return {
+                'date': ctx.issue_date,
+                'amount': ctx.amount,
+            }
+        return None
+
+    def collect_columnar(self, ledger):
+        rows = ledger.select(self.deal_types)
+        rows = rows[ledger.keyword_hits(rows, self.code).notna()]
+        return ledger.records(rows, date="date", amount="amount")
+
+    def finish(self, entries, out):
+        out.details['19_related_income'] = entries
+        if entries:
+            out.warnings += 1
+            out.issues.append(Issue(
+                category="19.関係者仕入",
+                title="関係者からの収入・仕入",
+                description=f"{len(entries)}件（時価との乖離確認）",
+                risk_level=RiskLevel.MEDIUM,
+                suggestion="低額譲渡は寄附金認定リスク"
+            ))
@@ -0,0 +1,143 @@
+"""
+【売上・現金】1-3: 追徴の最大要因
+"""
+from collections import defaultdict
+
+from ..reconciler import LedgerEntry, Reconciler
+from ..tax_inspector import AccountCategory, Issue, RiskLevel
+from .base import BaseCheck
+
+
+class SalesOmissionCheck(BaseCheck):
+    """1. 売上計上漏れ: 銀行入金とfreee売上の不一致"""
+
+    code = "01"
+    name = "売上計上漏れ"
+    deal_types = ('income',)
+
+    # details に載せる未対応入金の上限
+    MAX_LISTED_DEPOSITS = 30
+
+    def visit(self, ctx):
+        return (ctx.deal_id, ctx.issue_date, ctx.amount)
+
+    def collect_columnar(self, ledger):
+        rows = ledger.select(self.deal_types)
+        return [(r['deal_id'], r['date'], r['amount'])
+                for r in ledger.records(rows, deal_id="deal_id", date="date", amount="amount")]
+
+    def finish(self, entries, out):
+        total_sales = sum(amount for _, _, amount in entries)
+        out.details['01_sales'] = {'total': total_sales, 'count': len(entries)}
+
+        # 銀行データとの照合（提供された場合）
+        bank_data = self.params.get('bank_data')
+        if bank_data and bank_data.get('income_total'):
+            diff = bank_data['income_total'] - total_sales
+            if diff > 10000:  # 1万円以上の差異
+                out.errors += 1
+                out.issues.append(Issue(
+                    category="01.売上漏れ",
+                    title="銀行入金とfreee売上の不一致",
+                    description=f"銀行入金: {bank_data['income_total']:,}円 / freee売上: {total_sales:,}円 / 差額: {diff:,}円",
+                    risk_level=RiskLevel.HIGH,
+                    suggestion="売上計上漏れがないか確認。重加算税の対象になる可能性"
+                ))
+
+        # 銀行明細との突合（入金ごとに対応する売上を探す）
+        if bank_data and bank_data.get('transactions'):
+            self._reconcile(entries, bank_data, out)
+
+    def _reconcile(self, entries, bank_data, out):
+        """入金と売上取引を金額・日付で突合し、対応する売上のない入金を計上漏れ候補にする"""
+        # 売上は取引単位（明細の合計）で照合する
+        sales = {}
+        for deal_id, issue_date, amount in entries:
+            sale = sales.get(deal_id)
+            if sale is None:
+                sales[deal_id] = LedgerEntry(issue_date, amount, deal_id)
+            else:
+                sale.amount += amount
+
+        window_days = bank_data.get('window_days', Reconciler.DEFAULT_WINDOW_DAYS)
+        result = Reconciler(window_days).reconcile(bank_data['transactions'], sales.values())
+        summary = result.to_dict()
+        out.details['01_sales']['reconciliation'] = dict(summary, window_days=window_days)
+        out.details['01_unmatched_deposits'] = [
+            {'date': d.date, 'amount': d.amount, 'description': d.description}
+            for d in result.unmatched_deposits[:self.MAX_LISTED_DEPOSITS]
+        ]
+
+        if result.unmatched_deposits:
+            out.errors += 1
+            out.issues.append(Issue(
+                category="01.売上漏れ",
+                title="売上に対応しない銀行入金",
+                description=(f"{summary['unmatched_deposits']}件 / 合計{summary['unmatched_deposit_total']:,}円"
+                             f"（前後{window_days}日以内に同額の売上なし）"),
+                risk_level=RiskLevel.HIGH,
+                amount=summary['unmatched_deposit_total'],
+                suggestion="入金ごとに売上計上の有無を確認（借入・返金等の売上以外の入金は摘要で区別）"
+            ))
+
+
+class CashSalesExclusionCheck(BaseCheck):
+    """2. 現金売上の除外: 現金勘定の異常な動き"""
+
+    code = "02"
+    name = "現金売上の除外"
+
+    def visit(self, ctx):
+        if ctx.account_flags & AccountCategory.CASH:
+            return {
+                'date': ctx.issue_date,
+                'amount': ctx.amount,
+                'type': ctx.deal_type,
+                'desc': ctx.description,
+            }
+        return None
+
+    def collect_columnar(self, ledger):
+        rows = ledger.select(self.deal_types)
+        rows = rows[ledger.has_flag(rows, AccountCategory.CASH)]
+        return ledger.records(rows, date="date", amount="amount", type="type", desc="description")
+
+    def finish(self, entries, out):
+        out.details['02_cash'] = entries
+        # 現金残高がマイナスになるパターンを検出
+        if entries:
+            out.warnings += 1
+            out.issues.append(Issue(
+                category="02.現金",
+                title="現金取引あり",
+                description=f"{len(entries)}件の現金取引（税務調査で重点確認される）",
+                risk_level=RiskLevel.MEDIUM,
+                suggestion="現金売上の記録漏れがないか確認"
+            ))
+
+
+class PeriodShiftCheck(BaseCheck):
+    """3. 期ズレ: 売上の翌期繰延"""
+
+    code = "03"
+    name = "期ズレ"
+    deal_types = ('income',)
+
+    def applies(self):
+        # 期末月の売上が異常に少ないかチェック（事業年度開始日が必要）
+        return bool(self.params.get('fiscal_year_start'))
+
+    def visit(self, ctx):
+        return (ctx.issue_date[:7], ctx.amount)
+
+    def evaluate_columnar(self, ledger, out):
+        rows = ledger.select(self.deal_types)
+        monthly_sales = rows["amount"].groupby(ledger.months(rows), sort=False).sum()
+        out.details['03_period_shift'] = {month: int(amount) for month, amount in monthly_sales.items()}
+
+    def finish(self, entries, out):
+        monthly_sales = defaultdict(int)
+        for month, amount in entries:
+            monthly_sales[month] += amount
+
+        out.details['03_period_shift'] = dict(monthly_sales)
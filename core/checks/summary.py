@@ -0,0 +1,62 @@
+"""
+参考情報: 勘定科目別集計
+"""
+from collections import defaultdict
+
+from .base import BaseCheck
+
+
+class AccountSummary(BaseCheck):
+    """勘定科目別集計（参考情報）"""
+
+    code = "summary"
+    name = "勘定科目別集計"
+    deal_types = ('expense',)
+
+    # 出力する科目数（金額の大きい順）
+    TOP_N = 15
+
+    def visit(self, ctx):
+        return (ctx.account_name, ctx.amount)
+
+    def evaluate_columnar(self, ledger, out):
+        rows = ledger.select(self.deal_types)
+        totals = rows["amount"].groupby(rows["account_name"].astype(object), sort=False).agg(['sum', 'count'])
+        totals = totals.sort_values('sum', ascending=False, kind='stable').head(self.TOP_N)
+        out.details['account_summary'] = {
+            name: {'amount': int(row['sum']), 'count': int(row['count'])}
+            for name, row in totals.iterrows()
+        }
+
+    def finish(self, entries, out):
+        account_totals = defaultdict(lambda: {'amount': 0, 'count': 0})
+        for ac_name, amount in entries:
+            account_totals[ac_name]['amount'] += amount
+            account_totals[ac_name]['count'] += 1
+
+        sorted_accounts = sorted(account_totals.items(), key=lambda x: -x[1]['amount'])[:self.TOP_N]
+        out.details['account_summary'] = {
+            name: data for name, data in sorted_accounts
+        }
+
+    def new_partial(self):
+        return {}  # 科目名 → [合計, 件数]
+
+    def fold_partial(self, partial, entries, sign):
+        for ac_name, amount in entries:
+            total = partial.setdefault(ac_name, [0, 0])
+            total[0] += sign * amount
+            total[1] += sign
+            if not total[1]:
+                del partial[ac_name]
+
+    def finish_partial(self, partial, out):
+        ranked = sorted(partial.items(), key=lambda x: -x[1][0])
+        # 同額の科目は finish() では初出順に並ぶが、部分集計には初出順がないため集計し直す
+        shown = [total[0] for _, total in ranked[:self.TOP_N + 1]]
+        if len(set(shown)) < len(shown):
+            return False
+        out.details['account_summary'] = {
+            name: {'amount': amount, 'count': count} for name, (amount, count) in ranked[:self.TOP_N]
+        }
+        return True
@@ -0,0 +1,551 @@
+"""
+freee取引のローカルキャッシュ（SQLite）
+
+事業所ごとに取引を保存し、前回同期以降に更新された取引だけを取り直す。
+監査・AI向けエンドポイントはこのストアから読むため、
+修正後の再監査でも全件を再ダウンロードしなくて済む。
+
+    store = DealStore(DATA_DIR / "deals.sqlite3")
+    store.sync(client)
+    deals = store.get_deals(client.company_id, start_date, end_date)
+
+初回の同期は監査する期間（sync の start_date / end_date）の取引だけを取得し、取得済みの範囲を
+記録する。以降は更新された取引の差分に加えて、取得済みの範囲の外側を要求されたときだけ
+その部分を追加で取得する（範囲は1つの区間として広げる）。
+
+取得はページ（SYNC_BATCH_SIZE 件）ごとに短いトランザクションで書き込み、そのたびに再開位置を
+記録する。同期中も税区分修正の書き戻しや他の事業所の同期はロック待ちにならない。
+通信エラーなどで中断した工程は、次の同期が同じ工程なら続きのページから取得する。
+
+差分同期は freee の start_renew_date（更新日）で絞り込むため、
+freee側で削除された取引は検知できない。定期的に sync(client, full=True) で全件を取り直すこと
+（中断から再開した全件同期も、取りこぼしを削除と取り違えないよう削除の反映はしない）。
+
+書き込みのたびに事業所ごとのリビジョンが1つ進む。差分再監査（core.incremental）は
+前回のリビジョン以降に書き込まれた取引だけを get_changes で受け取る。
+リビジョンは書き込みのトランザクション（BEGIN IMMEDIATE）の中でカウンタから払い出すため、
+同期と税区分修正の書き戻しが並行しても同じリビジョンが2回使われることはない。
+全件同期は取引を入れ替えるため、それ以前のリビジョンからの差分は取れない（get_reset_revision）。
+"""
+import base64
+import hashlib
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict
+from datetime import date, timedelta
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .freee_client import Deal, FreeeClient
+
+
+class DealStore:
+    """事業所ごとの取引キャッシュ"""
+
+    # 差分同期の重なり日数（更新日は日付単位のため、前回同期日の前日から取り直す）
+    SYNC_OVERLAP_DAYS = 1
+    # 1回の書き込みトランザクションに含める取引数（freee の取引一覧の1ページ分）
+    SYNC_BATCH_SIZE = 100
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS deals (
+            company_id INTEGER NOT NULL,
+            deal_id INTEGER NOT NULL,
+            issue_date TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            revision INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (company_id, deal_id)
+        );
+        CREATE INDEX IF NOT EXISTS deals_by_date ON deals (company_id, issue_date);
+        CREATE TABLE IF NOT EXISTS sync_state (
+            company_id INTEGER PRIMARY KEY,
+            synced_on TEXT NOT NULL,
+            reset_revision INTEGER NOT NULL DEFAULT 0,
+            covered_start TEXT,
+            covered_end TEXT
+        );
+        CREATE TABLE IF NOT EXISTS sync_resume (
+            company_id INTEGER PRIMARY KEY,
+            step TEXT NOT NULL,
+            fetched INTEGER NOT NULL,
+            started_on TEXT NOT NULL,
+            revision INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS revisions (
+            company_id INTEGER PRIMARY KEY,
+            revision INTEGER NOT NULL
+        );
+    """
+
+    # 旧バージョンのファイルに追加する列 (テーブル, 列, 定義)
+    MIGRATIONS = [
+        ("deals", "revision", "INTEGER NOT NULL DEFAULT 0"),
+        ("sync_state", "reset_revision", "INTEGER NOT NULL DEFAULT 0"),
+        # 旧バージョンは全履歴を取得しているため、取得済みの範囲は NULL（下限・上限なし）のまま
+        ("sync_state", "covered_start", "TEXT"),
+        ("sync_state", "covered_end", "TEXT"),
+    ]
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Args:
+            path: SQLiteファイルのパス（親ディレクトリは自動作成）
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # 同じ事業所の同期が並行しないようにする（事業所ID → ロック）
+        self._sync_locks: Dict[int, threading.Lock] = {}
+        self._sync_locks_guard = threading.Lock()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(self.SCHEMA)
+                for table, column, definition in self.MIGRATIONS:
+                    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+                    if column not in columns:
+                        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+                conn.execute("CREATE INDEX IF NOT EXISTS deals_by_revision ON deals (company_id, revision)")
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """書き込みトランザクション（開始時に書き込みロックを取り、他の書き込みと直列化する）"""
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    # ========================================
+    # 同期
+    # ========================================
+
+    def sync(
+        self,
+        client: FreeeClient,
+        full: bool = False,
+        concurrency: int = 1,
+        on_page: Optional[Callable[[int, Optional[int]], None]] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> Dict:
+        """
+        freeeから取引を取得してストアを更新
+
+        Args:
+            client: 対象事業所の FreeeClient
+            full: True なら start_date〜end_date を全件取り直す（削除された取引もストアから消え、
+                取得済みの範囲はこの期間になる）
+            concurrency: 取引一覧の並列取得数
+            on_page: ページ取得ごとの進捗コールバック（FreeeClient.get_deals と同じ）
+            start_date: 読み出す発生日の開始 (YYYY-MM-DD)。None なら下限なし
+            end_date: 読み出す発生日の終了 (YYYY-MM-DD)。None なら上限なし
+
+        Returns:
+            {'mode': 'full' | 'delta', 'fetched': 取得件数, 'synced_on': 同期日,
+             'covered': [取得済みの範囲の開始日, 終了日]（None は下限・上限なし）}
+        """
+        company_id = client.company_id
+        with self._sync_lock(company_id):
+            state = self._get_sync_state(company_id)
+            if full or state is None:
+                steps = [{'kind': 'full', 'start': start_date, 'end': end_date}]
+            else:
+                synced_on, covered_start, covered_end = state
+                renewed_since = (date.fromisoformat(synced_on)
+                                 - timedelta(days=self.SYNC_OVERLAP_DAYS)).isoformat()
+                steps = [{'kind': 'delta', 'renewed_since': renewed_since}]
+                steps += self._gap_steps(covered_start, covered_end, start_date, end_date)
+
+            fetched = sum(self._run_step(client, step, concurrency, on_page) for step in steps)
+            synced_on, covered_start, covered_end = self._get_sync_state(company_id)
+            return {'mode': steps[0]['kind'], 'fetched': fetched, 'synced_on': synced_on,
+                    'covered': [covered_start, covered_end]}
+
+    @staticmethod
+    def _gap_steps(covered_start: Optional[str], covered_end: Optional[str],
+                   start_date: Optional[str], end_date: Optional[str]) -> List[Dict]:
+        """要求された期間のうち取得済みの範囲の外側を取得する工程（取得済みの範囲と隣接させる）"""
+        steps = []
+        if covered_start is not None and (start_date is None or start_date < covered_start):
+            before = (date.fromisoformat(covered_start) - timedelta(days=1)).isoformat()
+            steps.append({'kind': 'gap', 'side': 'before', 'start': start_date, 'end': before})
+        if covered_end is not None and (end_date is None or end_date > covered_end):
+            after = (date.fromisoformat(covered_end) + timedelta(days=1)).isoformat()
+            steps.append({'kind': 'gap', 'side': 'after', 'start': after, 'end': end_date})
+        return steps
+
+    def _run_step(self, client: FreeeClient, step: Dict, concurrency: int,
+                  on_page: Optional[Callable[[int, Optional[int]], None]]) -> int:
+        """
+        同期の1工程を実行し、取得件数を返す
+
+        工程は full（期間の全件を取り直す）/ delta（更新日による差分）/ gap（取得済みの範囲の外側）。
+        1ページずつ書き込みと再開位置の記録を同じトランザクションで行い、
+        全ページを書き込んだ後で同期日・取得済みの範囲を更新する。
+        """
+        company_id = client.company_id
+        key = json.dumps(step, sort_keys=True)
+        resume = self._get_resume(company_id)
+        resumed = resume is not None and resume[0] == key
+        if resumed:
+            _, offset, started_on, revision = resume
+        else:
+            # 取得中の更新を取りこぼさないよう、同期日は取得前の日付で記録する
+            offset, started_on, revision = 0, date.today().isoformat(), None
+            if step['kind'] == 'full':
+                # 全件同期の取引は1つのリビジョンで書き込み、最後にそれより古い取引を削除する
+                with self._write() as conn:
+                    revision = self._allocate_revision(conn, company_id)
+                    self._set_resume(conn, company_id, key, 0, started_on, revision)
+
+        if step['kind'] == 'delta':
+            deals = client.iter_deals(renewed_since=step['renewed_since'], limit=self.SYNC_BATCH_SIZE,
+                                      concurrency=concurrency, on_page=on_page, offset=offset)
+        else:
+            deals = client.iter_deals(start_date=step['start'], end_date=step['end'],
+                                      limit=self.SYNC_BATCH_SIZE, concurrency=concurrency,
+                                      on_page=on_page, offset=offset)
+
+        fetched = 0
+        while True:
+            page = list(islice(deals, self.SYNC_BATCH_SIZE))
+            if not page:
+                break
+            with self._write() as conn:
+                self._upsert(conn, company_id, page, revision)
+                fetched += len(page)
+                self._set_resume(conn, company_id, key, offset + fetched, started_on, revision)
+
+        with self._write() as conn:
+            if step['kind'] == 'full':
+                if not resumed:
+                    conn.execute("DELETE FROM deals WHERE company_id = ? AND revision < ?",
+                                 (company_id, revision))
+                # 全件同期より前のリビジョンからの差分は取れない（差分再監査は作り直す）
+                self._set_sync_state(conn, company_id, synced_on=started_on,
+                                     reset_revision=self._allocate_revision(conn, company_id),
+                                     covered=(step['start'], step['end']))
+            elif step['kind'] == 'delta':
+                self._set_sync_state(conn, company_id, synced_on=started_on)
+            else:
+                _, covered_start, covered_end = self._get_sync_state(company_id, conn)
+                if step['side'] == 'before':
+                    covered_start = step['start']
+                else:
+                    covered_end = step['end']
+                self._set_sync_state(conn, company_id, covered=(covered_start, covered_end))
+            conn.execute("DELETE FROM sync_resume WHERE company_id = ?", (company_id,))
+        return fetched
+
+    def save_deals(self, company_id: int, deals: Iterable[Deal]) -> None:
+        """取引を保存（同じIDは上書き）。API経由で更新した取引の反映に使う"""
+        with self._write() as conn:
+            self._upsert(conn, company_id, deals)
+
+    def get_sync_point(self, company_id: int) -> Optional[str]:
+        """前回同期日 (YYYY-MM-DD)。未同期なら None"""
+        state = self._get_sync_state(company_id)
+        return state[0] if state else None
+
+    def get_coverage(self, company_id: int) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        """取得済みの発生日の範囲 (開始日, 終了日)（None は下限・上限なし）。未同期なら None"""
+        state = self._get_sync_state(company_id)
+        return state[1:] if state else None
+
+    def _sync_lock(self, company_id: int) -> threading.Lock:
+        with self._sync_locks_guard:
+            return self._sync_locks.setdefault(company_id, threading.Lock())
+
+    def _get_sync_state(self, company_id: int, conn: Optional[sqlite3.Connection] = None
+                        ) -> Optional[Tuple[str, Optional[str], Optional[str]]]:
+        """(同期日, 取得済みの範囲の開始日, 終了日)。未同期なら None"""
+        reader = conn or self._connect()
+        try:
+            row = reader.execute(
+                "SELECT synced_on, covered_start, covered_end FROM sync_state WHERE company_id = ?",
+                (company_id,)
+            ).fetchone()
+        finally:
+            if conn is None:
+                reader.close()
+        return tuple(row) if row else None
+
+    def _get_resume(self, company_id: int) -> Optional[Tuple[str, int, str, Optional[int]]]:
+        """中断した工程 (工程, 取得済み件数, 開始日, リビジョン)。なければ None"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT step, fetched, started_on, revision FROM sync_resume WHERE company_id = ?",
+                (company_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return tuple(row) if row else None
+
+    @staticmethod
+    def _set_resume(conn: sqlite3.Connection, company_id: int, step: str, fetched: int,
+                    started_on: str, revision: Optional[int]) -> None:
+        conn.execute(
+            "INSERT INTO sync_resume (company_id, step, fetched, started_on, revision) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (company_id) DO UPDATE SET step = excluded.step, fetched = excluded.fetched, "
+            "started_on = excluded.started_on, revision = excluded.revision",
+            (company_id, step, fetched, started_on, revision)
+        )
+
+    def get_revision(self, company_id: int) -> int:
+        """現在のリビジョン（取引が書き込まれるたびに進む。未保存なら 0）"""
+        conn = self._connect()
+        try:
+            return self._current_revision(conn, company_id)
+        finally:
+            conn.close()
+
+    def get_reset_revision(self, company_id: int) -> int:
+        """最後に全件同期したリビジョン（これより前のリビジョンからの差分は取れない）"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT reset_revision FROM sync_state WHERE company_id = ?", (company_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else 0
+
+    @classmethod
+    def _upsert(cls, conn: sqlite3.Connection, company_id: int, deals: Iterable[Deal],
+                revision: Optional[int] = None) -> int:
+        """取引を書き込み、件数を返す（revision 省略時は次のリビジョン。_write の中で呼ぶ）"""
+        if revision is None:
+            revision = cls._allocate_revision(conn, company_id)
+        before = conn.total_changes
+        conn.executemany(
+            "INSERT INTO deals (company_id, deal_id, issue_date, payload, revision) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (company_id, deal_id) DO UPDATE SET "
+            "issue_date = excluded.issue_date, payload = excluded.payload, revision = excluded.revision",
+            ((company_id, d.id, d.issue_date, json.dumps(asdict(d), ensure_ascii=False), revision)
+             for d in deals)
+        )
+        return conn.total_changes - before
+
+    @classmethod
+    def _allocate_revision(cls, conn: sqlite3.Connection, company_id: int) -> int:
+        """次のリビジョンを払い出す（_write の中で呼ぶ。コミットまで他の書き込みは待たされる）"""
+        revision = cls._current_revision(conn, company_id) + 1
+        conn.execute(
+            "INSERT INTO revisions (company_id, revision) VALUES (?, ?) "
+            "ON CONFLICT (company_id) DO UPDATE SET revision = excluded.revision",
+            (company_id, revision)
+        )
+        return revision
+
+    @staticmethod
+    def _current_revision(conn: sqlite3.Connection, company_id: int) -> int:
+        row = conn.execute(
+            "SELECT revision FROM revisions WHERE company_id = ?", (company_id,)
+        ).fetchone()
+        if row is not None:
+            return row[0]
+        # カウンタのない旧バージョンのファイルは書き込み済みの最大値から続ける
+        # （全件同期で取引が0件になってもリビジョンが戻らないよう reset_revision も見る）
+        latest = conn.execute(
+            "SELECT MAX(revision) FROM deals WHERE company_id = ?", (company_id,)
+        ).fetchone()
+        reset = conn.execute(
+            "SELECT reset_revision FROM sync_state WHERE company_id = ?", (company_id,)
+        ).fetchone()
+        return max(latest[0] or 0, reset[0] if reset else 0)
+
+    @staticmethod
+    def _set_sync_state(conn: sqlite3.Connection, company_id: int, synced_on: Optional[str] = None,
+                        reset_revision: Optional[int] = None,
+                        covered: Optional[Tuple[Optional[str], Optional[str]]] = None) -> None:
+        """同期の状態を更新（None の項目は変えない。初回は full の工程で行を作る）"""
+        if reset_revision is not None:
+            conn.execute(
+                "INSERT INTO sync_state (company_id, synced_on, reset_revision, covered_start, covered_end) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (company_id) DO UPDATE SET synced_on = excluded.synced_on, "
+                "reset_revision = excluded.reset_revision, "
+                "covered_start = excluded.covered_start, covered_end = excluded.covered_end",
+                (company_id, synced_on, reset_revision, covered[0], covered[1])
+            )
+            return
+        if synced_on is not None:
+            conn.execute("UPDATE sync_state SET synced_on = ? WHERE company_id = ?", (synced_on, company_id))
+        if covered is not None:
+            conn.execute("UPDATE sync_state SET covered_start = ?, covered_end = ? WHERE company_id = ?",
+                         (covered[0], covered[1], company_id))
+
+    # ========================================
+    # 読み出し
+    # ========================================
+
+    def get_deals(
+        self,
+        company_id: int,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> List[Deal]:
+        """保存済みの取引をリストで取得（引数は iter_deals と同じ）"""
+        return list(self.iter_deals(company_id, start_date, end_date))
+
+    def iter_deals(
+        self,
+        company_id: int,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        after: Optional[Tuple[str, int]] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[Deal]:
+        """
+        保存済みの取引を1件ずつ返す（全件をメモリに持たない）
+
+        Args:
+            company_id: 事業所ID
+            start_date: 発生日の開始 (YYYY-MM-DD)
+            end_date: 発生日の終了 (YYYY-MM-DD)
+            after: この (発生日, 取引ID) より後の取引だけを返す（キーセット方式のページング。
+                decode_cursor の結果を渡す）
+            limit: 最大件数
+
+        Yields:
+            取引（発生日・取引ID順）
+        """
+        sql = "SELECT payload FROM deals WHERE company_id = ?"
+        params: list = [company_id]
+        if start_date:
+            sql += " AND issue_date >= ?"
+            params.append(start_date)
+        if end_date:
+            sql += " AND issue_date <= ?"
+            params.append(end_date)
+        if after is not None:
+            sql += " AND (issue_date > ? OR (issue_date = ? AND deal_id > ?))"
+            params.extend([after[0], after[0], after[1]])
+        sql += " ORDER BY issue_date, deal_id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        conn = self._connect()
+        try:
+            for (payload,) in conn.execute(sql, params):
+                yield FreeeClient.parse_deal(json.loads(payload))
+        finally:
+            conn.close()
+
+    def checksum(
+        self,
+        company_id: int,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> str:
+        """
+        期間内の取引のチェックサム（SHA-256）
+
+        保存済みのJSONをそのままハッシュする（取引を復元しないので全件読み出しより速い）。
+        取引が1件でも追加・更新・削除されれば変わる。監査結果キャッシュの鍵に使う。
+        """
+        sql = "SELECT deal_id, payload FROM deals WHERE company_id = ?"
+        params: list = [company_id]
+        if start_date:
+            sql += " AND issue_date >= ?"
+            params.append(start_date)
+        if end_date:
+            sql += " AND issue_date <= ?"
+            params.append(end_date)
+        sql += " ORDER BY issue_date, deal_id"
+
+        digest = hashlib.sha256()
+        conn = self._connect()
+        try:
+            for deal_id, payload in conn.execute(sql, params):
+                digest.update(f"{deal_id}\t{payload}\n".encode("utf-8"))
+        finally:
+            conn.close()
+        return digest.hexdigest()
+
+    def get_changes(self, company_id: int, since: int) -> Tuple[int, int, List[Deal]]:
+        """
+        リビジョン since より後に書き込まれた取引を、現在のリビジョンと同じ時点で読む
+
+        リビジョンと取引は1つの読み取りトランザクションで読むため、読んでいる間に書き込まれた取引は
+        含まれず、返すリビジョンより後のリビジョンとして次回の差分に入る。
+
+        Returns:
+            (現在のリビジョン, 全件同期のリビジョン（get_reset_revision）, 取引のリスト)
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN")
+            revision = self._current_revision(conn, company_id)
+            row = conn.execute(
+                "SELECT reset_revision FROM sync_state WHERE company_id = ?", (company_id,)
+            ).fetchone()
+            deals = [FreeeClient.parse_deal(json.loads(payload)) for (payload,) in conn.execute(
+                "SELECT payload FROM deals WHERE company_id = ? AND revision > ? AND revision <= ? "
+                "ORDER BY issue_date, deal_id", (company_id, since, revision)
+            )]
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        return revision, row[0] if row else 0, deals
+
+    def iter_changed(self, company_id: int, since: int, until: Optional[int] = None) -> Iterator[Deal]:
+        """
+        リビジョン since より後（until 以下）に書き込まれた取引
+
+        発生日では絞り込まない（期間外へ移動した取引も差分として返す）。
+        """
+        sql = "SELECT payload FROM deals WHERE company_id = ? AND revision > ?"
+        params: list = [company_id, since]
+        if until is not None:
+            sql += " AND revision <= ?"
+            params.append(until)
+        sql += " ORDER BY issue_date, deal_id"
+
+        conn = self._connect()
+        try:
+            for (payload,) in conn.execute(sql, params):
+                yield FreeeClient.parse_deal(json.loads(payload))
+        finally:
+            conn.close()
+
+    # ========================================
+    # ページングカーソル
+    # ========================================
+
+    @staticmethod
+    def encode_cursor(deal: Deal) -> str:
+        """この取引の次から読むためのカーソル（URLに使える文字列）"""
+        raw = json.dumps([deal.issue_date, deal.id]).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[str, int]:
+        """
+        カーソルを iter_deals の after に変換
+
+        Raises:
+            ValueError: 不正なカーソル
+        """
+        try:
+            issue_date, deal_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            return str(issue_date), int(deal_id)
+        except (TypeError, ValueError, UnicodeError) as e:
+            raise ValueError("無効なカーソルです") from e
@@ -0,0 +1,63 @@
+"""
+監査結果のエクスポート（CSV / JSON）
+
+/api/analyze の結果（dict）を、ダウンロード用のCSV・JSON文字列に変換する。
+
+    data = {'issues': [issue_to_dict(i) for i in result.issues], 'deal_count': ..., ...}
+    csv_text = audit_result_to_csv(data)
+"""
+import csv
+import io
+import json
+from typing import Any, Dict
+
+
+def issue_to_dict(issue) -> Dict[str, Any]:
+    """Issue のJSON表現"""
+    return {
+        'category': issue.category,
+        'title': issue.title,
+        'description': issue.description,
+        'risk_level': issue.risk_level.value,
+        'deal_id': issue.deal_id,
+        'amount': issue.amount,
+        'suggestion': issue.suggestion
+    }
+
+
+def audit_result_to_json(result_data: Dict[str, Any]) -> str:
+    """監査結果をJSON文字列に変換"""
+    return json.dumps(result_data, ensure_ascii=False, indent=2)
+
+
+def audit_result_to_csv(result_data: Dict[str, Any]) -> str:
+    """
+    監査結果をCSV文字列に変換（問題リスト + サマリー）
+
+    BOM付きで返す（Excelでも文字化けしないように）。
+    """
+    output = io.StringIO()
+    writer = csv.writer(output)
+
+    # ヘッダー
+    writer.writerow(['カテゴリ', 'タイトル', 'リスクレベル', '金額', '説明', '推奨アクション'])
+
+    # 問題リスト
+    for issue in result_data.get('issues', []):
+        writer.writerow([
+            issue.get('category', ''),
+            issue.get('title', ''),
+            issue.get('risk_level', ''),
+            issue.get('amount', ''),
+            issue.get('description', ''),
+            issue.get('suggestion', '')
+        ])
+
+    # サマリー行を追加
+    writer.writerow([])
+    writer.writerow(['=== サマリー ==='])
+    writer.writerow(['取引件数', result_data.get('deal_count', 0)])
+    writer.writerow(['エラー数', result_data.get('errors', 0)])
+    writer.writerow(['警告数', result_data.get('warnings', 0)])
+
+    return '\ufeff' + output.getvalue()
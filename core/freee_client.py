@@ -2,15 +2,25 @@
 freee API クライアント
 """
 import os
+import sys
+import threading
+import time
 import requests
-from typing import Optional, List, Dict, Any
+from requests.adapters import HTTPAdapter
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, Callable, Iterator
 from dataclasses import dataclass
 from datetime import datetime
 
+from .master_cache import MasterDataCache
+
 
 @dataclass
 class Deal:
-    """取引データ"""
+    """取引データ（大量に保持するため __slots__ で省メモリ化）"""
+    __slots__ = ("id", "issue_date", "type", "amount", "details", "payments")
+
     id: int
     issue_date: str
     type: str  # income or expense
@@ -18,19 +28,108 @@ class Deal:
     details: List[Dict]
     payments: List[Dict]
 
+    def to_dict(self) -> Dict:
+        """TaxInspector に渡す形式の dict（details・payments はコピーせず共有）"""
+        return {
+            "id": self.id,
+            "issue_date": self.issue_date,
+            "type": self.type,
+            "amount": self.amount,
+            "details": self.details,
+            "payments": self.payments
+        }
+
+
+class RateLimiter:
+    """
+    スレッドセーフな簡易レートリミッター
+
+    リクエストの開始間隔を 1/rate 秒以上に保つ（並列取得でも全体で rate 件/秒まで）。
+    """
+
+    def __init__(self, rate: float):
+        """
+        Args:
+            rate: 1秒あたりの最大リクエスト数（0以下なら制限なし）
+        """
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def wait(self):
+        """次のリクエストを開始してよい時刻まで待機"""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
 
 class FreeeClient:
     """freee会計APIクライアント"""
 
     BASE_URL = "https://api.freee.co.jp/api/1"
 
-    def __init__(self, access_token: Optional[str] = None, company_id: Optional[int] = None):
+    # freee APIの上限（3,000リクエスト/5分 = 10リクエスト/秒）
+    DEFAULT_RATE_LIMIT = 10.0
+    # 429（レート制限）時の再試行回数と初回待機秒数（以降は倍々）
+    MAX_RETRIES = 3
+    RETRY_BACKOFF = 1.0
+    # 接続プールの上限（並列取得の concurrency 以上にしておくと接続を使い回せる）
+    DEFAULT_POOL_MAXSIZE = 16
+    # 1リクエストのタイムアウト秒数
+    DEFAULT_TIMEOUT = 30
+
+    def __init__(
+        self,
+        access_token: Optional[str] = None,
+        company_id: Optional[int] = None,
+        rate_limit: float = DEFAULT_RATE_LIMIT,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+        master_cache: Optional[MasterDataCache] = None,
+        rate_limiter: Optional[RateLimiter] = None
+    ):
+        """
+        Args:
+            access_token: freeeアクセストークン（未指定なら環境変数 FREEE_ACCESS_TOKEN）
+            company_id: 事業所ID（未指定なら環境変数 FREEE_COMPANY_ID）
+            rate_limit: 1秒あたりの最大リクエスト数（並列取得時も全体で守る）
+            pool_maxsize: keep-alive 接続プールの上限
+            timeout: 1リクエストのタイムアウト秒数
+            master_cache: 勘定科目・税区分マスタのキャッシュ（None ならキャッシュしない）
+            rate_limiter: 複数のクライアントで共有するレートリミッター
+                （一括監査で全事業所の合計を API 上限内に収める。指定時は rate_limit を無視）
+        """
         self.access_token = access_token or os.getenv("FREEE_ACCESS_TOKEN")
         self.company_id = company_id or int(os.getenv("FREEE_COMPANY_ID", "0"))
+        self.rate_limiter = rate_limiter or RateLimiter(rate_limit)
+        self.timeout = timeout
+        self.master_cache = master_cache
 
         if not self.access_token:
             raise ValueError("freeeアクセストークンが設定されていません")
 
+        # TLS接続を使い回すため、セッションと接続プールをクライアントが保持する
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(self.headers)
+
+    def close(self):
+        """接続プールを解放"""
+        self.session.close()
+
+    def __enter__(self) -> "FreeeClient":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
     @property
     def headers(self) -> Dict[str, str]:
         return {
@@ -39,10 +138,43 @@ class FreeeClient:
             "Content-Type": "application/json"
         }
 
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """
+        freee APIへリクエストを送信（ステータスの判定は呼び出し側で行う）
+
+        Args:
+            method: HTTPメソッド
+            path: BASE_URL からの相対パス（例: "/deals/123"）
+            **kwargs: requests に渡す引数（params, json など）
+        """
+        return self._request(method, f"{self.BASE_URL}{path}", **kwargs)
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        レート制限を守ってリクエストを送信
+
+        429（レート制限）は Retry-After（なければ指数バックオフ）だけ待って再試行する。
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        for attempt in range(self.MAX_RETRIES + 1):
+            self.rate_limiter.wait()
+            resp = self.session.request(method, url, **kwargs)
+            if resp.status_code != 429 or attempt == self.MAX_RETRIES:
+                return resp
+            time.sleep(self._retry_delay(resp, attempt))
+        return resp
+
+    def _retry_delay(self, resp: requests.Response, attempt: int) -> float:
+        """429 応答の再試行までの待機秒数"""
+        retry_after = resp.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return float(retry_after)
+        return self.RETRY_BACKOFF * (2 ** attempt)
+
     def get_companies(self) -> List[Dict]:
         """事業所一覧を取得"""
         url = f"{self.BASE_URL}/companies"
-        resp = requests.get(url, headers=self.headers)
+        resp = self._request("GET", url)
         resp.raise_for_status()
         return resp.json().get("companies", [])
 
@@ -51,7 +183,7 @@ class FreeeClient:
         if not self.company_id:
             raise ValueError("事業所IDが設定されていません")
         url = f"{self.BASE_URL}/companies/{self.company_id}"
-        resp = requests.get(url, headers=self.headers)
+        resp = self._request("GET", url)
         resp.raise_for_status()
         return resp.json().get("company", {})
 
@@ -59,94 +191,182 @@ class FreeeClient:
         self,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
-        limit: int = 100
+        limit: int = 100,
+        concurrency: int = 1,
+        renewed_since: Optional[str] = None,
+        on_page: Optional[Callable[[int, Optional[int]], None]] = None
     ) -> List[Deal]:
-        """取引一覧を取得"""
-        url = f"{self.BASE_URL}/deals"
-        all_deals = []
-        offset = 0
-
-        while True:
-            params = {
-                "company_id": self.company_id,
-                "limit": limit,
-                "offset": offset
-            }
-            if start_date:
-                params["start_issue_date"] = start_date
-            if end_date:
-                params["end_issue_date"] = end_date
-
-            resp = requests.get(url, headers=self.headers, params=params)
-            resp.raise_for_status()
-
-            deals = resp.json().get("deals", [])
-            if not deals:
-                break
+        """
+        取引一覧を取得（引数は iter_deals と同じ）
+
+        Returns:
+            取引のリスト（freeeの返却順）
+        """
+        return list(self.iter_deals(
+            start_date=start_date, end_date=end_date, limit=limit, concurrency=concurrency,
+            renewed_since=renewed_since, on_page=on_page
+        ))
+
+    def iter_deals(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        limit: int = 100,
+        concurrency: int = 1,
+        renewed_since: Optional[str] = None,
+        on_page: Optional[Callable[[int, Optional[int]], None]] = None,
+        offset: int = 0
+    ) -> Iterator[Deal]:
+        """
+        取引をページ単位で取得しながら1件ずつ返す（全件をメモリに持たない）
+
+        Args:
+            start_date: 発生日の開始 (YYYY-MM-DD)
+            end_date: 発生日の終了 (YYYY-MM-DD)
+            limit: 1ページの件数（freeeの上限は100）
+            concurrency: 2以上なら、1ページ目の meta.total_count から全ページを割り出し、
+                最大 concurrency ページずつ並列に先読みする（レート制限は rate_limit で共有）。
+                返す順序は逐次取得と同じ
+            renewed_since: 指定日 (YYYY-MM-DD) 以降に更新された取引だけを取得（差分同期用）
+            on_page: 1ページ取得するたびに (取得済みページ数, 総ページ数 or None) で呼ばれる。
+                例外を送出すると取得を中断する
+            offset: 取得を始める位置（中断した同期の再開用。limit の倍数を指定する）
+
+        Yields:
+            取引（freeeの返却順）
+        """
+        params = {"company_id": self.company_id, "limit": limit}
+        if start_date:
+            params["start_issue_date"] = start_date
+        if end_date:
+            params["end_issue_date"] = end_date
+        if renewed_since:
+            params["start_renew_date"] = renewed_since
 
+        first = self._get_deals_page(params, offset)
+        deals = first.get("deals", [])
+        total_count = first.get("meta", {}).get("total_count")
+        total_pages = -(-total_count // limit) if total_count is not None else None
+        pages = offset // limit + 1
+        if on_page:
+            on_page(pages, total_pages)
+
+        if concurrency > 1 and total_count is not None:
             for d in deals:
-                all_deals.append(Deal(
-                    id=d["id"],
-                    issue_date=d["issue_date"],
-                    type=d["type"],
-                    amount=d.get("amount", 0),
-                    details=d.get("details", []),
-                    payments=d.get("payments", [])
-                ))
+                yield self.parse_deal(d)
+            yield from self._iter_pages_parallel(
+                params, range(offset + limit, total_count, limit), concurrency, total_pages, on_page, pages)
+            return
 
+        while deals:
+            for d in deals:
+                yield self.parse_deal(d)
             offset += limit
             if len(deals) < limit:
                 break
+            deals = self._get_deals_page(params, offset).get("deals", [])
+            pages += 1
+            if on_page:
+                on_page(pages, total_pages)
+
+    def _get_deals_page(self, params: Dict, offset: int) -> Dict:
+        """取引一覧の1ページ（レスポンスJSON）を取得"""
+        resp = self._request("GET", f"{self.BASE_URL}/deals", params={**params, "offset": offset})
+        resp.raise_for_status()
+        return resp.json()
+
+    def _iter_pages_parallel(
+        self, params: Dict, offsets, concurrency: int,
+        total_pages: Optional[int] = None, on_page: Optional[Callable] = None, fetched: int = 1
+    ) -> Iterator[Deal]:
+        """
+        複数ページを並列取得し、offset 順に取引を返す
 
-        return all_deals
+        先読みは concurrency ページまで（取得済みで未消費のページが溜まり続けない）。
+        fetched は取得済みのページ数（on_page に渡す進捗の起点）。
+        """
+        offsets = list(offsets)
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        pending: deque = deque()
+        try:
+            pending.extend(
+                executor.submit(self._get_deals_page, params, offset)
+                for offset in offsets[:concurrency]
+            )
+            next_index = len(pending)
+            while pending:
+                page = pending.popleft().result()
+                if next_index < len(offsets):
+                    pending.append(executor.submit(self._get_deals_page, params, offsets[next_index]))
+                    next_index += 1
+                fetched += 1
+                if on_page:
+                    on_page(fetched, total_pages)
+                for d in page.get("deals", []):
+                    yield self.parse_deal(d)
+        finally:
+            # 中断時（on_page の例外・途中で読み捨てられた場合など）は未着手のページを取り消す
+            # （shutdown の cancel_futures は Python 3.9 以降のため自前で取り消す）
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    @staticmethod
+    def parse_deal(d: Dict) -> Deal:
+        """APIレスポンスの取引（dict）を Deal に変換（日付・種別の文字列は intern して共有）"""
+        return Deal(
+            id=d["id"],
+            issue_date=sys.intern(d["issue_date"]),
+            type=sys.intern(d["type"]),
+            amount=d.get("amount", 0),
+            details=d.get("details", []),
+            payments=d.get("payments", [])
+        )
 
     def get_deal(self, deal_id: int) -> Optional[Deal]:
         """取引詳細を取得"""
         url = f"{self.BASE_URL}/deals/{deal_id}"
         params = {"company_id": self.company_id}
-        resp = requests.get(url, headers=self.headers, params=params)
+        resp = self._request("GET", url, params=params)
 
         if resp.status_code == 200:
-            d = resp.json().get("deal", {})
-            return Deal(
-                id=d["id"],
-                issue_date=d["issue_date"],
-                type=d["type"],
-                amount=d.get("amount", 0),
-                details=d.get("details", []),
-                payments=d.get("payments", [])
-            )
+            return self.parse_deal(resp.json().get("deal", {}))
         return None
 
     def update_deal(self, deal_id: int, data: Dict) -> bool:
         """取引を更新"""
         url = f"{self.BASE_URL}/deals/{deal_id}"
         data["company_id"] = self.company_id
-        resp = requests.put(url, headers=self.headers, json=data)
+        resp = self._request("PUT", url, json=data)
         return resp.status_code == 200
 
     def delete_deal(self, deal_id: int) -> bool:
         """取引を削除"""
         url = f"{self.BASE_URL}/deals/{deal_id}"
         params = {"company_id": self.company_id}
-        resp = requests.delete(url, headers=self.headers, params=params)
+        resp = self._request("DELETE", url, params=params)
         return resp.status_code == 204
 
     def create_deal(self, data: Dict) -> Optional[int]:
         """取引を作成"""
         url = f"{self.BASE_URL}/deals"
         data["company_id"] = self.company_id
-        resp = requests.post(url, headers=self.headers, json=data)
+        resp = self._request("POST", url, json=data)
 
         if resp.status_code == 201:
             return resp.json().get("deal", {}).get("id")
         return None
 
     def get_account_items(self) -> Dict[int, str]:
-        """勘定科目マスタを取得"""
+        """勘定科目マスタを取得（master_cache があればキャッシュ経由）"""
+        if self.master_cache is not None:
+            return self.master_cache.get(self.company_id, "account_items", self._fetch_account_items)
+        return self._fetch_account_items()
+
+    def _fetch_account_items(self) -> Dict[int, str]:
         url = f"{self.BASE_URL}/account_items"
         params = {"company_id": self.company_id}
-        resp = requests.get(url, headers=self.headers, params=params)
+        resp = self._request("GET", url, params=params)
         resp.raise_for_status()
 
         return {
@@ -155,10 +375,15 @@ class FreeeClient:
         }
 
     def get_tax_codes(self) -> Dict[int, str]:
-        """税区分マスタを取得"""
+        """税区分マスタを取得（master_cache があればキャッシュ経由）"""
+        if self.master_cache is not None:
+            return self.master_cache.get(self.company_id, "tax_codes", self._fetch_tax_codes)
+        return self._fetch_tax_codes()
+
+    def _fetch_tax_codes(self) -> Dict[int, str]:
         url = f"{self.BASE_URL}/taxes/codes"
         params = {"company_id": self.company_id}
-        resp = requests.get(url, headers=self.headers, params=params)
+        resp = self._request("GET", url, params=params)
         resp.raise_for_status()
 
         return {
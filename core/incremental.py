@@ -0,0 +1,252 @@
+"""
+差分再監査
+
+取引ごとのチェックのエントリ（役員報酬の月別支給、交際費の明細、税区分エラーの候補など
+visit() の戻り値）を取引IDごとに保持しておき、追加・更新・削除された取引だけを走査し直す。
+税区分を修正 → 再監査 のループで全件を読み直さずに済む。
+
+    audit = IncrementalAudit(inspector, period_boundary="2025-05-01")
+    result = audit.build(deals)                          # 初回は全件を走査
+    result = audit.apply(updated=[fixed_deal], deleted=[deal_id])
+
+apply() で走査するのは差分の取引だけ。チェックごとの集計結果（finish の出力）も保持し、
+差分の取引にエントリのあったチェックだけを集計し直す。部分集計（BaseCheck.new_partial）を
+持つチェック（役員報酬の月別合計・交際費の合計・税区分エラーの件数・科目別集計など）は
+差分のエントリを加減算するだけで済み、エントリ全体を集計し直さない。
+結果は同じ取引を発生日・取引ID順（DealStore.iter_deals の順）に inspect_all した結果と同一。
+build() / apply() は inspect_all と同じく on_check（進捗）・metrics（計測）・parallel（集計の並列数）を受け取る。
+"""
+import time
+from bisect import bisect_left, insort
+from collections import Counter
+from functools import partial
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .tax_inspector import InspectionResult, TaxInspector
+
+
+class IncrementalAudit:
+    """取引単位のエントリを保持し、差分だけを再検査する監査"""
+
+    def __init__(self, inspector: TaxInspector,
+                 fiscal_year_start: str = None,
+                 period_boundary: str = None,
+                 bank_data: Dict = None,
+                 checks: Union[str, Sequence[str], None] = None):
+        """
+        Args:
+            inspector: 検査に使う TaxInspector（勘定科目の分類を共有する）
+            fiscal_year_start, period_boundary, bank_data, checks: inspect_all と同じ
+        """
+        self.inspector = inspector
+        self.fiscal_year_start = fiscal_year_start
+        self.checks = inspector._create_checks(fiscal_year_start, period_boundary, bank_data, codes=checks)
+        self._match = inspector._description_matcher(self.checks)
+        # (取引種別, 科目の分類) → 配信先 [(チェックの位置, visit), ...]
+        self._routes: Dict[Tuple[Any, int], List[Tuple[int, Any]]] = {}
+        # 取引ID → 並び順キー (発生日, 取引ID)
+        self._keys: Dict[Any, tuple] = {}
+        # チェックごとの 並び順キー → その取引のエントリ（エントリのある取引だけ）
+        self._entries: List[Dict[tuple, list]] = [{} for _ in self.checks]
+        # チェックごとのエントリのある取引の並び順キー（昇順）
+        self._order: List[List[tuple]] = [[] for _ in self.checks]
+        # チェックごとの部分集計（BaseCheck.new_partial。対応しないチェックは None）
+        self._aggregates: List[Any] = [check.new_partial() for check in self.checks]
+        # チェックごとの集計結果（None は差分で変わったため集計し直すもの）
+        self._partials: List[Optional[InspectionResult]] = [None for _ in self.checks]
+
+    @property
+    def total_deals(self) -> int:
+        return len(self._keys)
+
+    def build(self, deals: Iterable[Dict], on_check: Optional[Callable[[str, int, int], None]] = None,
+              metrics: bool = False, parallel: int = 0) -> InspectionResult:
+        """
+        保持している取引を破棄し、deals 全件を走査して監査結果を返す
+
+        Args:
+            on_check, metrics, parallel: inspect_all と同じ（計測値の mode は "scan"）
+        """
+        self._keys.clear()
+        for entries, order in zip(self._entries, self._order):
+            entries.clear()
+            order.clear()
+        self._aggregates = [check.new_partial() for check in self.checks]
+        self._partials = [None for _ in self.checks]
+
+        def scan(upsert):
+            for deal in deals:
+                upsert(deal)
+
+        return self._run(scan, "scan", on_check, metrics, parallel)
+
+    def apply(self, added: Iterable[Dict] = (), updated: Iterable[Dict] = (),
+              deleted: Iterable[Any] = (), on_check: Optional[Callable[[str, int, int], None]] = None,
+              metrics: bool = False, parallel: int = 0) -> InspectionResult:
+        """
+        差分を反映して監査結果を返す
+
+        Args:
+            added: 追加された取引
+            updated: 更新された取引（未保持なら追加として扱う）
+            deleted: 削除された取引のID（未保持なら無視）
+            on_check, metrics, parallel: inspect_all と同じ。集計し直さなかったチェックは
+                最初に完了として通知する。計測値の mode は "delta"（走査件数は差分の明細数、
+                処理時間は差分の明細の visit() と集計し直したチェックの分だけ）
+        """
+        def scan(upsert):
+            for deal_id in deleted:
+                self._remove(deal_id)
+            for deal in chain(added, updated):
+                upsert(deal)
+
+        return self._run(scan, "delta", on_check, metrics, parallel)
+
+    def result(self) -> InspectionResult:
+        """保持しているエントリを集計して監査結果を返す（inspector.result も更新）"""
+        return self._result()
+
+    def _run(self, scan, mode: str, on_check, metrics: bool, parallel: int) -> InspectionResult:
+        """scan(upsert) で取引を反映し、計測しながら集計する（build / apply の共通部分）"""
+        stats = routed = None
+        if metrics:
+            from .metrics import CheckStats
+            stats = CheckStats(self.checks, mode)
+            routed = Counter()
+
+        scan_started = time.perf_counter()
+        scan(lambda deal: self._upsert(deal, stats, routed))
+        if stats:
+            stats.scan_seconds = time.perf_counter() - scan_started
+            for route, count in routed.items():
+                for i, _ in self._routes[route]:
+                    stats.add_items(self.checks[i].code, count)
+        return self._result(on_check, stats, parallel)
+
+    def _result(self, on_check=None, stats=None, parallel: int = 0) -> InspectionResult:
+        inspector = self.inspector
+        stale = [i for i, cached in enumerate(self._partials) if cached is None]
+        total = len(self.checks)
+        if on_check:
+            for done, i in enumerate(sorted(set(range(total)) - set(stale)), start=1):
+                on_check(self.checks[i].code, done, total)
+        done_before = total - len(stale)
+
+        outs = [InspectionResult() for _ in stale]
+        inspector._evaluate(
+            [self.checks[i] for i in stale], [partial(self._finish, i) for i in stale],
+            on_check and (lambda code, done, _: on_check(code, done_before + done, total)),
+            stats, parallel, outs=outs
+        )
+        for i, out in zip(stale, outs):
+            self._partials[i] = out
+
+        inspector._reset_result(self.fiscal_year_start)
+        out = inspector.result
+        out.details["total_deals"] = len(self._keys)
+        for i, partial_result in enumerate(self._partials):
+            out.merge(partial_result)
+            if stats and i not in stale:
+                # 集計し直さなかったチェックの検出件数も数える（全件の監査と同じ件数にする）
+                stats.add_issues(self.checks[i].code, len(partial_result.issues))
+        if stats:
+            stats.finish(len(self._keys))
+            out.details["metrics"] = stats.to_dict()
+        inspector._generate_report()
+        return out
+
+    def _finish(self, i: int, out: InspectionResult) -> None:
+        """チェック i を out に集計（部分集計があればそれを使う）"""
+        check = self.checks[i]
+        aggregate = self._aggregates[i]
+        if aggregate is not None:
+            partial_result = InspectionResult()
+            if check.finish_partial(aggregate, partial_result):
+                out.merge(partial_result)
+                return
+
+        entries = self._entries[i]
+        # finish() は受け取ったリストを details に格納することがあるため毎回作り直す
+        check.finish(list(chain.from_iterable(map(entries.__getitem__, self._order[i]))), out)
+
+    def _upsert(self, deal: Dict, stats=None, routed: Optional[Counter] = None) -> None:
+        key = self._key(deal)
+        self._remove(key[1])
+        self._keys[key[1]] = key
+        for i, deal_entries in self._visit(deal, routed, stats).items():
+            if stats:
+                stats.add_items(self.checks[i].code, 0, len(deal_entries))
+            self._entries[i][key] = deal_entries
+            self._partials[i] = None
+            if self._aggregates[i] is not None:
+                self.checks[i].fold_partial(self._aggregates[i], deal_entries, 1)
+            order = self._order[i]
+            # 発生日・取引ID順に渡される全件走査では末尾への追加で済む
+            if not order or order[-1] < key:
+                order.append(key)
+            else:
+                insort(order, key)
+
+    def _remove(self, deal_id) -> None:
+        key = self._keys.pop(deal_id, None)
+        if key is None:
+            return
+        for i, (entries, order) in enumerate(zip(self._entries, self._order)):
+            deal_entries = entries.pop(key, None)
+            if deal_entries is not None:
+                del order[bisect_left(order, key)]
+                self._partials[i] = None
+                if self._aggregates[i] is not None:
+                    self.checks[i].fold_partial(self._aggregates[i], deal_entries, -1)
+
+    @staticmethod
+    def _key(deal: Dict) -> tuple:
+        deal_id = deal.get('id')
+        if deal_id is None:
+            raise ValueError("取引IDのない取引は差分監査できません")
+        return (deal['issue_date'], deal_id)
+
+    def _visit(self, deal: Dict, routed: Optional[Counter] = None, stats=None) -> Dict[int, list]:
+        """
+        1取引の明細を全チェックへ配信（TaxInspector._scan の1取引分）
+
+        Args:
+            routed: 計測する場合に (取引種別, 科目の分類) ごとの配信した明細数を数える
+            stats: 計測する場合の CheckStats（routed の件数で抜き取った明細の visit() を計る）
+
+        Returns:
+            チェックの位置 → その取引のエントリ（エントリのないチェックは含まない）
+        """
+        from .checks import DetailContext
+
+        deal_type = deal.get('type')
+        inspector = self.inspector
+        account_index = inspector.account_index
+        routes = self._routes
+        match = self._match
+        found: Dict[int, list] = {}
+        for detail in deal.get('details', []):
+            account_id = detail.get('account_item_id')
+            account = account_index.get(account_id) or inspector._account_info(account_id)
+            visitors = routes.get((deal_type, account[1]))
+            if visitors is None:
+                visitors = routes[(deal_type, account[1])] = [
+                    (i, self.checks[i].visit) for i in inspector._route(self.checks, deal_type, account[1])
+                ]
+            if not visitors:
+                continue
+            sampled = False
+            if routed is not None:
+                key = (deal_type, account[1])
+                routed[key] += 1
+                sampled = stats is not None and (routed[key] - 1) % stats.VISIT_SAMPLE_EVERY == 0
+
+            ctx = DetailContext(deal, detail, account)
+            if match is not None and ctx.description:
+                ctx.keyword_hits = match(ctx.description)
+            for i, visit in visitors:
+                entry = stats.sample_visit(self.checks[i].code, visit, ctx) if sampled else visit(ctx)
+                if entry is not None:
+                    found.setdefault(i, []).append(entry)
+        return found
@@ -0,0 +1,153 @@
+"""
+バックグラウンドジョブ管理
+
+時間のかかる監査（取得 → 検査 → レポート）をワーカープールで実行し、
+HTTPリクエストはジョブIDを受け取って進捗・結果をポーリングする。
+
+    jobs = JobManager(max_workers=2, kind_workers={"batch": 1})
+    job = jobs.submit("analyze", run_analysis, params)
+    jobs.get(job.id).to_dict()    # {'status': 'running', 'stage': 'fetch', 'progress': {...}}
+    jobs.cancel(job.id)
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+
+class JobCancelled(Exception):
+    """ジョブがキャンセルされた"""
+
+
+@dataclass
+class Job:
+    """バックグラウンドジョブ"""
+    id: str
+    kind: str
+    status: str = "queued"          # queued / running / succeeded / failed / cancelled
+    stage: str = ""                 # 実行中の工程（fetch / inspect / report など）
+    progress: Dict[str, Any] = field(default_factory=dict)
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    _cancel: threading.Event = field(default_factory=threading.Event, repr=False)
+    _done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self._done.is_set()
+
+    def update(self, stage: Optional[str] = None, **progress):
+        """工程・進捗を更新（キャンセル済みなら JobCancelled を送出）"""
+        self.check_cancelled()
+        if stage is not None:
+            self.stage = stage
+        self.progress.update(progress)
+
+    def check_cancelled(self):
+        """キャンセル要求があれば JobCancelled を送出（ジョブ関数から随時呼ぶ）"""
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """完了を待機（タイムアウトしたら False）"""
+        return self._done.wait(timeout)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """状態のJSON表現（結果本体は含まない）"""
+        return {
+            'job_id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'stage': self.stage,
+            'progress': dict(self.progress),
+            'error': self.error,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class JobManager:
+    """ジョブの投入・実行・保持を管理"""
+
+    DEFAULT_WORKERS = 2
+    # 完了したジョブの保持期間（秒）と保持件数の上限
+    RETENTION_SECONDS = 60 * 60
+    MAX_FINISHED_JOBS = 100
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS, kind_workers: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            max_workers: 同時に実行するジョブ数
+            kind_workers: 種類ごとの専用ワーカー数（例: {"batch": 1}）。指定した種類のジョブは
+                専用のワーカーで順に実行し、他の種類のジョブの待ち行列をふさがない
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._kind_executors = {
+            kind: ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"job-{kind}")
+            for kind, workers in (kind_workers or {}).items()
+        }
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fn: Callable[..., Any], *args, **kwargs) -> Job:
+        """
+        ジョブを投入
+
+        Args:
+            kind: ジョブの種類（表示用）
+            fn: fn(job, *args, **kwargs) の形で呼ばれる関数。戻り値が結果になる
+        """
+        job = Job(id=uuid.uuid4().hex, kind=kind)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        executor = self._kind_executors.get(kind, self._executor)
+        executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        キャンセルを要求（待機中ならすぐに、実行中なら次の進捗更新で止まる）
+
+        Returns:
+            ジョブが存在し、まだ完了していなければ True
+        """
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return False
+        job._cancel.set()
+        return True
+
+    def _run(self, job: Job, fn, args, kwargs):
+        try:
+            job.check_cancelled()
+            job.status = "running"
+            job.result = fn(job, *args, **kwargs)
+            job.status = "succeeded"
+        except JobCancelled:
+            job.status = "cancelled"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+            job._done.set()
+
+    def _prune(self):
+        """古い完了ジョブを破棄（ロック取得済みで呼ぶ）"""
+        now = time.time()
+        finished = [j for j in self._jobs.values() if j.finished]
+        excess = len(finished) - self.MAX_FINISHED_JOBS
+        for job in finished:
+            if excess > 0 or now - job.finished_at > self.RETENTION_SECONDS:
+                del self._jobs[job.id]
+                excess -= 1
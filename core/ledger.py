@@ -0,0 +1,175 @@
+"""
+列指向の取引台帳（明細1行 = 1レコード）
+
+freeeの取引データ（deal → details の入れ子 dict）を一度だけ平坦化し、
+NumPy/pandas の列として保持する。TaxInspector の列指向モードでは
+各チェックがこの台帳に対するフィルタ・group-by で集計する。
+
+    ledger = ColumnarLedger.from_deals(deals, inspector)
+    result = inspector.inspect_all(ledger, columnar=True)
+"""
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class ColumnarLedger:
+    """
+    列指向の取引台帳
+
+    列:
+        deal_id: 取引ID
+        issue_date: 発生日 (datetime64)
+        type: 取引種別 income / expense (category)
+        account_item_id: 勘定科目ID
+        account_name: 勘定科目名 (category)
+        account_flags: 勘定科目の分類ビット (AccountCategory の OR)
+        tax_code: 税区分コード
+        amount: 金額
+        description: 摘要 (category。未入力は空文字)
+    """
+
+    COLUMNS = [
+        "deal_id", "issue_date", "type", "account_item_id", "account_name",
+        "account_flags", "tax_code", "amount", "description",
+    ]
+
+    def __init__(self, frame: pd.DataFrame, total_deals: int):
+        """
+        Args:
+            frame: COLUMNS を持つ DataFrame
+            total_deals: 取引件数（明細のない取引も含む）
+        """
+        self.frame = frame
+        self.total_deals = total_deals
+        self._match: Optional[Callable[[str], Dict[str, str]]] = None
+        self._hits_by_category: Optional[List[Dict[str, str]]] = None
+        # 並列集計（inspect_all(parallel=...)）で照合が重複しないように
+        self._hits_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    @classmethod
+    def from_deals(cls, deals: Iterable[Dict], inspector) -> "ColumnarLedger":
+        """
+        freeeの取引データから台帳を構築
+
+        Args:
+            deals: 取引データ（リストまたはイテレータ）
+            inspector: 勘定科目の名称・分類に使う TaxInspector
+        """
+        deal_ids: List[Any] = []
+        dates: List[str] = []
+        types: List[Any] = []
+        account_ids: List[Any] = []
+        account_names: List[str] = []
+        account_flags: List[int] = []
+        tax_codes: List[Any] = []
+        amounts: List[int] = []
+        descriptions: List[str] = []
+
+        account_index = inspector.account_index
+        total_deals = 0
+        for deal in deals:
+            total_deals += 1
+            deal_id = deal.get('id')
+            issue_date = deal['issue_date']
+            deal_type = deal.get('type')
+            for detail in deal.get('details', []):
+                account_id = detail.get('account_item_id')
+                ac_name, flags = account_index.get(account_id) or inspector._account_info(account_id)
+                deal_ids.append(deal_id)
+                dates.append(issue_date)
+                types.append(deal_type)
+                account_ids.append(account_id)
+                account_names.append(ac_name)
+                account_flags.append(flags)
+                tax_codes.append(detail.get('tax_code'))
+                amounts.append(detail.get('amount', 0))
+                descriptions.append(detail.get('description') or '')
+
+        frame = pd.DataFrame({
+            "deal_id": pd.array(deal_ids, dtype="Int64"),
+            "issue_date": pd.to_datetime(pd.Series(dates, dtype=object), format="%Y-%m-%d"),
+            "type": pd.Categorical(types),
+            "account_item_id": pd.array(account_ids, dtype="Int64"),
+            "account_name": pd.Categorical(account_names),
+            "account_flags": np.asarray(account_flags, dtype=np.int64),
+            "tax_code": pd.array(tax_codes, dtype="Int64"),
+            "amount": np.asarray(amounts, dtype=np.int64),
+            "description": pd.Categorical(descriptions),
+        }, columns=cls.COLUMNS)
+        return cls(frame, total_deals)
+
+    # ========================================
+    # 抽出ヘルパー
+    # ========================================
+
+    def select(self, deal_types: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """取引種別で絞り込んだ行（None なら全行）"""
+        if deal_types is None:
+            return self.frame
+        return self.frame[self.frame["type"].isin(deal_types)]
+
+    @staticmethod
+    def has_flag(rows: pd.DataFrame, category: int) -> pd.Series:
+        """勘定科目の分類ビットが立っている行"""
+        return (rows["account_flags"] & category) != 0
+
+    def set_matcher(self, match: Optional[Callable[[str], Dict[str, str]]]) -> None:
+        """摘要キーワードの照合関数（KeywordMatcher.match）を設定"""
+        if match is not self._match:
+            self._match = match
+            self._hits_by_category = None
+
+    def keyword_hits(self, rows: pd.DataFrame, code: str) -> pd.Series:
+        """
+        チェック番号 code の摘要キーワードのヒット（ヒットなしは None）
+
+        照合は摘要の種類（カテゴリ）ごとに1回だけ行う。
+        """
+        with self._hits_lock:
+            if self._hits_by_category is None:
+                categories = self.frame["description"].cat.categories
+                match = self._match
+                self._hits_by_category = [
+                    match(desc) if match is not None and desc else {} for desc in categories
+                ]
+            hits_by_category = self._hits_by_category
+        per_category = np.array([hits.get(code) for hits in hits_by_category] + [None],
+                                dtype=object)
+        # cat.codes は欠損時 -1 → 末尾の None を参照
+        return pd.Series(per_category[rows["description"].cat.codes.to_numpy()], index=rows.index)
+
+    @staticmethod
+    def dates(rows: pd.DataFrame) -> List[str]:
+        """発生日の文字列 (YYYY-MM-DD)"""
+        return np.datetime_as_string(rows["issue_date"].to_numpy(), unit="D").tolist()
+
+    @staticmethod
+    def months(rows: pd.DataFrame) -> pd.Series:
+        """発生月の文字列 (YYYY-MM)"""
+        return pd.Series(np.datetime_as_string(rows["issue_date"].to_numpy(), unit="M"),
+                         index=rows.index)
+
+    @classmethod
+    def records(cls, rows: pd.DataFrame, **fields: str) -> List[Dict[str, Any]]:
+        """
+        行を dict のリストに変換（キー順は fields の順）
+
+        fields の値は列名。"date" を指定すると発生日を YYYY-MM-DD で出力する。
+        """
+        columns = []
+        for column in fields.values():
+            if column == "date":
+                columns.append(cls.dates(rows))
+                continue
+            values = rows[column]
+            if values.hasnans:
+                values = values.astype(object).where(values.notna(), None)
+            columns.append(values.tolist())
+        keys = list(fields)
+        return [dict(zip(keys, values)) for values in zip(*columns)]
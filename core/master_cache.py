@@ -0,0 +1,173 @@
+"""
+マスタデータ（勘定科目・税区分）のTTLキャッシュ
+
+勘定科目・税区分はほとんど変わらないため、事業所ごとに一定時間キャッシュし、
+監査リクエストのたびに発生していたAPI往復をなくす。
+メモリ上に加えて data/cache/ 配下のJSONにも保存し、サーバー再起動後も再利用する。
+
+    cache = MasterDataCache(DATA_DIR / "cache")
+    client = FreeeClient(token, company_id, master_cache=cache)
+    account_map = client.get_account_items()   # 2回目以降はキャッシュから
+    cache.invalidate(company_id)               # freee側で科目を追加したとき
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+
+class MasterDataCache:
+    """事業所ごとのマスタデータキャッシュ（TTL・明示的な無効化・ディスク永続化）"""
+
+    # 既定の有効期間（秒）
+    DEFAULT_TTL = 24 * 60 * 60
+
+    def __init__(self, cache_dir: Union[str, Path], ttl: float = DEFAULT_TTL):
+        """
+        Args:
+            cache_dir: キャッシュファイルの保存先ディレクトリ
+            ttl: 有効期間（秒）
+        """
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        # _lock は辞書の読み書きだけに使い、freeeからの取得・ファイル入出力は事業所ごとのロックで行う
+        # （ある事業所のマスタ取得が遅くても、他の事業所のキャッシュ済みの読み出しは待たない）
+        self._lock = threading.Lock()
+        self._company_locks: Dict[int, threading.Lock] = {}
+        # (company_id, kind) → (取得時刻, データ)
+        self._entries: Dict[Tuple[int, str], Tuple[float, Dict]] = {}
+        # (company_id, name) → マスタから派生した値（勘定科目インデックス等。メモリのみ）
+        self._derived: Dict[Tuple[int, str], Any] = {}
+
+    def get(self, company_id: int, kind: str, loader: Callable[[], Dict]) -> Dict:
+        """
+        マスタデータを取得（期限切れ・未取得なら loader で取り直す）
+
+        Args:
+            company_id: 事業所ID
+            kind: マスタの種類（"account_items", "tax_codes" など）
+            loader: freeeから取得する関数
+
+        Returns:
+            マスタデータ（呼び出し側で変更しないこと）
+        """
+        key = (company_id, kind)
+        entry = self._fresh_entry(key)
+        if entry is not None:
+            return entry[1]
+
+        # 同じ事業所の取得は1回にまとめる（待っている間に他のスレッドが取得していればそれを使う）
+        with self._company_lock(company_id):
+            entry = self._fresh_entry(key)
+            if entry is not None:
+                return entry[1]
+
+            entry = self._read_file(company_id).get(kind)
+            if entry is None or not self._is_fresh(entry[0]):
+                entry = (time.time(), loader())
+                self._write_entry(company_id, kind, entry)
+            with self._lock:
+                self._entries[key] = entry
+                self._drop_derived(company_id)
+            return entry[1]
+
+    def derived(self, company_id: int, name: str, builder: Callable[[], Any]) -> Any:
+        """
+        マスタから派生した値を取得（マスタの再取得・無効化で作り直す）
+
+        Args:
+            company_id: 事業所ID
+            name: 派生値の名前（"account_index" など）
+            builder: 値を構築する関数
+        """
+        key = (company_id, name)
+        with self._lock:
+            if key in self._derived:
+                return self._derived[key]
+
+        with self._company_lock(company_id):
+            with self._lock:
+                if key in self._derived:
+                    return self._derived[key]
+            value = builder()
+            with self._lock:
+                self._derived[key] = value
+            return value
+
+    def invalidate(self, company_id: int, kind: Optional[str] = None) -> None:
+        """
+        キャッシュを破棄
+
+        Args:
+            company_id: 事業所ID
+            kind: マスタの種類（None なら事業所の全マスタ）
+        """
+        with self._company_lock(company_id):
+            with self._lock:
+                self._drop_derived(company_id)
+                if kind is None:
+                    for key in [k for k in self._entries if k[0] == company_id]:
+                        del self._entries[key]
+                else:
+                    self._entries.pop((company_id, kind), None)
+            if kind is None:
+                self._path(company_id).unlink(missing_ok=True)
+                return
+
+            entries = self._read_file(company_id)
+            if entries.pop(kind, None) is not None:
+                self._write_file(company_id, entries)
+
+    def _fresh_entry(self, key: Tuple[int, str]) -> Optional[Tuple[float, Dict]]:
+        """メモリ上の有効なエントリ（なければ None）"""
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry if entry is not None and self._is_fresh(entry[0]) else None
+
+    def _company_lock(self, company_id: int) -> threading.Lock:
+        with self._lock:
+            return self._company_locks.setdefault(company_id, threading.Lock())
+
+    def _is_fresh(self, fetched_at: float) -> bool:
+        return time.time() - fetched_at < self.ttl
+
+    def _drop_derived(self, company_id: int) -> None:
+        for key in [k for k in self._derived if k[0] == company_id]:
+            del self._derived[key]
+
+    # ========================================
+    # ディスク永続化
+    # ========================================
+
+    def _path(self, company_id: int) -> Path:
+        return self.cache_dir / f"masters_{int(company_id)}.json"
+
+    def _read_file(self, company_id: int) -> Dict[str, Tuple[float, Dict]]:
+        """キャッシュファイルを読み込み（壊れていれば空扱い）"""
+        try:
+            raw = json.loads(self._path(company_id).read_text(encoding="utf-8"))
+            # JSONのキーは文字列になるため [キー, 値] の組で保存している
+            return {
+                kind: (entry["fetched_at"], {k: v for k, v in entry["items"]})
+                for kind, entry in raw.items()
+            }
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    def _write_entry(self, company_id: int, kind: str, entry: Tuple[float, Dict]) -> None:
+        entries = self._read_file(company_id)
+        entries[kind] = entry
+        self._write_file(company_id, entries)
+
+    def _write_file(self, company_id: int, entries: Dict[str, Tuple[float, Dict]]) -> None:
+        """キャッシュファイルを書き込み（一時ファイル経由で置き換え）"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(company_id)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({
+            kind: {"fetched_at": fetched_at, "items": list(data.items())}
+            for kind, (fetched_at, data) in entries.items()
+        }, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
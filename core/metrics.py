@@ -0,0 +1,163 @@
+"""
+監査の計測（チェックごとの処理時間・件数）
+
+TaxInspector.inspect_all(metrics=True) がチェックごとの実行時間・走査件数・検出件数を
+CheckStats で記録し、InspectionResult.details['metrics'] に出力する。
+チェックの時間は集計（finish / evaluate_columnar）の実測と、明細ごとの visit() の推定の合計。
+visit() は配信先（取引種別・科目の分類）ごとに VISIT_SAMPLE_EVERY 件に1件だけ計り、走査件数に
+比例させて全件分に換算する（全明細を計ると計時そのものが走査を遅くするため）。走査全体は scan_seconds。
+走査件数・エントリ数は走査の後で配信先ごとの明細数から求める。
+AuditMetrics は監査ごとの計測値を累積し、Prometheus のテキスト形式で出力する。
+
+    result = inspector.inspect_all(deals, metrics=True)
+    result.details['metrics']['checks']['15']   # {'seconds': 0.12, 'items': 50000, ...}
+
+    registry = AuditMetrics()
+    registry.observe(result.details['metrics'])
+    registry.render()                            # /api/metrics の本文
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List
+
+
+class CheckStats:
+    """1回の監査のチェックごとの計測値"""
+
+    # visit() の時間を計る間隔（配信先ごとに、この件数の明細に1件。1なら全件）
+    VISIT_SAMPLE_EVERY = 64
+
+    def __init__(self, checks: List[Any], mode: str):
+        """
+        Args:
+            checks: 実行するチェック
+            mode: "scan"（単一パス）、"columnar"（列指向）または "delta"（差分再監査。
+                core.incremental.IncrementalAudit.apply）
+        """
+        self.mode = mode
+        self.started = time.perf_counter()
+        self.scan_seconds = 0.0
+        self.total_seconds = 0.0
+        self.total_deals = 0
+        # チェック番号 → [集計秒, 走査件数, エントリ数, 検出件数, 計った visit() の秒, 計った件数]
+        self._stats: Dict[str, list] = {check.code: [0.0, 0, 0, 0, 0.0, 0] for check in checks}
+        self._names = {check.code: check.name for check in checks}
+
+    def add_items(self, code: str, items: int, entries: int = 0) -> None:
+        """走査件数（配信した明細数）・エントリ数を加算"""
+        self._stats[code][1] += items
+        self._stats[code][2] += entries
+
+    def sample_visit(self, code: str, visit: Callable[[Any], Any], ctx: Any) -> Any:
+        """visit(ctx) を計時して呼ぶ（走査側が VISIT_SAMPLE_EVERY 件に1件だけ使う）"""
+        start = time.perf_counter()
+        entry = visit(ctx)
+        stat = self._stats[code]
+        stat[4] += time.perf_counter() - start
+        stat[5] += 1
+        return entry
+
+    def add_issues(self, code: str, issues: int) -> None:
+        """検出件数を加算（集計し直さずに前回の結果を使ったチェック用）"""
+        self._stats[code][3] += issues
+
+    @contextmanager
+    def evaluating(self, code: str, out):
+        """集計（finish / evaluate_columnar）の時間と、増えた issues の件数を記録"""
+        issues_before = len(out.issues)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._stats[code][0] += time.perf_counter() - start
+            self._stats[code][3] += len(out.issues) - issues_before
+
+    def finish(self, total_deals: int) -> None:
+        self.total_deals = total_deals
+        self.total_seconds = time.perf_counter() - self.started
+
+    def to_dict(self) -> Dict[str, Any]:
+        """details['metrics'] の形式"""
+        return {
+            'mode': self.mode,
+            'total_seconds': self.total_seconds,
+            'scan_seconds': self.scan_seconds,
+            'total_deals': self.total_deals,
+            'checks': {code: self._check_dict(code, *stat) for code, stat in self._stats.items()},
+        }
+
+    def _check_dict(self, code: str, seconds: float, items: int, entries: int, issues: int,
+                    sampled_seconds: float, sampled: int) -> Dict[str, Any]:
+        # 計った visit() の平均 × 走査件数（計っていなければ0）
+        visit_seconds = sampled_seconds * items / sampled if sampled else 0.0
+        return {
+            'name': self._names[code],
+            'seconds': seconds + visit_seconds,
+            'visit_seconds': visit_seconds,
+            'items': items,
+            'entries': entries,
+            'issues': issues,
+        }
+
+
+class AuditMetrics:
+    """監査の計測値の累積（Prometheus テキスト形式で出力）"""
+
+    PREFIX = "keiri"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._audits = 0
+        self._audit_seconds = 0.0
+        self._deals = 0
+        # チェック番号 → {'name', 'runs', 'seconds', 'items', 'issues'}
+        self._checks: Dict[str, Dict[str, Any]] = {}
+
+    def observe(self, metrics: Dict[str, Any]) -> None:
+        """1回の監査の計測値（details['metrics']）を加算"""
+        with self._lock:
+            self._audits += 1
+            self._audit_seconds += metrics['total_seconds']
+            self._deals += metrics['total_deals']
+            for code, stat in metrics['checks'].items():
+                total = self._checks.setdefault(
+                    code, {'name': stat['name'], 'runs': 0, 'seconds': 0.0, 'items': 0, 'issues': 0})
+                total['runs'] += 1
+                total['seconds'] += stat['seconds']
+                total['items'] += stat['items']
+                total['issues'] += stat['issues']
+
+    def render(self) -> str:
+        """Prometheus のテキスト形式（exposition format 0.0.4）"""
+        p = self.PREFIX
+        with self._lock:
+            lines = [
+                f"# HELP {p}_audits_total 実行した監査の回数",
+                f"# TYPE {p}_audits_total counter",
+                f"{p}_audits_total {self._audits}",
+                f"# HELP {p}_audit_seconds_total 監査の処理時間の合計（秒）",
+                f"# TYPE {p}_audit_seconds_total counter",
+                f"{p}_audit_seconds_total {self._audit_seconds:.6f}",
+                f"# HELP {p}_audit_deals_total 監査した取引数の合計",
+                f"# TYPE {p}_audit_deals_total counter",
+                f"{p}_audit_deals_total {self._deals}",
+            ]
+            series = [
+                ("check_runs_total", "チェックの実行回数", "runs", "{}"),
+                ("check_seconds_total", "チェックの処理時間の合計（秒）", "seconds", "{:.6f}"),
+                ("check_items_total", "チェックが走査した明細数の合計", "items", "{}"),
+                ("check_issues_total", "チェックが検出した問題数の合計", "issues", "{}"),
+            ]
+            for name, help_text, key, fmt in series:
+                lines.append(f"# HELP {p}_{name} {help_text}")
+                lines.append(f"# TYPE {p}_{name} counter")
+                for code, total in self._checks.items():
+                    labels = f'check="{self._escape(code)}",name="{self._escape(total["name"])}"'
+                    lines.append(f"{p}_{name}{{{labels}}} {fmt.format(total[key])}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _escape(value: str) -> str:
+        """ラベル値のエスケープ"""
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,139 @@
+"""
+銀行入金とfreee売上の突合
+
+BankCSVParser の入金（Transaction）と freee の売上取引を「金額が一致し、日付が
+許容日数以内」の組で1対1に対応づけ、対応する売上のない入金を売上計上漏れの候補として返す。
+
+    reconciler = Reconciler(window_days=3)
+    result = reconciler.reconcile(transactions, sales)
+    for deposit in result.unmatched_deposits:
+        print(deposit.date, deposit.amount, deposit.description)
+
+総当たりはせず、金額ごとのハッシュと日付順のソート済みリスト（bisect）で探すため
+O(n log n) で済む（入金・売上とも10万件で数秒以内）。
+"""
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, Iterable, List
+
+
+@dataclass
+class LedgerEntry:
+    """突合の対象1件（銀行入金またはfreee売上）"""
+    date: str                       # YYYY-MM-DD
+    amount: int
+    ref: Any = None                 # 入金なら元の Transaction / dict、売上なら取引ID
+    description: str = ""
+
+
+@dataclass
+class Match:
+    """対応づけられた入金と売上"""
+    deposit: LedgerEntry
+    sale: LedgerEntry
+    day_diff: int                   # 入金日 - 売上日（日数）
+
+
+@dataclass
+class ReconciliationResult:
+    """突合結果"""
+    matches: List[Match] = field(default_factory=list)
+    unmatched_deposits: List[LedgerEntry] = field(default_factory=list)
+    unmatched_sales: List[LedgerEntry] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, int]:
+        """件数と金額の集計"""
+        return {
+            'matched': len(self.matches),
+            'unmatched_deposits': len(self.unmatched_deposits),
+            'unmatched_deposit_total': sum(d.amount for d in self.unmatched_deposits),
+            'unmatched_sales': len(self.unmatched_sales),
+            'unmatched_sales_total': sum(s.amount for s in self.unmatched_sales),
+        }
+
+
+class Reconciler:
+    """銀行入金とfreee売上の突合エンジン"""
+
+    # 入金日と売上日の許容差（日）
+    DEFAULT_WINDOW_DAYS = 3
+
+    def __init__(self, window_days: int = DEFAULT_WINDOW_DAYS):
+        """
+        Args:
+            window_days: 入金日と売上日の許容差（前後それぞれ）
+        """
+        self.window_days = window_days
+
+    @staticmethod
+    def deposits(transactions: Iterable[Any]) -> List[LedgerEntry]:
+        """
+        銀行取引から入金だけを取り出す
+
+        Args:
+            transactions: Transaction、または {'date', 'amount', 'type', 'description'} の dict
+        """
+        entries = []
+        for t in transactions:
+            row = t if isinstance(t, dict) else {
+                'date': t.date, 'amount': t.amount, 'type': t.type, 'description': t.description
+            }
+            if row.get('type') != 'income' or not row.get('date'):
+                continue
+            entries.append(LedgerEntry(row['date'], row.get('amount', 0), t, row.get('description') or ''))
+        return entries
+
+    def reconcile(self, transactions: Iterable[Any], sales: Iterable[LedgerEntry]) -> ReconciliationResult:
+        """
+        入金と売上を1対1で対応づける
+
+        売上を金額ごと（ハッシュ）に日付順に並べ、入金の古い順に「許容範囲内で最も古い未対応の売上」を
+        bisect で探して割り当てる。各入金の許容範囲は日付順に単調に動くため、この貪欲法で
+        対応数が最大になる（未対応の入金＝計上漏れ候補が最小になる）。
+
+        Args:
+            transactions: 銀行取引（deposits() と同じ。入金以外は無視）
+            sales: freeeの売上（ref に取引ID）
+
+        Returns:
+            ReconciliationResult（未対応の入金・売上は日付順）
+        """
+        sales = list(sales)
+        by_amount: Dict[int, List[tuple]] = defaultdict(list)
+        for i, sale in enumerate(sales):
+            by_amount[sale.amount].append((self._ordinal(sale.date), i))
+        for bucket in by_amount.values():
+            bucket.sort()
+        # 金額ごとの「次に使える売上」の位置（それより前は対応済みか期限切れ）
+        cursor: Dict[int, int] = {}
+
+        result = ReconciliationResult()
+        matched_sales = bytearray(len(sales))
+        window = self.window_days
+        deposits = sorted(((self._ordinal(d.date), d) for d in self.deposits(transactions)),
+                          key=lambda x: x[0])
+        for day, deposit in deposits:
+            bucket = by_amount.get(deposit.amount)
+            if not bucket:
+                result.unmatched_deposits.append(deposit)
+                continue
+            pos = bisect_left(bucket, (day - window, -1), cursor.get(deposit.amount, 0))
+            if pos < len(bucket) and bucket[pos][0] <= day + window:
+                sale_day, i = bucket[pos]
+                matched_sales[i] = 1
+                result.matches.append(Match(deposit, sales[i], day - sale_day))
+                pos += 1
+            else:
+                result.unmatched_deposits.append(deposit)
+            cursor[deposit.amount] = pos
+
+        result.unmatched_sales = sorted((sale for i, sale in enumerate(sales) if not matched_sales[i]),
+                                        key=lambda s: s.date)
+        return result
+
+    @staticmethod
+    def _ordinal(value: str) -> int:
+        """YYYY-MM-DD を日数に変換"""
+        return date.fromisoformat(value[:10]).toordinal()
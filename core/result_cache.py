@@ -0,0 +1,152 @@
+"""
+監査結果のキャッシュ（内容アドレス方式）
+
+事業所ID・期間・期の境界・取引データのチェックサム・マスタ・チェックの版から鍵（SHA-256）を作り、
+監査結果（InspectionResult）を data/results/<鍵>.json に保存する。
+取引やマスタが1件でも変われば鍵が変わるため、無効化は不要（古い結果は使われずに追い出される）。
+
+    cache = ResultCache(DATA_DIR / "results")
+    key = cache.make_key(company_id=1, start_date=..., deals=deal_store.checksum(1, ...),
+                         masters=[account_map, tax_map], rules=rules_version())
+    result = cache.get(key)
+    if result is None:
+        result = inspector.inspect_all(deals, ...)
+        cache.put(key, result)
+
+容量は件数と合計サイズで制限し、超えたら最後に使われた時刻（ファイルの更新時刻）の
+古いものから削除する（LRU）。
+"""
+import dataclasses
+import hashlib
+import json
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from .tax_inspector import InspectionResult, Issue, RiskLevel
+
+
+# 監査結果（InspectionResult）の中身を作るモジュール（core/ からの相対パス）。
+# 列指向の集計・差分再監査・計測も結果に入るため、チェック本体と同じく版に含める
+RESULT_SOURCES = ("tax_inspector.py", "reconciler.py", "ledger.py", "incremental.py", "metrics.py")
+
+
+@lru_cache(maxsize=1)
+def rules_version() -> str:
+    """チェックの版（検査ロジックのソースのハッシュ。コードを変えれば別の鍵になる）"""
+    core_dir = Path(__file__).resolve().parent
+    sources = [core_dir / name for name in RESULT_SOURCES]
+    sources += sorted((core_dir / "checks").glob("*.py"))
+    digest = hashlib.sha256()
+    for path in sources:
+        digest.update(path.name.encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class ResultCache:
+    """監査結果のディスクキャッシュ（内容アドレス・LRU・件数とサイズの上限）"""
+
+    # 既定の上限
+    DEFAULT_MAX_ENTRIES = 200
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, cache_dir: Union[str, Path],
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            cache_dir: 保存先ディレクトリ
+            max_entries: 保存する結果の最大件数
+            max_bytes: 保存する結果の合計サイズの上限（バイト）
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(**parts: Any) -> str:
+        """鍵の材料（JSONにできる値）から鍵を作る"""
+        material = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[InspectionResult]:
+        """保存済みの監査結果（なければ、または壊れていれば None）"""
+        path = self._path(key)
+        with self._lock:
+            try:
+                raw = json.loads(path.read_text(encoding="utf-8"))
+                result = self._from_dict(raw)
+            except FileNotFoundError:
+                return None
+            except (OSError, ValueError, KeyError, TypeError):
+                path.unlink(missing_ok=True)
+                return None
+            # 最後に使われた時刻を更新（追い出しの順番）
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return result
+
+    def put(self, key: str, result: InspectionResult) -> None:
+        """監査結果を保存し、上限を超えた分を古いものから削除"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        data = json.dumps(self._to_dict(result), ensure_ascii=False, default=str)
+        with self._lock:
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(data, encoding="utf-8")
+            os.replace(tmp, path)
+            self._evict()
+
+    def clear(self) -> None:
+        """全件削除"""
+        with self._lock:
+            for path in self.cache_dir.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort(key=lambda e: e[0])
+
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+        for _, size, path in entries:
+            # 直前に保存した1件は上限を超えていても残す
+            if count <= 1 or (count <= self.max_entries and total <= self.max_bytes):
+                break
+            path.unlink(missing_ok=True)
+            count -= 1
+            total -= size
+
+    def _path(self, key: str) -> Path:
+        if not key or any(c not in "0123456789abcdef" for c in key):
+            raise ValueError(f"不正なキャッシュキー: {key}")
+        return self.cache_dir / f"{key}.json"
+
+    # ========================================
+    # InspectionResult ⇔ JSON
+    # ========================================
+
+    @staticmethod
+    def _to_dict(result: InspectionResult) -> Dict[str, Any]:
+        data = dataclasses.asdict(result)
+        for issue in data["issues"]:
+            issue["risk_level"] = issue["risk_level"].value
+        return data
+
+    @staticmethod
+    def _from_dict(data: Dict[str, Any]) -> InspectionResult:
+        issues = [Issue(**dict(issue, risk_level=RiskLevel(issue["risk_level"])))
+                  for issue in data["issues"]]
+        return InspectionResult(**dict(data, issues=issues))
@@ -0,0 +1,119 @@
+"""
+税区分の一括修正
+
+修正指示を取引ごとにまとめ、取引単位で「取得 → 税区分の置換 → 更新」を
+ワーカープールで並列に実行する（ある取引の更新中に次の取引を取得できる）。
+レート制限（429）の待機・再試行は FreeeClient 側で行う。
+
+    fixer = TaxCodeFixer(client)
+    for outcome in fixer.run(fixes):   # 取引ごとに完了した順で返る
+        print(outcome['deal_id'], outcome['results'])
+"""
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List
+
+from .freee_client import FreeeClient
+
+
+class TaxCodeFixer:
+    """税区分の一括修正エグゼキューター"""
+
+    # 同時に処理する取引数（全体のリクエスト数は FreeeClient のレート制限で抑える）
+    DEFAULT_WORKERS = 4
+
+    def __init__(self, client: FreeeClient, max_workers: int = DEFAULT_WORKERS):
+        """
+        Args:
+            client: 対象事業所の FreeeClient
+            max_workers: 同時に処理する取引数の上限
+        """
+        self.client = client
+        self.max_workers = max_workers
+
+    @staticmethod
+    def group(fixes: List[Dict]) -> Dict[Any, List[Dict]]:
+        """修正指示を取引IDごとにまとめる（取引・指示とも初出順）"""
+        grouped: Dict[Any, List[Dict]] = {}
+        for fix in fixes:
+            grouped.setdefault(fix.get('deal_id'), []).append(fix)
+        return grouped
+
+    def run(self, fixes: List[Dict]) -> Iterator[Dict]:
+        """
+        修正を実行し、取引ごとの結果を完了順に返す
+
+        Args:
+            fixes: [{"deal_id": 123, "old_tax_code": 21, "new_tax_code": 136}, ...]
+
+        Yields:
+            {'deal_id': 取引ID, 'results': 修正指示ごとの結果, 'deal': 更新後の Deal（失敗時 None）}
+        """
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        futures: List[Future] = []
+        try:
+            futures += [executor.submit(self._fix_deal, deal_id, deal_fixes)
+                       for deal_id, deal_fixes in self.group(fixes).items()]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # 途中で打ち切られた場合（クライアント切断など）は未着手の取引を取り消す
+            # （shutdown の cancel_futures は Python 3.9 以降のため自前で取り消す）
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def _fix_deal(self, deal_id, fixes: List[Dict]) -> Dict:
+        """1取引分の修正（取得 → 全指示を順に適用 → 1回の更新）"""
+        try:
+            deal = self.client.get_deal(deal_id)
+            if deal is None:
+                return self._outcome(deal_id, fixes, error='取引が見つかりません')
+
+            # 指示は順に適用する（1件ずつ取得・更新していた場合と同じ結果になる）
+            tax_codes = [d.get('tax_code') for d in deal.details]
+            for fix in fixes:
+                old_tax_code = fix.get('old_tax_code')
+                new_tax_code = fix.get('new_tax_code')
+                tax_codes = [new_tax_code if code == old_tax_code else code for code in tax_codes]
+
+            update_data = {
+                'company_id': self.client.company_id,
+                'issue_date': deal.issue_date,
+                'type': deal.type,
+                'details': [
+                    {
+                        'account_item_id': d['account_item_id'],
+                        'tax_code': tax_code,
+                        'amount': d['amount'],
+                        'description': d.get('description', '')
+                    }
+                    for d, tax_code in zip(deal.details, tax_codes)
+                ]
+            }
+            resp = self.client.request('PUT', f'/deals/{deal_id}', json=update_data)
+
+            if resp.status_code != 200:
+                error_msg = resp.json().get('errors', [{}])[0].get('messages', ['更新失敗'])
+                return self._outcome(deal_id, fixes, error=str(error_msg))
+
+            updated = resp.json().get('deal')
+            return self._outcome(deal_id, fixes, deal=self.client.parse_deal(updated) if updated else None)
+
+        except Exception as e:
+            return self._outcome(deal_id, fixes, error=str(e))
+
+    @staticmethod
+    def _outcome(deal_id, fixes: List[Dict], deal=None, error: str = None) -> Dict:
+        """取引の結果を修正指示ごとの結果に展開"""
+        if error is not None:
+            results = [{'deal_id': deal_id, 'success': False, 'error': error} for _ in fixes]
+        else:
+            results = [
+                {
+                    'deal_id': deal_id,
+                    'success': True,
+                    'message': f'税区分を{fix.get("old_tax_code")}→{fix.get("new_tax_code")}に修正'
+                }
+                for fix in fixes
+            ]
+        return {'deal_id': deal_id, 'results': results, 'deal': deal}
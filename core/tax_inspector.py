@@ -11,10 +11,14 @@
 【帳簿】20: 帳簿不備
 """
 import json
-from typing import List, Dict, Any, Optional
+import time
+from collections import Counter
+from contextlib import nullcontext
+from functools import partial
+from itertools import repeat
+from typing import List, Dict, Any, Callable, Iterable, Optional, Sequence, Tuple, Union
 from dataclasses import dataclass, field
 from enum import Enum
-from collections import defaultdict
 from datetime import datetime
 
 
@@ -26,6 +30,26 @@ class RiskLevel(Enum):
     NONE = "none"      # 問題なし
 
 
+class AccountCategory:
+    """
+    勘定科目のチェック分類（ビットフラグ）
+
+    1科目が複数の分類に該当しうるため、OR で組み合わせた int で保持する。
+    """
+    CASH = 1 << 0                   # 02: 現金
+    PERSONNEL = 1 << 1              # 04: 給料・給与・賞与・役員報酬
+    OUTSOURCING = 1 << 2            # 05: 外注費
+    WITHHOLDING = 1 << 3            # 06: 源泉対象の報酬・料金
+    OFFICER_COMPENSATION = 1 << 4   # 07: 役員報酬
+    OFFICER_BONUS = 1 << 5          # 08: 役員賞与
+    OFFICER_LOAN = 1 << 6           # 09: 役員貸付・短期貸付
+    BENEFIT = 1 << 7                # 10: 社宅・保険・車両・福利厚生
+    ENTERTAINMENT = 1 << 8          # 11: 交際費・接待
+    PURCHASE = 1 << 9               # 14: 仕入
+    INVENTORY = 1 << 10             # 14: 棚卸・在庫
+    FOOD = 1 << 11                  # 16: 軽減税率の対象になりうる科目
+
+
 @dataclass
 class Issue:
     """検出された問題"""
@@ -50,6 +74,15 @@ class InspectionResult:
     report: str = ""
     details: Dict[str, Any] = field(default_factory=dict)
 
+    def merge(self, other: "InspectionResult") -> None:
+        """チェック単位で集計した部分結果を加算（issues・details は other の順で後ろに追加）"""
+        self.total_checks += other.total_checks
+        self.passed += other.passed
+        self.warnings += other.warnings
+        self.errors += other.errors
+        self.issues.extend(other.issues)
+        self.details.update(other.details)
+
 
 class TaxInspector:
     """
@@ -159,721 +192,338 @@ class TaxInspector:
         ("コンビニ", "消耗品費", "LOW", "コンビニでの購入は私的利用の疑い"),
     ]
 
-    def __init__(self, account_map: Dict[int, str] = None, tax_map: Dict[int, str] = None):
+    # 勘定科目名の分類キーワード（科目名にいずれかを含めば該当）
+    ACCOUNT_CATEGORY_KEYWORDS = {
+        AccountCategory.CASH: ['現金'],
+        AccountCategory.PERSONNEL: ['給料', '給与', '賞与', '役員報酬'],
+        AccountCategory.OUTSOURCING: ['外注'],
+        AccountCategory.WITHHOLDING: ['報酬', '顧問料', '講師', 'コンサル', '原稿', 'デザイン'],
+        AccountCategory.OFFICER_COMPENSATION: ['役員報酬'],
+        AccountCategory.OFFICER_BONUS: ['役員賞与'],
+        AccountCategory.OFFICER_LOAN: ['役員貸付', '短期貸付'],
+        AccountCategory.BENEFIT: ['社宅', '保険', '車両', '福利厚生'],
+        AccountCategory.ENTERTAINMENT: ['交際費', '接待'],
+        AccountCategory.PURCHASE: ['仕入'],
+        AccountCategory.INVENTORY: ['棚卸', '在庫'],
+        AccountCategory.FOOD: ['仕入', '食', '飲料'],
+    }
+
+    def __init__(self, account_map: Dict[int, str] = None, tax_map: Dict[int, str] = None,
+                 account_index: Optional[Dict[Any, Tuple[str, int]]] = None):
         """
         Args:
             account_map: 勘定科目ID→名称のマップ
             tax_map: 税区分コード→名称のマップ
+            account_index: build_account_index(account_map) の構築済み結果
+                （MasterDataCache.derived で監査をまたいで共有できる）
         """
         self.account_map = account_map or {}
         self.tax_map = tax_map or self.TAX_CODES
         self.result = InspectionResult()
-
-    def inspect_all(self, deals: List[Dict],
+        # 勘定科目ID → (名称, 分類ビット) を構築時に1回だけ計算
+        if account_index is None:
+            account_index = self.build_account_index(self.account_map)
+        self.account_index: Dict[Any, Tuple[str, int]] = account_index
+
+    @classmethod
+    def build_account_index(cls, account_map: Dict[int, str]) -> Dict[Any, Tuple[str, int]]:
+        """勘定科目ID → (名称, 分類ビット) のインデックスを構築"""
+        index = {}
+        for account_id, ac_name in account_map.items():
+            ac_name = str(ac_name)
+            index[account_id] = (ac_name, cls.classify_account(ac_name))
+        return index
+
+    @classmethod
+    def classify_account(cls, account_name: str) -> int:
+        """勘定科目名をチェック分類のビットセット（AccountCategory の OR）に変換"""
+        flags = 0
+        for category, keywords in cls.ACCOUNT_CATEGORY_KEYWORDS.items():
+            if any(kw in account_name for kw in keywords):
+                flags |= category
+        return flags
+
+    def _classify(self, account_id) -> Tuple[str, int]:
+        """勘定科目IDの (名称, 分類ビット) を計算"""
+        ac_name = str(self._get_account_name(account_id))
+        return ac_name, self.classify_account(ac_name)
+
+    def _account_info(self, account_id) -> Tuple[str, int]:
+        """勘定科目IDの (名称, 分類ビット) を取得（マスタ外のIDは初回のみ計算）"""
+        info = self.account_index.get(account_id)
+        if info is None:
+            info = self.account_index[account_id] = self._classify(account_id)
+        return info
+
+    def inspect_all(self, deals: Iterable[Dict],
                     fiscal_year_start: str = None,
                     period_boundary: str = None,
-                    bank_data: Dict = None) -> InspectionResult:
+                    bank_data: Dict = None,
+                    columnar: bool = False,
+                    on_check: Optional[Callable[[str, int, int], None]] = None,
+                    metrics: bool = False,
+                    profiler: Any = None,
+                    parallel: int = 0,
+                    checks: Union[str, Sequence[str], None] = None) -> InspectionResult:
         """
         厳選20項目の追徴直結チェックを実行
 
+        取引・明細は1回だけ走査し、各明細を全チェックへ順に配信する（単一パス）。
+        チェックごとに全件を走査し直すことはない。
+
         Args:
-            deals: 取引データのリスト
+            deals: 取引データ（リスト・イテレータ、または構築済みの ColumnarLedger）。
+                1回だけ走査するため、ジェネレータを渡せば全件をメモリに持たずに検査できる
             fiscal_year_start: 事業年度開始日 (例: "2024-05-01")
             period_boundary: 期の境界日 (例: "2025-05-01"で1期と2期を分ける)
-            bank_data: 銀行データ（照合用）{'balance': int, 'transactions': list}
+            bank_data: 銀行データ（照合用）{'income_total': int, 'transactions': list, 'window_days': int}
+                transactions（BankCSVParser の Transaction または dict）を渡すと、
+                入金ごとに売上取引と突合する（core.reconciler）
+            columnar: True なら列指向台帳（pandas）上のフィルタ・group-by で集計する。
+                複数年度など大量データ向け。結果は通常モードと同一
+            on_check: チェックの集計が終わるたびに (チェック番号, 完了数, 総数) で呼ばれる
+            metrics: True ならチェックごとの処理時間（集計の実測と、抜き取りで計った visit() の
+                推定の合計）・走査件数・検出件数を details['metrics'] に記録する（core.metrics.CheckStats）
+            profiler: 検査の間だけ有効にするプロファイラ。enable()/disable() を持つもの
+                （cProfile.Profile）か start()/stop() を持つもの（pyinstrument.Profiler）
+            parallel: 2以上なら、その数のスレッドでチェックの集計（finish / evaluate_columnar）を
+                並列に実行する。チェックごとの部分結果をチェック順に合成するため、issues・details の
+                並びと件数は逐次実行と同一。列指向モード（pandas の集計は GIL を解放する）や
+                free-threaded ビルドで効く
+            checks: 実行するチェック番号（例: ["15", "16", "17"] または "15,16,17" で消費税だけ）。None なら
+                レジストリ（core.checks.registry）で有効なもの全て。指定外のチェックのモジュールは
+                読み込まず、明細も配信しない
 
         Returns:
             InspectionResult: 監査結果（issues, errors, warnings等を含む）
         """
-        self.result = InspectionResult()
-        self.result.details = {
-            "inspection_date": datetime.now().isoformat(),
-            "total_deals": len(deals),
-            "fiscal_year_start": fiscal_year_start,
-        }
-
-        # 【売上・現金】1-3
-        self._check_01_sales_omission(deals, bank_data)
-        self._check_02_cash_sales_exclusion(deals)
-        self._check_03_period_shift(deals, fiscal_year_start)
-
-        # 【人件費】4-6
-        self._check_04_fake_personnel(deals)
-        self._check_05_outsourcing_as_salary(deals)
-        self._check_06_withholding_omission(deals)
-
-        # 【役員関連】7-10
-        self._check_07_officer_compensation_change(deals, period_boundary)
-        self._check_08_officer_bonus(deals)
-        self._check_09_officer_loans(deals)
-        self._check_10_officer_benefit(deals)
-
-        # 【経費】11-14
-        self._check_11_entertainment(deals)
-        self._check_12_private_expense(deals)
-        self._check_13_fake_expense(deals)
-        self._check_14_inventory_omission(deals)
-
-        # 【消費税】15-17
-        self._check_15_tax_code_error(deals)
-        self._check_16_reduced_tax_error(deals)
-        self._check_17_invoice_denial(deals)
-
-        # 【関係者取引】18-19
-        self._check_18_related_party_payment(deals)
-        self._check_19_related_party_purchase(deals)
-
-        # 【帳簿】20
-        self._check_20_poor_records(deals)
-
-        # 勘定科目別集計（参考情報）
-        self._account_summary(deals)
+        self._reset_result(fiscal_year_start)
+        checks = self._create_checks(fiscal_year_start, period_boundary, bank_data, codes=checks)
+
+        use_columnar = columnar or self._is_ledger(deals)
+        stats = None
+        if metrics:
+            from .metrics import CheckStats
+            stats = CheckStats(checks, "columnar" if use_columnar else "scan")
+
+        if profiler is not None:
+            (getattr(profiler, "enable", None) or profiler.start)()
+        try:
+            if use_columnar:
+                evaluators = self._run_columnar(deals, checks, stats)
+            else:
+                # 全チェック分のエントリを1回の走査で収集
+                entries, total_deals = self._scan(deals, checks, stats)
+                self.result.details["total_deals"] = total_deals
+                evaluators = [partial(check.finish, check_entries)
+                              for check, check_entries in zip(checks, entries)]
+
+            # チェック順に集計（issues・details の並びは従来と同一）
+            self._evaluate(checks, evaluators, on_check, stats, parallel)
+        finally:
+            if profiler is not None:
+                (getattr(profiler, "disable", None) or profiler.stop)()
+
+        if stats:
+            stats.finish(self.result.details["total_deals"])
+            self.result.details["metrics"] = stats.to_dict()
 
         # レポート生成
         self._generate_report()
 
         return self.result
 
-    def _get_account_name(self, account_id: int) -> str:
-        """勘定科目IDから名称を取得"""
-        return self.account_map.get(account_id, str(account_id))
-
-    # ========================================
-    # 【売上・現金】1-3: 追徴の最大要因
-    # ========================================
-
-    def _check_01_sales_omission(self, deals: List[Dict], bank_data: Dict = None):
-        """1. 売上計上漏れ: 銀行入金とfreee売上の不一致"""
-        sales = []
-        for deal in deals:
-            if deal.get('type') == 'income':
-                for detail in deal.get('details', []):
-                    sales.append({
-                        'date': deal['issue_date'],
-                        'amount': detail.get('amount', 0),
-                    })
-
-        total_sales = sum(s['amount'] for s in sales)
-        self.result.details['01_sales'] = {'total': total_sales, 'count': len(sales)}
-
-        # 銀行データとの照合（提供された場合）
-        if bank_data and bank_data.get('income_total'):
-            diff = bank_data['income_total'] - total_sales
-            if diff > 10000:  # 1万円以上の差異
-                self.result.errors += 1
-                self.result.issues.append(Issue(
-                    category="01.売上漏れ",
-                    title="銀行入金とfreee売上の不一致",
-                    description=f"銀行入金: {bank_data['income_total']:,}円 / freee売上: {total_sales:,}円 / 差額: {diff:,}円",
-                    risk_level=RiskLevel.HIGH,
-                    suggestion="売上計上漏れがないか確認。重加算税の対象になる可能性"
-                ))
-
-    def _check_02_cash_sales_exclusion(self, deals: List[Dict]):
-        """2. 現金売上の除外: 現金勘定の異常な動き"""
-        cash_movements = []
-        for deal in deals:
-            for detail in deal.get('details', []):
-                ac_name = str(self._get_account_name(detail.get('account_item_id')))
-                if '現金' in ac_name:
-                    cash_movements.append({
-                        'date': deal['issue_date'],
-                        'amount': detail.get('amount', 0),
-                        'type': deal.get('type'),
-                        'desc': detail.get('description') or '',
-                    })
-
-        self.result.details['02_cash'] = cash_movements
-        # 現金残高がマイナスになるパターンを検出
-        if cash_movements:
-            self.result.warnings += 1
-            self.result.issues.append(Issue(
-                category="02.現金",
-                title="現金取引あり",
-                description=f"{len(cash_movements)}件の現金取引（税務調査で重点確認される）",
-                risk_level=RiskLevel.MEDIUM,
-                suggestion="現金売上の記録漏れがないか確認"
-            ))
-
-    def _check_03_period_shift(self, deals: List[Dict], fiscal_year_start: str = None):
-        """3. 期ズレ: 売上の翌期繰延"""
-        # 期末月の売上が異常に少ないかチェック
-        if not fiscal_year_start:
-            return
-
-        monthly_sales = defaultdict(int)
-        for deal in deals:
-            if deal.get('type') == 'income':
-                month = deal['issue_date'][:7]
-                for detail in deal.get('details', []):
-                    monthly_sales[month] += detail.get('amount', 0)
-
-        self.result.details['03_period_shift'] = dict(monthly_sales)
-
-    # ========================================
-    # 【人件費】4-6: 架空・水増しは重加算税
-    # ========================================
-
-    def _check_04_fake_personnel(self, deals: List[Dict]):
-        """4. 架空人件費: 支払先不明・摘要なし"""
-        personnel = []
-        no_desc = []
-
-        for deal in deals:
-            for detail in deal.get('details', []):
-                ac_name = str(self._get_account_name(detail.get('account_item_id')))
-                if any(kw in ac_name for kw in ['給料', '給与', '賞与', '役員報酬']):
-                    entry = {
-                        'date': deal['issue_date'],
-                        'amount': detail.get('amount', 0),
-                        'desc': detail.get('description') or '',
-                        'account': ac_name,
-                        'id': deal['id']
-                    }
-                    personnel.append(entry)
-                    if not entry['desc'] and entry['amount'] >= 50000:
-                        no_desc.append(entry)
-
-        self.result.details['04_personnel'] = {'total': len(personnel), 'no_desc': len(no_desc)}
-
-        if no_desc:
-            self.result.errors += 1
-            self.result.issues.append(Issue(
-                category="04.架空人件費",
-                title="支払先不明の人件費",
-                description=f"{len(no_desc)}件の5万円以上の人件費に摘要なし",
-                risk_level=RiskLevel.HIGH,
-                suggestion="架空人件費と認定されると重加算税35%の対象"
-            ))
-
-    def _check_05_outsourcing_as_salary(self, deals: List[Dict]):
-        """5. 外注費の給与認定: 毎月同額・特定1社への継続支払"""
-        outsourcing = []
-        monthly_by_desc = defaultdict(lambda: defaultdict(int))
-
-        for deal in deals:
-            for detail in deal.get('details', []):
-                ac_name = str(self._get_account_name(detail.get('account_item_id')))
-                if '外注' in ac_name:
-                    desc = (detail.get('description') or '')[:30]
-                    outsourcing.append({
-                        'date': deal['issue_date'],
-                        'amount': detail.get('amount', 0),
-                        'desc': desc,
-                    })
-                    month = deal['issue_date'][:7]
-                    monthly_by_desc[desc][month] += detail.get('amount', 0)
-
-        # 毎月同額パターン（給与性が疑われる）
-        wage_like = []
-        for desc, months in monthly_by_desc.items():
-            if len(months) >= 3:
-                amounts = list(months.values())
-                if len(set(amounts)) == 1:  # 全月同額
-                    wage_like.append({'desc': desc, 'amount': amounts[0], 'months': len(months)})
-
-        self.result.details['05_outsourcing'] = {
-            'total': sum(o['amount'] for o in outsourcing),
-            'count': len(outsourcing),
-            'wage_like': wage_like
+    def _reset_result(self, fiscal_year_start: str = None) -> None:
+        """監査結果を初期化"""
+        self.result = InspectionResult()
+        self.result.details = {
+            "inspection_date": datetime.now().isoformat(),
+            "total_deals": 0,
+            "fiscal_year_start": fiscal_year_start,
         }
 
-        if wage_like:
-            self.result.errors += 1
-            self.result.issues.append(Issue(
-                category="05.外注費→給与",
-                title="外注費の給与認定リスク",
-                description=f"{len(wage_like)}件の毎月定額外注（{wage_like[0]['desc']}等）",
-                risk_level=RiskLevel.HIGH,
-                suggestion="給与認定→源泉税+不納付加算税10%+社保遡及のリスク"
-            ))
-
-    def _check_06_withholding_omission(self, deals: List[Dict]):
-        """6. 源泉徴収漏れ: 報酬・料金で源泉税の計上なし"""
-        withholding_keywords = ['報酬', '顧問料', '講師', 'コンサル', '原稿', 'デザイン']
-        potentially_missing = []
-
-        for deal in deals:
-            for detail in deal.get('details', []):
-                ac_name = str(self._get_account_name(detail.get('account_item_id')))
-                if any(kw in ac_name for kw in withholding_keywords):
-                    if detail.get('amount', 0) >= 50000:
-                        potentially_missing.append({
-                            'date': deal['issue_date'],
-                            'amount': detail.get('amount', 0),
-                            'account': ac_name,
-                        })
-
-        self.result.details['06_withholding'] = potentially_missing
-        if potentially_missing:
-            self.result.warnings += 1
-            self.result.issues.append(Issue(
-                category="06.源泉漏れ",
-                title="源泉徴収対象の可能性",
-                description=f"{len(potentially_missing)}件の報酬・料金（個人への支払は源泉必要）",
-                risk_level=RiskLevel.MEDIUM,
-                suggestion="法人への支払なら不要。個人なら10.21%源泉"
-            ))
-
-    # ========================================
-    # 【役員関連】7-10: 損金不算入の宝庫
-    # ========================================
-
-    def _check_07_officer_compensation_change(self, deals: List[Dict], period_boundary: str = None):
-        """7. 役員報酬の期中変更: 定期同額違反"""
-        officer_payments = []
-
-        for deal in deals:
-            for detail in deal.get('details', []):
-                ac_name = str(self._get_account_name(detail.get('account_item_id')))
-                if '役員報酬' in ac_name:
-                    officer_payments.append({
-                        'date': deal['issue_date'],
-                        'amount': detail.get('amount', 0),
-                    })
-
-        # 月別集計
-        monthly = defaultdict(int)
-        for p in officer_payments:
-            month = p['date'][:7]
-            monthly[month] += p['amount']
-
-        self.result.details['07_officer_compensation'] = dict(monthly)
-
-        # 期首3ヶ月以降で変動があるか
-        sorted_months = sorted(monthly.items())
-        if len(sorted_months) > 3:
-            main_amounts = [amt for _, amt in sorted_months[3:]]
-            if len(set(main_amounts)) > 1:
-                self.result.errors += 1
-                self.result.issues.append(Issue(
-                    category="07.役員報酬",
-                    title="役員報酬の期中変更",
-                    description=f"期首3ヶ月以降で変動: {sorted(set(main_amounts))}",
-                    risk_level=RiskLevel.HIGH,
-                    suggestion="臨時改定事由の議事録がなければ損金不算入"
-                ))
-
-    def _check_08_officer_bonus(self, deals: List[Dict]):
-        """8. 役員賞与（届出なし）: 全額損金不算入"""
-        officer_bonus = []
-
-        for deal in deals:
-            for detail in deal.get('details', []):
-                ac_name = str(self._get_account_name(detail.get('account_item_id')))
-                if '役員賞与' in ac_name:
-                    officer_bonus.append({
-                        'date': deal['issue_date'],
-                        'amount': detail.get('amount', 0),
-                    })
-
-        self.result.details['08_officer_bonus'] = officer_bonus
-        if officer_bonus:
-            total = sum(b['amount'] for b in officer_bonus)
-            self.result.errors += 1
-            self.result.issues.append(Issue(
-                category="08.役員賞与",
-                title="役員賞与あり（届出確認）",
-                description=f"{len(officer_bonus)}件 / 合計: {total:,}円",
-                risk_level=RiskLevel.HIGH,
-                suggestion="事前確定届出給与の届出書がなければ全額損金不算入"
-            ))
-
-    def _check_09_officer_loans(self, deals: List[Dict]):
-        """9. 役員貸付金: 認定利息・給与認定"""
-        loans = []
-        for deal in deals:
-            for detail in deal.get('details', []):
-                ac_name = str(self._get_account_name(detail.get('account_item_id')))
-                if '役員貸付' in ac_name or '短期貸付' in ac_name:
-                    loans.append({
-                        'date': deal['issue_date'],
-                        'amount': detail.get('amount', 0),
-                        'desc': detail.get('description') or '',
-                        'type': deal.get('type'),
-                    })
-
-        # 残高計算
-        balance = sum(l['amount'] for l in loans if l['type'] == 'expense') - \
-                  sum(l['amount'] for l in loans if l['type'] == 'income')
-
-        self.result.details['09_officer_loans'] = {'balance': balance, 'count': len(loans)}
-
-        if balance > 0:
-            self.result.errors += 1
-            self.result.issues.append(Issue(
-                category="09.役員貸付",
-                title="役員貸付金残高あり",
-                description=f"残高: {balance:,}円 | 認定利息(年1%程度)の計上が必要",
-                risk_level=RiskLevel.HIGH,
-                suggestion="長期滞留・使途不明は役員賞与認定リスク"
-            ))
-
-    def _check_10_officer_benefit(self, deals: List[Dict]):
-        """10. 役員への経済的利益: 社宅・保険の過大負担"""
-        benefit_keywords = ['社宅', '保険', '車両', '福利厚生']
-        benefits = []
-
-        for deal in deals:
-            for detail in deal.get('details', []):
-                ac_name = str(self._get_account_name(detail.get('account_item_id')))
-                desc = (detail.get('description') or '').lower()
-
-                for kw in benefit_keywords:
-                    if kw in ac_name or kw in desc:
-                        if detail.get('amount', 0) >= 50000:
-                            benefits.append({
-                                'date': deal['issue_date'],
-                                'amount': detail.get('amount', 0),
-                                'account': ac_name,
-                            })
-                        break
-
-        self.result.details['10_officer_benefit'] = benefits
-        if benefits:
-            self.result.warnings += 1
-            self.result.issues.append(Issue(
-                category="10.経済的利益",
-                title="役員への経済的利益の可能性",
-                description=f"{len(benefits)}件の社宅・保険等の支出",
-                risk_level=RiskLevel.MEDIUM,
-                suggestion="社宅は賃貸料相当額、保険は受取人要確認"
-            ))
-
-    # ========================================
-    # 【経費】11-14: 否認されやすい項目
-    # ========================================
-
-    def _check_11_entertainment(self, deals: List[Dict]):
-        """11. 交際費の損金不算入: 800万円超・5万円超"""
-        entertainment = []
-
-        for deal in deals:
-            for detail in deal.get('details', []):
-                ac_name = str(self._get_account_name(detail.get('account_item_id')))
-                if '交際費' in ac_name or '接待' in ac_name:
-                    entertainment.append({
-                        'date': deal['issue_date'],
-                        'amount': detail.get('amount', 0),
-                        'desc': detail.get('description') or '',
-                    })
-
-        total = sum(e['amount'] for e in entertainment)
-        large = [e for e in entertainment if e['amount'] >= 50000]
-
-        self.result.details['11_entertainment'] = {'total': total, 'count': len(entertainment)}
-
-        if total > 8000000:
-            self.result.errors += 1
-            self.result.issues.append(Issue(
-                category="11.交際費",
-                title="交際費が年800万円超",
-                description=f"合計: {total:,}円（超過分は損金不算入）",
-                risk_level=RiskLevel.HIGH,
-                suggestion="飲食費50%特例の適用検討"
-            ))
-        if large:
-            self.result.warnings += 1
-            self.result.issues.append(Issue(
-                category="11.交際費",
-                title="5万円超の交際費",
-                description=f"{len(large)}件（参加者・目的の記録必要）",
-                risk_level=RiskLevel.MEDIUM,
-                suggestion="議事録・参加者リストを保管"
-            ))
-
-    def _check_12_private_expense(self, deals: List[Dict]):
-        """12. 私的経費の混入: 休日・家族名"""
-        private_keywords = ['家族', '私用', '個人', '自宅']
-        weekend_expenses = []
-        private_expenses = []
+    def _create_checks(self, fiscal_year_start: str = None, period_boundary: str = None,
+                       bank_data: Dict = None, codes: Union[str, Sequence[str], None] = None) -> list:
+        """
+        実行するチェック（applies() が False のものは除く）
 
-        for deal in deals:
-            for detail in deal.get('details', []):
-                desc = (detail.get('description') or '').lower()
-                # 休日（土日）の支出
-                # キーワードマッチ
-                for kw in private_keywords:
-                    if kw in desc:
-                        private_expenses.append({
-                            'date': deal['issue_date'],
-                            'amount': detail.get('amount', 0),
-                            'desc': desc,
-                        })
-                        break
-
-        self.result.details['12_private'] = private_expenses
-        if private_expenses:
-            self.result.errors += 1
-            self.result.issues.append(Issue(
-                category="12.私的経費",
-                title="私的経費の混入疑い",
-                description=f"{len(private_expenses)}件に「家族」「私用」等のキーワード",
-                risk_level=RiskLevel.HIGH,
-                suggestion="私的経費は全額損金不算入＋給与課税"
-            ))
-
-    def _check_13_fake_expense(self, deals: List[Dict]):
-        """13. 架空経費: 摘要なし・同一取引先への集中"""
-        expenses_no_desc = []
+        Args:
+            codes: チェック番号（None ならレジストリで有効なもの全て）
 
-        for deal in deals:
-            if deal.get('type') != 'expense':
-                continue
-            for detail in deal.get('details', []):
-                if not detail.get('description') and detail.get('amount', 0) >= 100000:
-                    expenses_no_desc.append({
-                        'date': deal['issue_date'],
-                        'amount': detail.get('amount', 0),
-                        'account': self._get_account_name(detail.get('account_item_id')),
-                    })
-
-        self.result.details['13_fake_expense'] = expenses_no_desc
-        if expenses_no_desc:
-            total = sum(e['amount'] for e in expenses_no_desc)
-            self.result.errors += 1
-            self.result.issues.append(Issue(
-                category="13.架空経費",
-                title="摘要なし高額経費",
-                description=f"{len(expenses_no_desc)}件 / 合計: {total:,}円",
-                risk_level=RiskLevel.HIGH,
-                suggestion="架空経費と認定されると重加算税35%"
-            ))
-
-    def _check_14_inventory_omission(self, deals: List[Dict]):
-        """14. 在庫計上漏れ: 期末に仕入があるのに在庫ゼロ"""
-        purchases = []
-        inventory = []
+        Raises:
+            ValueError: 登録されていないチェック番号
+        """
+        from .checks.registry import get_rules
 
-        for deal in deals:
-            for detail in deal.get('details', []):
-                ac_name = str(self._get_account_name(detail.get('account_item_id')))
-                if '仕入' in ac_name:
-                    purchases.append({
-                        'date': deal['issue_date'],
-                        'amount': detail.get('amount', 0),
-                    })
-                if '棚卸' in ac_name or '在庫' in ac_name:
-                    inventory.append({
-                        'date': deal['issue_date'],
-                        'amount': detail.get('amount', 0),
-                    })
-
-        total_purchase = sum(p['amount'] for p in purchases)
-        self.result.details['14_inventory'] = {
-            'total_purchase': total_purchase,
-            'has_inventory': len(inventory) > 0
+        params = {
+            "fiscal_year_start": fiscal_year_start,
+            "period_boundary": period_boundary,
+            "bank_data": bank_data,
         }
+        checks = []
+        for spec in get_rules(codes):
+            check = spec.load()(self, params)
+            if check.applies():
+                check.account_mask = spec.account_mask
+                checks.append(check)
+        return checks
+
+    @staticmethod
+    def _route(checks, deal_type, account_flags) -> List[int]:
+        """取引種別 deal_type・科目の分類 account_flags の明細を配信するチェックの位置"""
+        return [
+            i for i, check in enumerate(checks)
+            if (check.deal_types is None or deal_type in check.deal_types)
+            and (not check.account_mask or account_flags & check.account_mask)
+        ]
 
-        if total_purchase > 1000000 and not inventory:
-            self.result.warnings += 1
-            self.result.issues.append(Issue(
-                category="14.在庫漏れ",
-                title="仕入があるのに在庫計上なし",
-                description=f"仕入合計: {total_purchase:,}円 | 棚卸資産の計上なし",
-                risk_level=RiskLevel.MEDIUM,
-                suggestion="飲食・小売は期末在庫の計上必須"
-            ))
+    def _scan(self, deals, checks, stats=None) -> tuple:
+        """
+        取引を1回だけ走査し、各明細を全チェックへ配信
 
-    # ========================================
-    # 【消費税】15-17: インボイス後の重点項目
-    # ========================================
+        配信先は取引種別（deal_types）と勘定科目の分類（account_mask）の組ごとに1回だけ決め、
+        どのチェックも対象としない明細は DetailContext も作らずに読み飛ばす。
 
-    def _check_15_tax_code_error(self, deals: List[Dict]):
-        """15. 税区分エラー: 経費が課税売上で登録"""
-        errors = []
+        Args:
+            stats: 計測する場合の CheckStats（配信先ごとの明細数からチェックごとの走査件数を求め、
+                配信先ごとに VISIT_SAMPLE_EVERY 件に1件の明細で各チェックの visit() を計る）
 
-        for deal in deals:
-            if deal.get('type') != 'expense':
-                continue
-            for detail in deal.get('details', []):
-                if detail.get('tax_code') == 21:  # 課税売上10%
-                    errors.append({
-                        'date': deal['issue_date'],
-                        'amount': detail.get('amount', 0),
-                        'account': self._get_account_name(detail.get('account_item_id')),
-                    })
-
-        self.result.details['15_tax_code'] = len(errors)
-        if errors:
-            self.result.errors += 1
-            self.result.issues.append(Issue(
-                category="15.税区分",
-                title="経費が課税売上で登録",
-                description=f"{len(errors)}件 | 税区分:21→136に修正",
-                risk_level=RiskLevel.HIGH,
-                suggestion="消費税の計算が狂う。修正必須",
-                auto_fixable=True
-            ))
-
-    def _check_16_reduced_tax_error(self, deals: List[Dict]):
-        """16. 軽減税率の誤適用: 飲食料品以外に8%適用"""
-        reduced_rate = []
+        Returns:
+            (チェックごとのエントリリスト, 取引件数)
+        """
+        from .checks import DetailContext
+
+        match = self._description_matcher(checks)
+        entries = [[] for _ in checks]
+        routes = {}  # 取引種別 → {科目の分類: 配信先 [(visit, append), ...]}
+        account_index = self.account_index
+        total_deals = 0
+        routed = Counter() if stats else None  # (取引種別, 科目の分類) → 配信した明細数
+        route_codes = {}  # 計測する場合の (取引種別, 科目の分類) → 配信先のチェック番号
+        sample_every = stats.VISIT_SAMPLE_EVERY if stats else 0
+        scan_started = time.perf_counter()
 
         for deal in deals:
-            for detail in deal.get('details', []):
-                if detail.get('tax_code') in [23, 138]:  # 軽減税率8%
-                    ac_name = str(self._get_account_name(detail.get('account_item_id')))
-                    # 飲食料品以外で軽減税率
-                    if not any(kw in ac_name for kw in ['仕入', '食', '飲料']):
-                        reduced_rate.append({
-                            'date': deal['issue_date'],
-                            'amount': detail.get('amount', 0),
-                            'account': ac_name,
-                        })
-
-        self.result.details['16_reduced_tax'] = reduced_rate
-        if reduced_rate:
-            self.result.warnings += 1
-            self.result.issues.append(Issue(
-                category="16.軽減税率",
-                title="軽減税率の適用確認",
-                description=f"{len(reduced_rate)}件の8%適用（飲食料品以外？）",
-                risk_level=RiskLevel.MEDIUM,
-                suggestion="飲食料品以外は10%。2%の差額追徴リスク"
-            ))
-
-    def _check_17_invoice_denial(self, deals: List[Dict]):
-        """17. 仕入税額控除の否認: 30万円超でインボイスなし"""
-        large_purchases = []
+            total_deals += 1
+            deal_type = deal.get('type')
+            by_flags = routes.get(deal_type)
+            if by_flags is None:
+                by_flags = routes[deal_type] = {}
 
-        for deal in deals:
-            if deal.get('type') != 'expense':
-                continue
             for detail in deal.get('details', []):
-                if detail.get('tax_code') in [136, 138] and detail.get('amount', 0) >= 300000:
-                    large_purchases.append({
-                        'date': deal['issue_date'],
-                        'amount': detail.get('amount', 0),
-                        'account': self._get_account_name(detail.get('account_item_id')),
-                    })
-
-        self.result.details['17_invoice'] = large_purchases
-        if large_purchases:
-            self.result.warnings += 1
-            self.result.issues.append(Issue(
-                category="17.インボイス",
-                title="高額課税仕入のインボイス確認",
-                description=f"{len(large_purchases)}件の30万円以上の課税仕入",
-                risk_level=RiskLevel.MEDIUM,
-                suggestion="インボイス(T+13桁)の保管確認。なければ仕入税額控除否認"
-            ))
-
-    # ========================================
-    # 【関係者取引】18-19: 同族会社の定番指摘
-    # ========================================
-
-    def _check_18_related_party_payment(self, deals: List[Dict]):
-        """18. 関係者への高額支払: 親族・関連会社への支出"""
-        related_keywords = ['父', '母', '親', '妻', '夫', '子', '兄', '弟', '姉', '妹',
-                          '親族', '家族', '同族', '関連']
-        related = []
+                account_id = detail.get('account_item_id')
+                account = account_index.get(account_id) or self._account_info(account_id)
+                visitors = by_flags.get(account[1])
+                if visitors is None:
+                    route = self._route(checks, deal_type, account[1])
+                    visitors = by_flags[account[1]] = [(checks[i].visit, entries[i].append) for i in route]
+                    if stats:
+                        route_codes[deal_type, account[1]] = [checks[i].code for i in route]
+                if not visitors:
+                    continue
+                sampled = False
+                if routed is not None:
+                    key = (deal_type, account[1])
+                    routed[key] += 1
+                    sampled = (routed[key] - 1) % sample_every == 0
+
+                ctx = DetailContext(deal, detail, account)
+                if match is not None and ctx.description:
+                    ctx.keyword_hits = match(ctx.description)
+                if sampled:
+                    for code, (visit, append) in zip(route_codes[key], visitors):
+                        entry = stats.sample_visit(code, visit, ctx)
+                        if entry is not None:
+                            append(entry)
+                    continue
+                for visit, append in visitors:
+                    entry = visit(ctx)
+                    if entry is not None:
+                        append(entry)
+
+        if stats:
+            stats.scan_seconds = time.perf_counter() - scan_started
+            for (deal_type, account_flags), count in routed.items():
+                for i in self._route(checks, deal_type, account_flags):
+                    stats.add_items(checks[i].code, count)
+            for check, check_entries in zip(checks, entries):
+                stats.add_items(check.code, 0, len(check_entries))
+        return entries, total_deals
+
+    def _evaluate(self, checks, evaluators, on_check=None, stats=None, workers: int = 0, outs=None) -> None:
+        """
+        チェックごとの集計 evaluators[i](out) を実行して self.result に書き込む
 
-        for deal in deals:
-            if deal.get('type') != 'expense':
-                continue
-            for detail in deal.get('details', []):
-                desc = (detail.get('description') or '').lower()
-                for kw in related_keywords:
-                    if kw in desc:
-                        related.append({
-                            'date': deal['issue_date'],
-                            'amount': detail.get('amount', 0),
-                            'keyword': kw,
-                        })
-                        break
-
-        self.result.details['18_related_payment'] = related
-        if related:
-            total = sum(r['amount'] for r in related)
-            self.result.errors += 1
-            self.result.issues.append(Issue(
-                category="18.関係者支払",
-                title="関係者への支払検出",
-                description=f"{len(related)}件 / 合計: {total:,}円",
-                risk_level=RiskLevel.HIGH,
-                suggestion="時価との比較・契約書で適正取引を証明"
-            ))
-
-    def _check_19_related_party_purchase(self, deals: List[Dict]):
-        """19. 関係者からの低額仕入: 時価との乖離"""
-        # 売上で関係者キーワードを検出
-        related_keywords = ['父', '母', '親', '妻', '夫', '同族', '関連']
-        related = []
+        workers が2以上ならスレッドプールで並列に実行する。各チェックは自分専用の
+        InspectionResult に書き込み、終わった後でチェック順に合成する（完了順には依存しない）。
+        outs（チェックごとの InspectionResult）を渡すと、各チェックは outs[i] に書き込み、
+        self.result には合成しない（差分再監査がチェックごとの集計結果を保持する）。
+        """
+        def run(check, evaluate, out):
+            with stats.evaluating(check.code, out) if stats else nullcontext():
+                evaluate(out)
+
+        if workers < 2 or len(checks) < 2:
+            targets = outs if outs is not None else repeat(self.result)
+            for done, (check, evaluate, out) in enumerate(zip(checks, evaluators, targets), start=1):
+                run(check, evaluate, out)
+                if on_check:
+                    on_check(check.code, done, len(checks))
+            return
 
-        for deal in deals:
-            if deal.get('type') != 'income':
-                continue
-            for detail in deal.get('details', []):
-                desc = (detail.get('description') or '').lower()
-                for kw in related_keywords:
-                    if kw in desc:
-                        related.append({
-                            'date': deal['issue_date'],
-                            'amount': detail.get('amount', 0),
-                        })
-                        break
-
-        self.result.details['19_related_income'] = related
-        if related:
-            self.result.warnings += 1
-            self.result.issues.append(Issue(
-                category="19.関係者仕入",
-                title="関係者からの収入・仕入",
-                description=f"{len(related)}件（時価との乖離確認）",
-                risk_level=RiskLevel.MEDIUM,
-                suggestion="低額譲渡は寄附金認定リスク"
-            ))
-
-    # ========================================
-    # 【帳簿】20: 基本だが重要
-    # ========================================
-
-    def _check_20_poor_records(self, deals: List[Dict]):
-        """20. 帳簿不備・説明不能: 高額取引で摘要なし"""
-        poor = []
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        partials = outs if outs is not None else [InspectionResult() for _ in checks]
+        with ThreadPoolExecutor(max_workers=min(workers, len(checks))) as pool:
+            futures = {pool.submit(run, check, evaluate, out): check
+                       for check, evaluate, out in zip(checks, evaluators, partials)}
+            for done, future in enumerate(as_completed(futures), start=1):
+                future.result()
+                if on_check:
+                    on_check(futures[future].code, done, len(checks))
+        if outs is None:
+            for out in partials:
+                self.result.merge(out)
+
+    def _run_columnar(self, deals, checks, stats=None) -> list:
+        """
+        列指向台帳を構築（または再利用）
 
-        for deal in deals:
-            for detail in deal.get('details', []):
-                if not detail.get('description') and detail.get('amount', 0) >= 50000:
-                    poor.append({
-                        'date': deal['issue_date'],
-                        'amount': detail.get('amount', 0),
-                        'account': self._get_account_name(detail.get('account_item_id')),
-                    })
-
-        poor.sort(key=lambda x: -x['amount'])
-        self.result.details['20_poor_records'] = poor[:30]
-
-        if len(poor) > 20:
-            self.result.warnings += 1
-            self.result.issues.append(Issue(
-                category="20.帳簿不備",
-                title="摘要なし高額取引が多数",
-                description=f"{len(poor)}件の5万円以上の取引に摘要なし",
-                risk_level=RiskLevel.MEDIUM,
-                suggestion="税務調査では「何のための支出か」が必ず問われる"
-            ))
-
-    # ========================================
-    # 参考情報
-    # ========================================
-
-    def _account_summary(self, deals: List[Dict]):
-        """勘定科目別集計（参考情報）"""
-        account_totals = defaultdict(lambda: {'amount': 0, 'count': 0})
+        Returns:
+            チェックごとの集計関数 evaluate(out)（台帳上の group-by で集計する）
+        """
+        from .ledger import ColumnarLedger
+
+        started = time.perf_counter()
+        ledger = deals if self._is_ledger(deals) else ColumnarLedger.from_deals(deals, self)
+        ledger.set_matcher(self._description_matcher(checks))
+        self.result.details["total_deals"] = ledger.total_deals
+        if stats:
+            # 列指向では台帳の構築が全チェック共通の走査にあたる
+            stats.scan_seconds = time.perf_counter() - started
+
+        if stats:
+            for check in checks:
+                stats.add_items(check.code, len(ledger.select(check.deal_types)))
+        return [partial(check.evaluate_columnar, ledger) for check in checks]
+
+    @staticmethod
+    def _is_ledger(deals) -> bool:
+        """構築済みの ColumnarLedger か（pandas を読み込まずに判定）"""
+        return type(deals).__name__ == "ColumnarLedger"
+
+    @staticmethod
+    def _description_matcher(checks):
+        """摘要キーワードは全チェック分を1回の照合で判定（摘要ごとにキャッシュ）"""
+        from .checks.matcher import get_matcher
+
+        families = [(check.code, check.DESCRIPTION_KEYWORDS)
+                    for check in checks if check.DESCRIPTION_KEYWORDS]
+        return get_matcher(families).match if families else None
 
-        for deal in deals:
-            if deal.get('type') == 'expense':
-                for detail in deal.get('details', []):
-                    ac_name = self._get_account_name(detail.get('account_item_id'))
-                    account_totals[ac_name]['amount'] += detail.get('amount', 0)
-                    account_totals[ac_name]['count'] += 1
-
-        sorted_accounts = sorted(account_totals.items(), key=lambda x: -x[1]['amount'])[:15]
-        self.result.details['account_summary'] = {
-            name: data for name, data in sorted_accounts
-        }
+    def _get_account_name(self, account_id: int) -> str:
+        """勘定科目IDから名称を取得"""
+        return self.account_map.get(account_id, str(account_id))
 
     def _generate_report(self):
         """レポート生成（厳選20項目対応）"""
@@ -947,6 +597,12 @@ class TaxInspector:
 
 # 使用例
 if __name__ == "__main__":
+    # チェック群（core.checks）を読み込めるようパッケージ経由で実行
+    import os
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from core.tax_inspector import TaxInspector
+
     # サンプルデータでテスト
     sample_deals = [
         {
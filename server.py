@@ -16,18 +16,32 @@ import sys
 import json
 import zipfile
 import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 
 # コアモジュールをインポートするためにパスを追加
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from core.freee_client import FreeeClient
+from core.freee_client import FreeeClient, RateLimiter
 from core.tax_inspector import TaxInspector
-from core.bank_parser import BankCSVParser
+from core.bank_parser import BankCSVParser, summarize_csv_file
+from core.deal_store import DealStore
+from core.master_cache import MasterDataCache
+from core.tax_fixer import TaxCodeFixer
+from core.jobs import JobManager
+from core.metrics import AuditMetrics
+from core.export import audit_result_to_csv, audit_result_to_json, issue_to_dict
+from core.incremental import IncrementalAudit
+from core.result_cache import ResultCache, rules_version
+from core.batch import BatchAuditRunner, BatchTarget
+from core.checks.registry import RULES, get_rules
 
 app = Flask(__name__, static_folder='static')
 
@@ -43,10 +57,73 @@ CORS(app, origins=[
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
 MAX_FILES_PER_REQUEST = 100  # 1リクエストあたりの最大ファイル数
 ALLOWED_CSV_EXTENSIONS = {'.csv'}
+MAX_REPORTED_PARSE_ERRORS = 20  # CSV解析結果に含める読み飛ばし行の上限
 ALLOWED_DOC_EXTENSIONS = {'.pdf', '.txt', '.md', '.json', '.zip'}
 
 app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE * MAX_FILES_PER_REQUEST
 
+# ========================================
+# freee連携設定
+# ========================================
+FREEE_FETCH_CONCURRENCY = 4  # 取引一覧の並列取得数（レート制限はクライアント側で共有）
+FREEE_FIX_WORKERS = 4  # 税区分一括修正で同時に処理する取引数
+FREEE_CLIENT_CACHE_SIZE = 32  # 使い回すクライアント（接続プール）の上限
+AUDIT_JOB_WORKERS = 2  # 同時に実行する監査ジョブ数
+AUDIT_COLLECT_METRICS = True  # チェックごとの処理時間・件数を計測する（/api/metrics に集計。visit() は抜き取りで計る）
+AUDIT_CHECK_WORKERS = 0  # 2以上ならチェックの集計をスレッドで並列に実行（free-threaded ビルド向け）
+AUDIT_STATE_CACHE_SIZE = 8  # 差分再監査のために保持する監査状態（事業所・期間ごと）の上限
+RESULT_CACHE_MAX_ENTRIES = 200  # 保存する監査結果の最大件数
+RESULT_CACHE_MAX_BYTES = 256 * 1024 * 1024  # 保存する監査結果の合計サイズ上限（256MB）
+BATCH_AUDIT_WORKERS = os.cpu_count() or 1  # 一括監査で検査に使うプロセス数
+BATCH_FETCH_WORKERS = 4  # 一括監査で同時に取得する事業所数（レート制限は全事業所で共有）
+MAX_BATCH_TARGETS = 200  # 1回の一括監査の最大事業所数
+BATCH_JOB_WORKERS = 1  # 同時に実行する一括監査ジョブ数（監査ジョブとは別のワーカーで実行）
+
+# (token, company_id) → FreeeClient（接続プールとレート制限をリクエスト間で共有）
+_freee_clients = OrderedDict()
+_freee_clients_lock = threading.Lock()
+# token → RateLimiter（freee API の上限はトークン単位のため、同じトークンの全事業所で共有。
+# どのクライアントからも参照されなくなれば破棄される）
+_freee_rate_limiters = weakref.WeakValueDictionary()
+
+
+def get_freee_client(token, company_id):
+    """トークン・事業所ごとの FreeeClient を取得（なければ作成、古いものから解放）"""
+    key = (token, int(company_id))
+    with _freee_clients_lock:
+        client = _freee_clients.get(key)
+        if client is not None:
+            _freee_clients.move_to_end(key)
+            return client
+        rate_limiter = _freee_rate_limiters.get(token)
+        if rate_limiter is None:
+            rate_limiter = _freee_rate_limiters[token] = RateLimiter(FreeeClient.DEFAULT_RATE_LIMIT)
+        client = FreeeClient(access_token=token, company_id=key[1], master_cache=master_cache,
+                             rate_limiter=rate_limiter)
+        _freee_clients[key] = client
+        if len(_freee_clients) > FREEE_CLIENT_CACHE_SIZE:
+            # 追い出したクライアントは他のリクエスト・ジョブが使用中かもしれないため close() しない
+            # （参照がなくなればセッションごと破棄され、接続も閉じられる）
+            _freee_clients.popitem(last=False)
+        return client
+
+# ========================================
+# CSV解析設定
+# ========================================
+CSV_PARSE_WORKERS = min(4, os.cpu_count() or 1)  # 複数ファイルを並列に解析するプロセス数
+
+_csv_pool = None
+_csv_pool_lock = threading.Lock()
+
+
+def get_csv_pool():
+    """CSV解析用のプロセスプール（初回に作成し、以降は使い回す）"""
+    global _csv_pool
+    with _csv_pool_lock:
+        if _csv_pool is None:
+            _csv_pool = ProcessPoolExecutor(max_workers=CSV_PARSE_WORKERS)
+        return _csv_pool
+
 # ========================================
 # ファイル保存設定（MCP連携用）
 # ========================================
@@ -54,11 +131,32 @@ DATA_DIR = Path(__file__).parent / "data"
 UPLOAD_CSV_DIR = DATA_DIR / "uploads" / "csv"
 UPLOAD_DOCS_DIR = DATA_DIR / "uploads" / "docs"
 CONFIG_FILE = DATA_DIR / "mcp_config.json"
+DEAL_STORE_FILE = DATA_DIR / "deals.sqlite3"
+PROFILE_DIR = DATA_DIR / "profiles"
+MASTER_CACHE_DIR = DATA_DIR / "cache"
+RESULT_CACHE_DIR = DATA_DIR / "results"
+BATCH_OUTPUT_DIR = DATA_DIR / "batch"
 
 # ディレクトリ作成
 UPLOAD_CSV_DIR.mkdir(parents=True, exist_ok=True)
 UPLOAD_DOCS_DIR.mkdir(parents=True, exist_ok=True)
 
+# 取引のローカルキャッシュ（差分同期）
+deal_store = DealStore(DEAL_STORE_FILE)
+# 勘定科目・税区分マスタのキャッシュ（全クライアントで共有）
+master_cache = MasterDataCache(MASTER_CACHE_DIR)
+# 監査結果のキャッシュ（同じ取引・マスタ・チェックの版なら検査しない）
+result_cache = ResultCache(RESULT_CACHE_DIR, max_entries=RESULT_CACHE_MAX_ENTRIES,
+                           max_bytes=RESULT_CACHE_MAX_BYTES)
+# 監査ジョブ（取得 → 検査 → レポートをバックグラウンドで実行）
+jobs = JobManager(max_workers=AUDIT_JOB_WORKERS, kind_workers={'batch': BATCH_JOB_WORKERS})
+# 監査の計測値の累積（/api/metrics）
+audit_metrics = AuditMetrics()
+_profile_lock = threading.Lock()
+# 監査条件 → 差分再監査の状態 {'audit', 'revision', 'lock'}（古いものから解放）
+_audit_states = OrderedDict()
+_audit_states_lock = threading.Lock()
+
 def safe_filename(filename):
     """日本語対応の安全なファイル名変換（パストラバーサル対策強化）"""
     import re
@@ -143,7 +241,7 @@ def test_connection():
         if not token or not company_id:
             return jsonify({'success': False, 'error': 'トークンと事業所IDが必要です'})
 
-        client = FreeeClient(access_token=token, company_id=int(company_id))
+        client = get_freee_client(token, company_id)
         company = client.get_company()
 
         return jsonify({
@@ -155,74 +253,275 @@ def test_connection():
         return jsonify({'success': False, 'error': str(e)})
 
 
-@app.route('/api/analyze', methods=['POST'])
-def analyze():
-    """freeeデータを取得して分析"""
-    try:
-        data = request.json
-        token = data.get('token')
-        company_id = data.get('company_id')
-        start_date = data.get('start_date')
-        end_date = data.get('end_date')
-        fiscal_month = data.get('fiscal_month', 5)
+def run_analysis(job, data):
+    """
+    監査ジョブ本体: freeeデータ取得 → 検査 → 結果整形
+
+    進捗は job に記録する（stage: masters / fetch / bank / inspect / report）。
+    bank_files（保存済みの銀行CSV名）を指定すると、入金と売上取引を突合する。
+    profile: true なら検査を cProfile で計測し、data/profiles/<ジョブID>.prof に保存する。
+    取引・マスタ・銀行CSV・チェックの版が前回の監査と同じなら、保存した結果をそのまま返す
+    （cache: false で使わない）。同じ条件で監査済みなら、前回以降にストアへ書き込まれた取引
+    （税区分の修正など）だけを再検査する（incremental: false で毎回全件を検査）。
+    checks（チェック番号のリスト。例: ["15", "16", "17"]）を指定すると、そのチェックだけを実行する。
+    """
+    start_date = data.get('start_date')
+    end_date = data.get('end_date')
+    fiscal_month = data.get('fiscal_month', 5)
+    full_sync = bool(data.get('full_sync', False))
+    bank_files = data.get('bank_files') or []
+
+    # freeeクライアント初期化
+    client = get_freee_client(data.get('token'), data.get('company_id'))
+
+    # マスタデータ取得（全件同期時はマスタのキャッシュも取り直す）
+    job.update(stage='masters')
+    if full_sync:
+        master_cache.invalidate(client.company_id)
+    account_map = client.get_account_items()
+    tax_map = client.get_tax_codes()
+
+    # 取引データ取得（前回以降の差分だけfreeeから取得し、ローカルキャッシュから読む）
+    job.update(stage='fetch', pages_fetched=0, total_pages=None)
+    sync = deal_store.sync(
+        client, full=full_sync, concurrency=FREEE_FETCH_CONCURRENCY,
+        on_page=lambda done, total: job.update(pages_fetched=done, total_pages=total),
+        start_date=start_date, end_date=end_date
+    )
+
+    current_year = datetime.now().year
+    period_boundary = f"{current_year}-{fiscal_month:02d}-01"
+
+    # 同じ取引・マスタ・チェックの版で監査済みなら保存した結果を返す（profile 時は計測のため使わない）
+    cache_key = None
+    if data.get('cache', True) and not data.get('profile'):
+        cache_key = audit_cache_key(client.company_id, start_date, end_date, period_boundary,
+                                    account_map, tax_map, bank_files, requested_checks(data))
+    result = result_cache.get(cache_key) if cache_key else None
+    cached = result is not None
+    incremental = profile_file = None
+    if result is None:
+        result, incremental, profile_file = run_inspection(
+            job, data, client, account_map, tax_map, start_date, end_date, period_boundary
+        )
+        if cache_key:
+            result_cache.put(cache_key, result)
 
-        if not token or not company_id:
-            return jsonify({'success': False, 'error': 'トークンと事業所IDが必要です'})
+    # 結果を整形
+    deal_count = result.details['total_deals']
+    job.update(stage='report', deal_count=deal_count)
+    issues = [issue_to_dict(issue) for issue in result.issues]
 
-        # freeeクライアント初期化
-        client = FreeeClient(access_token=token, company_id=int(company_id))
+    return {
+        'success': True,
+        'deal_count': deal_count,
+        'sync': sync,
+        'cached': cached,
+        'incremental': incremental,
+        'profile': profile_file.name if profile_file else None,
+        'errors': result.errors,
+        'warnings': result.warnings,
+        'issues': issues,
+        'report': result.report,
+        'details': result.details
+    }
 
-        # マスタデータ取得
-        account_map = client.get_account_items()
-        tax_map = client.get_tax_codes()
 
-        # 取引データ取得
-        deals = client.get_deals(start_date=start_date, end_date=end_date)
+def run_inspection(job, data, client, account_map, tax_map, start_date, end_date, period_boundary):
+    """
+    run_analysis の検査部分: 銀行明細の読み込み → 検査（差分再監査 / 全件）
 
-        # Deal オブジェクトを辞書に変換
-        deals_dict = [
-            {
-                "id": d.id,
-                "issue_date": d.issue_date,
-                "type": d.type,
-                "amount": d.amount,
-                "details": d.details,
-                "payments": d.payments
-            }
-            for d in deals
-        ]
+    Returns:
+        (InspectionResult, 差分再監査の概要 or None, プロファイルのファイル or None)
+    """
+    bank_files = data.get('bank_files') or []
+    checks = requested_checks(data)
+
+    # 銀行明細（指定時のみ。売上計上漏れチェックで入金と突合する）
+    bank_data = None
+    if bank_files:
+        job.update(stage='bank')
+        bank_data = {'transactions': load_bank_deposits(bank_files, start_date, end_date)}
+
+    # 厳格10項目チェック実行（勘定科目の分類はマスタ更新まで使い回す）
+    job.update(stage='inspect', checks_done=0, total_checks=None)
+    account_index = master_cache.derived(
+        client.company_id, 'account_index',
+        lambda: TaxInspector.build_account_index(account_map)
+    )
+    inspector = TaxInspector(account_map=account_map, tax_map=tax_map, account_index=account_index)
+
+    # プロファイラはプロセスで同時に1つしか有効にできないため、他のジョブが使用中なら計測しない
+    profiler = None
+    if data.get('profile') and _profile_lock.acquire(blocking=False):
+        import cProfile
+        profiler = cProfile.Profile()
+
+    # 差分再監査（プロファイル時は全件を計測するため使わない）
+    state = None
+    if data.get('incremental', True) and profiler is None:
+        state = get_audit_state((client.company_id, start_date, end_date, period_boundary,
+                                 bank_file_versions(bank_files), checks))
+
+    def on_check(code, done, total):
+        job.update(checks_done=done, total_checks=total)
+
+    incremental = None
+    try:
+        if state is not None:
+            result, incremental = run_incremental_audit(
+                state, client.company_id, inspector, start_date, end_date,
+                period_boundary=period_boundary, bank_data=bank_data, checks=checks, on_check=on_check
+            )
+        else:
+            # ストアから1件ずつ読み、辞書に変換しながら検査へ流す（取引全件をメモリに持たない）
+            deals = (d.to_dict() for d in deal_store.iter_deals(client.company_id, start_date, end_date))
+            result = inspector.inspect_all(
+                deals, period_boundary=period_boundary, bank_data=bank_data, on_check=on_check,
+                metrics=AUDIT_COLLECT_METRICS, profiler=profiler, parallel=AUDIT_CHECK_WORKERS,
+                checks=checks
+            )
+    finally:
+        if profiler is not None:
+            _profile_lock.release()
+
+    if 'metrics' in result.details:
+        audit_metrics.observe(result.details['metrics'])
+    profile_file = None
+    if profiler is not None:
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        profile_file = PROFILE_DIR / f"{job.id}.prof"
+        profiler.dump_stats(str(profile_file))
+
+    return result, incremental, profile_file
+
+
+def audit_cache_key(company_id, start_date, end_date, period_boundary, account_map, tax_map, bank_files,
+                    checks=None):
+    """監査結果キャッシュの鍵（取引・マスタ・銀行CSV・実行するチェック・チェックの版のどれかが変われば変わる）"""
+    return result_cache.make_key(
+        company_id=company_id,
+        start_date=start_date,
+        end_date=end_date,
+        period_boundary=period_boundary,
+        deals=deal_store.checksum(company_id, start_date, end_date),
+        account_map=account_map,
+        tax_map=tax_map,
+        bank_files=bank_file_versions(bank_files),
+        checks=[spec.code for spec in get_rules(checks)],
+        rules=rules_version(),
+    )
+
+
+def get_audit_state(key):
+    """監査条件ごとの差分再監査の状態を取得（なければ作成、古いものから解放）"""
+    with _audit_states_lock:
+        state = _audit_states.get(key)
+        if state is not None:
+            _audit_states.move_to_end(key)
+            return state
+        state = _audit_states[key] = {'audit': None, 'revision': 0, 'lock': threading.Lock()}
+        if len(_audit_states) > AUDIT_STATE_CACHE_SIZE:
+            _audit_states.popitem(last=False)
+        return state
+
+
+def bank_file_versions(names):
+    """突合に使う銀行CSVの (ファイル名, 更新時刻)。差し替えられたら別の監査条件になる"""
+    versions = []
+    for name in names:
+        filepath = UPLOAD_CSV_DIR / safe_filename(name)
+        versions.append((filepath.name, filepath.stat().st_mtime_ns if filepath.is_file() else None))
+    return tuple(versions)
+
+
+def run_incremental_audit(state, company_id, inspector, start_date, end_date, period_boundary, bank_data,
+                          checks=None, on_check=None):
+    """
+    前回の監査以降にストアへ書き込まれた取引だけを再検査
+
+    初回・全件同期の後・勘定科目マスタの更新後は inspector で作り直して全件を検査する。
+    進捗（on_check）・計測（AUDIT_COLLECT_METRICS）・集計の並列数（AUDIT_CHECK_WORKERS）は
+    全件の検査（inspect_all）と同じ扱い。
+
+    Returns:
+        (InspectionResult, {'mode': 'full' | 'delta', 'scanned': 走査した取引数, 'deleted': 削除した取引数})
+    """
+    with state['lock']:
+        audit = state['audit']
+        changes = None
+        if (audit is not None and state['revision'] >= deal_store.get_reset_revision(company_id)
+                and audit.inspector.account_index is inspector.account_index):
+            # リビジョンと差分は同じ時点で読む（読んだ後の書き込みは次回の差分に入る）
+            revision, reset_revision, changes = deal_store.get_changes(company_id, state['revision'])
+            if state['revision'] < reset_revision:
+                changes = None  # 読む直前に全件同期された
+        if changes is None:
+            # 読み出し中に書き込まれた取引は次回の差分として再適用される（同じ内容の上書きで結果は変わらない）
+            revision = deal_store.get_revision(company_id)
+            audit = state['audit'] = IncrementalAudit(
+                inspector, period_boundary=period_boundary, bank_data=bank_data, checks=checks)
+            result = audit.build((d.to_dict() for d in deal_store.iter_deals(company_id, start_date, end_date)),
+                                 on_check=on_check, metrics=AUDIT_COLLECT_METRICS, parallel=AUDIT_CHECK_WORKERS)
+            summary = {'mode': 'full', 'scanned': audit.total_deals, 'deleted': 0}
+        else:
+            # 期間外へ移動した取引は削除として扱う
+            updated, deleted = [], []
+            for deal in changes:
+                if (not start_date or deal.issue_date >= start_date) and (not end_date or deal.issue_date <= end_date):
+                    updated.append(deal.to_dict())
+                else:
+                    deleted.append(deal.id)
+            result = audit.apply(updated=updated, deleted=deleted, on_check=on_check,
+                                 metrics=AUDIT_COLLECT_METRICS, parallel=AUDIT_CHECK_WORKERS)
+            summary = {'mode': 'delta', 'scanned': len(updated), 'deleted': len(deleted)}
+        state['revision'] = revision
+        return result, summary
+
+
+def requested_checks(data):
+    """実行するチェック番号（指定なしは None = 有効なもの全て）。実行順に並べて返す"""
+    checks = data.get('checks')
+    if checks is None:
+        return None
+    if not isinstance(checks, (str, list, tuple)):
+        raise ValueError('checks はチェック番号のリスト（またはカンマ区切りの文字列）で指定してください')
+    return tuple(spec.code for spec in get_rules(checks))
+
+
+def submit_analysis(data):
+    """監査ジョブを投入（パラメータ不足ならエラーdictを返す）"""
+    if not data.get('token') or not data.get('company_id'):
+        return None, {'success': False, 'error': 'トークンと事業所IDが必要です'}
+    try:
+        requested_checks(data)
+    except ValueError as e:
+        return None, {'success': False, 'error': str(e)}
+    return jobs.submit('analyze', run_analysis, data), None
 
-        # 厳格10項目チェック実行
-        inspector = TaxInspector(account_map=account_map, tax_map=tax_map)
 
-        current_year = datetime.now().year
-        period_boundary = f"{current_year}-{fiscal_month:02d}-01"
+def job_error_response(job):
+    """失敗・キャンセルしたジョブのエラーレスポンス"""
+    if job.status == 'cancelled':
+        return {'success': False, 'error': 'ジョブはキャンセルされました'}
+    # エラーログは内部のみ、クライアントには安全なメッセージ
+    import logging
+    logging.error(f"Analyze error: {job.error}")
+    return {'success': False, 'error': translate_error(job.error)}
 
-        result = inspector.inspect_all(deals_dict, period_boundary=period_boundary)
 
-        # 結果を整形
-        issues = [
-            {
-                'category': issue.category,
-                'title': issue.title,
-                'description': issue.description,
-                'risk_level': issue.risk_level.value,
-                'deal_id': issue.deal_id,
-                'amount': issue.amount,
-                'suggestion': issue.suggestion
-            }
-            for issue in result.issues
-        ]
+@app.route('/api/analyze', methods=['POST'])
+def analyze():
+    """freeeデータを取得して分析（監査ジョブを投入して完了まで待つ）"""
+    try:
+        job, error = submit_analysis(request.json)
+        if error:
+            return jsonify(error)
 
-        return jsonify({
-            'success': True,
-            'deal_count': len(deals),
-            'errors': result.errors,
-            'warnings': result.warnings,
-            'issues': issues,
-            'report': result.report,
-            'details': result.details
-        })
+        job.wait()
+        if job.status != 'succeeded':
+            return jsonify(job_error_response(job))
+        return jsonify(job.result)
 
     except Exception as e:
         # エラーログは内部のみ、クライアントには安全なメッセージ
@@ -231,14 +530,216 @@ def analyze():
         return jsonify({'success': False, 'error': translate_error(str(e))})
 
 
+@app.route('/api/checks', methods=['GET'])
+def list_checks():
+    """
+    実行できるチェックの一覧（番号・名称・対象の勘定科目の分類・参照する項目・処理コスト・既定で実行するか）
+
+    /api/analyze の checks に番号を指定すると、そのチェックだけを実行する。
+
+    使用例:
+        curl http://localhost:5000/api/checks
+        curl -X POST http://localhost:5000/api/analyze \
+            -H "Content-Type: application/json" \
+            -d '{"token": "...", "company_id": 123, "checks": ["15", "16", "17"]}'
+    """
+    return jsonify({'success': True, 'checks': [spec.to_dict() for spec in list(RULES)]})
+
+
+# ========================================
+# 監査ジョブ（非同期実行）
+# ========================================
+
+@app.route('/api/jobs/analyze', methods=['POST'])
+def submit_analyze_job():
+    """
+    監査ジョブを投入（/api/analyze と同じパラメータ）。すぐにジョブIDを返す
+
+    使用例:
+        curl -X POST http://localhost:5000/api/jobs/analyze \
+            -H "Content-Type: application/json" \
+            -d '{"token": "...", "company_id": 123}'
+        curl http://localhost:5000/api/jobs/<job_id>
+        curl http://localhost:5000/api/jobs/<job_id>/result
+    """
+    try:
+        job, error = submit_analysis(request.json)
+        if error:
+            return jsonify(error)
+        return jsonify({'success': True, **job.to_dict()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': translate_error(str(e))})
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """ジョブの状態・進捗（取得ページ数、完了チェック数など）"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'ジョブが見つかりません'})
+    return jsonify({'success': True, **job.to_dict()})
+
+
+@app.route('/api/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    """ジョブの結果（完了前は状態のみ返す）"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'ジョブが見つかりません'})
+    if not job.finished:
+        return jsonify({'success': False, 'error': 'ジョブは実行中です', **job.to_dict()})
+    if job.status != 'succeeded':
+        return jsonify(job_error_response(job))
+    return jsonify(job.result)
+
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """ジョブをキャンセル"""
+    if not jobs.cancel(job_id):
+        return jsonify({'success': False, 'error': 'キャンセルできるジョブが見つかりません'})
+    return jsonify({'success': True, 'job_id': job_id})
+
+
+# ========================================
+# 一括監査（複数事業所）
+# ========================================
+
+def run_batch(job, data, targets):
+    """一括監査ジョブ本体: 事業所ごとの結果は data/batch/<ジョブID>/ に書き出し、集計を返す"""
+    runner = BatchAuditRunner(
+        data['token'], deal_store, master_cache=master_cache,
+        workers=BATCH_AUDIT_WORKERS, fetch_workers=BATCH_FETCH_WORKERS,
+        full_sync=bool(data.get('full_sync', False)),
+        # 画面からの監査と同じクライアント（接続プール・トークン単位のレート制限）を使う
+        client_factory=lambda company_id: get_freee_client(data['token'], company_id)
+    )
+    job.update(stage='batch', companies_done=0, total_companies=len(targets))
+    summary = runner.run(
+        targets, output_dir=BATCH_OUTPUT_DIR / job.id,
+        on_progress=lambda done, total, row: job.update(companies_done=done, total_companies=total)
+    )
+    # 事業所ごとの結果本体はファイルで返す（/api/batch/<ジョブID>/<ファイル名>）
+    summary.pop('results')
+    for target, row in zip(targets, summary['companies']):
+        row['file'] = f"{target.label}.json" if row['status'] == 'succeeded' else None
+        if row['error']:
+            row['error'] = translate_error(row['error'])
+    return {'success': True, **summary}
+
+
+@app.route('/api/batch/analyze', methods=['POST'])
+def submit_batch_job():
+    """
+    複数事業所の一括監査ジョブを投入。すぐにジョブIDを返す
+
+    リクエストボディ:
+        {
+            "token": "...",
+            "targets": [
+                {"company_id": 123, "start_date": "2024-04-01", "end_date": "2025-03-31", "fiscal_month": 4},
+                ...
+            ],
+            "full_sync": false
+        }
+
+    取得は全事業所で freee のレート制限を共有し、検査はCPUコア数のプロセスで並列に行う。
+    進捗は /api/jobs/<job_id>（companies_done / total_companies）、集計は /api/jobs/<job_id>/result。
+    """
+    try:
+        data = request.json or {}
+        if not data.get('token'):
+            return jsonify({'success': False, 'error': 'トークンが必要です'})
+        raw_targets = data.get('targets') or []
+        if not raw_targets:
+            return jsonify({'success': False, 'error': '監査対象の事業所が指定されていません'})
+        if len(raw_targets) > MAX_BATCH_TARGETS:
+            return jsonify({'success': False, 'error': f'一度に監査できるのは{MAX_BATCH_TARGETS}件までです'})
+        try:
+            targets = [BatchTarget.from_dict(t) for t in raw_targets]
+        except (AttributeError, ValueError) as e:
+            return jsonify({'success': False, 'error': str(e)})
+
+        job = jobs.submit('batch', run_batch, data, targets)
+        return jsonify({'success': True, **job.to_dict()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': translate_error(str(e))})
+
+
+@app.route('/api/batch/<job_id>/<filename>', methods=['GET'])
+def get_batch_file(job_id, filename):
+    """一括監査の結果ファイル（事業所ごとのJSON、summary.json / summary.csv）"""
+    job = jobs.get(job_id)
+    if job is None or job.kind != 'batch':
+        return jsonify({'success': False, 'error': 'ジョブが見つかりません'}), 404
+    output_dir = BATCH_OUTPUT_DIR / job.id
+    filepath = output_dir / safe_filename(filename)
+    if not (filepath.is_file() and validate_file_path(filepath, output_dir)):
+        return jsonify({'success': False, 'error': 'ファイルが見つかりません'}), 404
+    return send_from_directory(output_dir, filepath.name, as_attachment=True)
+
+
+def summarize_csv_files(bank_type, sources):
+    """
+    複数のCSVを集計（2ファイル以上はプロセスプールで並列に解析）
+
+    ファイルごとに新しいパーサーで銀行を判別するため、前のファイルの判別結果は引き継がない。
+
+    Args:
+        bank_type: 銀行タイプ（"自動検出" ならファイルごとに判別）
+        sources: [(ファイルパス, 表示名), ...]
+
+    Returns:
+        ファイルごとの集計（sources と同じ順）
+    """
+    if len(sources) <= 1:
+        return [summarize_csv_file(bank_type, path, name, True, MAX_REPORTED_PARSE_ERRORS)
+                for path, name in sources]
+
+    pool = get_csv_pool()
+    futures = [pool.submit(summarize_csv_file, bank_type, str(path), name, True, MAX_REPORTED_PARSE_ERRORS)
+               for path, name in sources]
+    return [future.result() for future in futures]
+
+
+def load_bank_deposits(names, start_date=None, end_date=None):
+    """
+    保存済みの銀行CSVから、期間内の入金だけを読み込む（突合用）
+
+    Raises:
+        ValueError: ファイルが見つからない、または読み込めない
+    """
+    deposits = []
+    for name in names:
+        filename = safe_filename(name)
+        filepath = UPLOAD_CSV_DIR / filename
+        if not (filepath.is_file() and validate_file_path(filepath, UPLOAD_CSV_DIR)):
+            raise ValueError(f'銀行CSVが見つかりません: {filename}')
+        for batch in BankCSVParser().iter_parse(filepath, filename, memory_map=True):
+            deposits.extend(
+                t for t in batch.transactions
+                if t.type == 'income'
+                and (not start_date or t.date >= start_date)
+                and (not end_date or t.date <= end_date)
+            )
+    return deposits
+
+
 @app.route('/api/parse-csv', methods=['POST'])
 def parse_csv():
-    """銀行CSVを解析"""
+    """
+    銀行CSVを解析
+
+    アップロードした files に加え、saved_files（/api/upload/csv で保存済みのファイル名）も指定できる。
+    ファイルはそれぞれ銀行を判別し、チャンク単位・メモリマップで読む。
+    複数ファイルは並列に解析し、totals に全ファイルの合計を返す。
+    """
     try:
-        if 'files' not in request.files:
+        files = request.files.getlist('files')
+        saved_names = request.form.getlist('saved_files')
+        if not files and not saved_names:
             return jsonify({'success': False, 'error': 'ファイルがありません'})
 
-        files = request.files.getlist('files')
         bank_type = request.form.get('bank_type', 'auto')
 
         # 銀行タイプのマッピング
@@ -250,27 +751,38 @@ def parse_csv():
             'mizuho': 'みずほ銀行',
             'freee': 'freee形式'
         }
+        bank_type = bank_type_map.get(bank_type, '自動検出')
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # アップロードは一時ファイルに書き出し、ワーカープロセスにはパスだけを渡す
+            sources = []
+            for i, file in enumerate(files):
+                temp_path = Path(temp_dir) / f"{i}.csv"
+                file.save(str(temp_path))
+                sources.append((temp_path, file.filename))
+
+            results = [None] * (len(files) + len(saved_names))
+            for i, name in enumerate(saved_names, start=len(files)):
+                filename = safe_filename(name)
+                filepath = UPLOAD_CSV_DIR / filename
+                if not (filepath.is_file() and validate_file_path(filepath, UPLOAD_CSV_DIR)):
+                    results[i] = {'filename': filename, 'error': 'ファイルが見つかりません'}
+                    continue
+                sources.append((filepath, filename))
 
-        parser = BankCSVParser(bank_type=bank_type_map.get(bank_type, '自動検出'))
-
-        results = []
-        for file in files:
-            content = file.read()
-            transactions = parser.parse(content, file.filename)
-
-            total_income = sum(t.amount for t in transactions if t.type == 'income')
-            total_expense = sum(t.amount for t in transactions if t.type == 'expense')
+            parsed = iter(summarize_csv_files(bank_type, sources))
+            results = [r if r is not None else next(parsed) for r in results]
 
-            results.append({
-                'filename': file.filename,
-                'transaction_count': len(transactions),
-                'total_income': total_income,
-                'total_expense': total_expense
-            })
+        parsed_results = [r for r in results if 'error' not in r]
+        totals = {
+            key: sum(r[key] for r in parsed_results)
+            for key in ('transaction_count', 'total_income', 'total_expense', 'error_count')
+        }
 
         return jsonify({
             'success': True,
-            'results': results
+            'results': results,
+            'totals': totals
         })
 
     except Exception as e:
@@ -289,10 +801,37 @@ def health():
     })
 
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """監査の計測値（Prometheus テキスト形式。チェックごとの処理時間・走査件数・検出件数）"""
+    return Response(audit_metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 # ========================================
 # freee API連携エンドポイント（AI向け）
 # ========================================
 
+def deal_payload(d, account_map, tax_map):
+    """AI向けの取引表現（明細に勘定科目名・税区分名を付与）"""
+    return {
+        'id': d.id,
+        'issue_date': d.issue_date,
+        'type': d.type,
+        'amount': d.amount,
+        'details': [
+            {
+                'account_item_id': detail.get('account_item_id'),
+                'account_name': account_map.get(detail.get('account_item_id'), ''),
+                'tax_code': detail.get('tax_code'),
+                'tax_name': tax_map.get(detail.get('tax_code'), ''),
+                'amount': detail.get('amount'),
+                'description': detail.get('description', '')
+            }
+            for detail in d.details
+        ]
+    }
+
+
 @app.route('/api/freee/deals', methods=['GET'])
 def get_freee_deals():
     """
@@ -301,10 +840,15 @@ def get_freee_deals():
     クエリパラメータ:
         start_date: 開始日 (YYYY-MM-DD)
         end_date: 終了日 (YYYY-MM-DD)
-        limit: 取得件数上限 (デフォルト: 全件)
+        limit: 取得件数上限 (デフォルト: 全件)。続きがあればレスポンスの next_cursor を返す
+        cursor: 前回レスポンスの next_cursor（続きから取得。このときfreeeとの同期は行わない）
+        format: ndjson なら1行1取引で逐次返す（最終行に count・next_cursor）
+        full_sync: 1 ならローカルキャッシュ（取引・マスタ）を破棄して全件取り直す（freee側の削除を反映）
 
     使用例:
         curl "http://localhost:5000/api/freee/deals?start_date=2024-05-01&end_date=2025-12-03"
+        curl "http://localhost:5000/api/freee/deals?limit=500&format=ndjson"
+        curl "http://localhost:5000/api/freee/deals?limit=500&format=ndjson&cursor=<next_cursor>"
     """
     try:
         config = load_mcp_config()
@@ -318,41 +862,70 @@ def get_freee_deals():
 
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
+        full_sync = request.args.get('full_sync') == '1'
+        limit = request.args.get('limit', type=int)
+        cursor = request.args.get('cursor')
+        after = DealStore.decode_cursor(cursor) if cursor else None
 
-        client = FreeeClient(access_token=token, company_id=int(company_id))
+        if limit is not None and limit <= 0:
+            return jsonify({'success': False, 'error': 'limit は1以上を指定してください'})
 
-        # マスタデータ取得
+        client = get_freee_client(token, company_id)
+
+        # マスタデータ取得（全件同期時はマスタのキャッシュも取り直す）
+        if full_sync:
+            master_cache.invalidate(client.company_id)
         account_map = client.get_account_items()
         tax_map = client.get_tax_codes()
 
-        # 取引データ取得
-        deals = client.get_deals(start_date=start_date, end_date=end_date)
+        # 取引データ取得（前回以降の差分だけfreeeから取得し、ローカルキャッシュから読む）
+        # ページングの続き（cursor あり）は同期せずストアから読む
+        if after is None:
+            deal_store.sync(client, full=full_sync, concurrency=FREEE_FETCH_CONCURRENCY,
+                            start_date=start_date, end_date=end_date)
+
+        def page():
+            """(取引の表現, 次ページのカーソル) を順に返す（limit+1件読んで続きの有無を判定）"""
+            deals = deal_store.iter_deals(
+                client.company_id, start_date, end_date, after=after,
+                limit=limit + 1 if limit is not None else None
+            )
+            previous = None
+            for count, d in enumerate(deals, start=1):
+                if limit is not None and count > limit:
+                    yield None, DealStore.encode_cursor(previous)
+                    return
+                yield deal_payload(d, account_map, tax_map), None
+                previous = d
+
+        if request.args.get('format') == 'ndjson':
+            def generate():
+                count = 0
+                next_cursor = None
+                for payload, next_cursor in page():
+                    if payload is not None:
+                        count += 1
+                        yield json.dumps(payload, ensure_ascii=False) + '\n'
+                yield json.dumps({
+                    'success': True,
+                    'count': count,
+                    'next_cursor': next_cursor
+                }, ensure_ascii=False) + '\n'
+
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
 
         # レスポンス用に整形
         deals_data = []
-        for d in deals:
-            deal_dict = {
-                'id': d.id,
-                'issue_date': d.issue_date,
-                'type': d.type,
-                'amount': d.amount,
-                'details': []
-            }
-            for detail in d.details:
-                deal_dict['details'].append({
-                    'account_item_id': detail.get('account_item_id'),
-                    'account_name': account_map.get(detail.get('account_item_id'), ''),
-                    'tax_code': detail.get('tax_code'),
-                    'tax_name': tax_map.get(detail.get('tax_code'), ''),
-                    'amount': detail.get('amount'),
-                    'description': detail.get('description', '')
-                })
-            deals_data.append(deal_dict)
+        next_cursor = None
+        for payload, next_cursor in page():
+            if payload is not None:
+                deals_data.append(payload)
 
         return jsonify({
             'success': True,
             'count': len(deals_data),
-            'deals': deals_data
+            'deals': deals_data,
+            'next_cursor': next_cursor
         })
 
     except Exception as e:
@@ -369,9 +942,13 @@ def fix_tax_codes():
             "fixes": [
                 {"deal_id": 123, "old_tax_code": 21, "new_tax_code": 136},
                 ...
-            ]
+            ],
+            "stream": false
         }
 
+    同じ取引への複数の修正は1回の更新にまとめ、取引単位で並列に処理する。
+    stream が true なら取引ごとの進捗を NDJSON（1行1取引、最終行に集計）で返す。
+
     使用例:
         curl -X POST http://localhost:5000/api/freee/fix-tax \
             -H "Content-Type: application/json" \
@@ -393,79 +970,43 @@ def fix_tax_codes():
         if not fixes:
             return jsonify({'success': False, 'error': '修正対象が指定されていません'})
 
-        import requests as req
-        BASE_URL = 'https://api.freee.co.jp/api/1'
-        headers = {
-            'Authorization': f'Bearer {token}',
-            'X-Api-Version': '2020-06-15',
-            'Content-Type': 'application/json'
-        }
-
-        results = []
-        for fix in fixes:
-            deal_id = fix.get('deal_id')
-            new_tax_code = fix.get('new_tax_code')
-
-            try:
-                # 取引詳細を取得（タイムアウト30秒）
-                resp = req.get(f'{BASE_URL}/deals/{deal_id}',
-                              headers=headers,
-                              params={'company_id': company_id},
-                              timeout=30)
-
-                if resp.status_code != 200:
-                    results.append({
-                        'deal_id': deal_id,
-                        'success': False,
-                        'error': '取引が見つかりません'
-                    })
-                    continue
-
-                deal = resp.json().get('deal', {})
-
-                # 詳細を更新
-                new_details = []
-                for d in deal.get('details', []):
-                    new_details.append({
-                        'account_item_id': d['account_item_id'],
-                        'tax_code': new_tax_code if d.get('tax_code') == fix.get('old_tax_code') else d.get('tax_code'),
-                        'amount': d['amount'],
-                        'description': d.get('description', '')
-                    })
-
-                update_data = {
-                    'company_id': company_id,
-                    'issue_date': deal['issue_date'],
-                    'type': deal['type'],
-                    'details': new_details
-                }
-
-                # 更新実行（タイムアウト30秒）
-                update_resp = req.put(f'{BASE_URL}/deals/{deal_id}',
-                                     headers=headers,
-                                     json=update_data,
-                                     timeout=30)
-
-                if update_resp.status_code == 200:
-                    results.append({
-                        'deal_id': deal_id,
-                        'success': True,
-                        'message': f'税区分を{fix.get("old_tax_code")}→{new_tax_code}に修正'
-                    })
-                else:
-                    error_msg = update_resp.json().get('errors', [{}])[0].get('messages', ['更新失敗'])
-                    results.append({
-                        'deal_id': deal_id,
-                        'success': False,
-                        'error': translate_error(str(error_msg))
-                    })
-
-            except Exception as e:
-                results.append({
-                    'deal_id': deal_id,
-                    'success': False,
-                    'error': translate_error(str(e))
-                })
+        client = get_freee_client(token, company_id)
+        fixer = TaxCodeFixer(client, max_workers=FREEE_FIX_WORKERS)
+
+        def outcomes():
+            for outcome in fixer.run(fixes):
+                # ローカルキャッシュにも修正後の取引を反映
+                if outcome['deal'] is not None:
+                    deal_store.save_deals(client.company_id, [outcome['deal']])
+                for r in outcome['results']:
+                    if not r['success']:
+                        r['error'] = translate_error(r['error'])
+                yield outcome
+
+        if data.get('stream'):
+            def generate():
+                done = succeeded = 0
+                for outcome in outcomes():
+                    done += len(outcome['results'])
+                    succeeded += sum(1 for r in outcome['results'] if r['success'])
+                    yield json.dumps({
+                        'deal_id': outcome['deal_id'],
+                        'results': outcome['results'],
+                        'done': done,
+                        'total': len(fixes)
+                    }, ensure_ascii=False) + '\n'
+                yield json.dumps({
+                    'success': True,
+                    'total': len(fixes),
+                    'succeeded': succeeded,
+                    'failed': len(fixes) - succeeded
+                }, ensure_ascii=False) + '\n'
+
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+        # 結果は修正指示の順に並べ直す
+        results_by_deal = {o['deal_id']: iter(o['results']) for o in outcomes()}
+        results = [next(results_by_deal[fix.get('deal_id')]) for fix in fixes]
 
         success_count = sum(1 for r in results if r.get('success'))
         return jsonify({
@@ -534,7 +1075,7 @@ def handle_token():
         if token:
             try:
                 # company_id なしでクライアント初期化
-                client = FreeeClient(access_token=token, company_id=0) 
+                client = get_freee_client(token, 0)
                 companies = client.get_companies()
                 
                 if companies:
@@ -790,10 +1331,6 @@ def export_audit():
         curl "http://localhost:5000/api/audit/export?format=csv" -o audit_report.csv
     """
     try:
-        import io
-        import csv as csv_module
-        from flask import Response
-
         result_file = DATA_DIR / "tax_check_result.json"
 
         if not result_file.exists():
@@ -804,49 +1341,18 @@ def export_audit():
 
         if export_format == 'json':
             # JSON形式でダウンロード
-            response = Response(
-                json.dumps(result_data, ensure_ascii=False, indent=2),
+            return Response(
+                audit_result_to_json(result_data),
                 mimetype='application/json',
                 headers={'Content-Disposition': 'attachment; filename=audit_report.json'}
             )
-            return response
-
-        # CSV形式でエクスポート
-        output = io.StringIO()
-        writer = csv_module.writer(output)
-
-        # ヘッダー
-        writer.writerow(['カテゴリ', 'タイトル', 'リスクレベル', '金額', '説明', '推奨アクション'])
-
-        # 問題リスト
-        issues = result_data.get('issues', [])
-        for issue in issues:
-            writer.writerow([
-                issue.get('category', ''),
-                issue.get('title', ''),
-                issue.get('risk_level', ''),
-                issue.get('amount', ''),
-                issue.get('description', ''),
-                issue.get('suggestion', '')
-            ])
-
-        # サマリー行を追加
-        writer.writerow([])
-        writer.writerow(['=== サマリー ==='])
-        writer.writerow(['取引件数', result_data.get('deal_count', 0)])
-        writer.writerow(['エラー数', result_data.get('errors', 0)])
-        writer.writerow(['警告数', result_data.get('warnings', 0)])
-
-        output.seek(0)
-
-        # BOM付きUTF-8でExcelでも文字化けしないように
-        bom = '\ufeff'
-        response = Response(
-            bom + output.getvalue(),
+
+        # CSV形式でエクスポート（BOM付きUTF-8）
+        return Response(
+            audit_result_to_csv(result_data),
             mimetype='text/csv; charset=utf-8',
             headers={'Content-Disposition': 'attachment; filename=audit_report.csv'}
         )
-        return response
 
     except Exception as e:
         import logging
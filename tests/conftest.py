@@ -0,0 +1,7 @@
+"""
+テスト共通の設定（リポジトリ直下を import パスに追加する。server.py と同じ方式）
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,53 @@
+"""
+テスト用のヘルパー（freee クライアントの代用品・取引の生成）
+"""
+from core.freee_client import Deal
+
+
+class FakeFreeeClient:
+    """
+    DealStore.sync・一括監査用の freee クライアント（事業所・マスタの取得と取引一覧のページングを再現）
+
+    fail_after_pages を指定すると、そのページ数を返した後で通信エラーを送出する。
+    """
+
+    def __init__(self, company_id=1, deals=None):
+        self.company_id = company_id
+        self.deals = {d.id: d for d in (deals or [])}
+        self.renewed = set()
+        self.calls = []
+        self.fail_after_pages = None
+
+    def get_company(self):
+        return {'id': self.company_id, 'display_name': f"事業所{self.company_id}"}
+
+    def get_account_items(self):
+        return {1: "消耗品費", 2: "売上高"}
+
+    def get_tax_codes(self):
+        return {21: "課税売上10%", 136: "課税仕入10%"}
+
+    def iter_deals(self, start_date=None, end_date=None, limit=100, concurrency=1,
+                   renewed_since=None, on_page=None, offset=0):
+        self.calls.append({'start_date': start_date, 'end_date': end_date,
+                           'renewed_since': renewed_since, 'offset': offset})
+        deals = sorted(self.deals.values(), key=lambda d: d.id)
+        if renewed_since is not None:
+            deals = [d for d in deals if d.id in self.renewed]
+        deals = [d for d in deals
+                 if (start_date is None or d.issue_date >= start_date)
+                 and (end_date is None or d.issue_date <= end_date)]
+        pages = 0
+        for page_start in range(offset, len(deals), limit):
+            if self.fail_after_pages is not None and pages >= self.fail_after_pages:
+                raise ConnectionError("通信エラー")
+            pages += 1
+            yield from deals[page_start:page_start + limit]
+
+
+def make_deal(deal_id, issue_date="2024-06-01", deal_type="expense", details=None):
+    """テスト用の取引（明細の金額の合計を取引金額にする）"""
+    details = details if details is not None else [
+        {'account_item_id': 1, 'tax_code': 136, 'amount': 1000, 'description': ''}
+    ]
+    return Deal(deal_id, issue_date, deal_type, sum(d.get('amount', 0) for d in details), details, [])
@@ -0,0 +1,176 @@
+"""
+BankCSVParser: 列単位の一括変換が1行ずつの解釈と同じ結果になること・Transaction の省メモリ化・チャンク単位の読み込み・銀行の自動検出・ファイルごとの集計
+"""
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pytest
+
+from core.bank_parser import BankCSVParser, Transaction, summarize_csv_file
+
+DESCRIPTIONS = ["振込 カ)ヤマダ", "ATM", "カード 楽天", "給与", "振込手数料", "電気料金"]
+
+
+def row_wise_amount(text):
+    """1行ずつ解釈したときの金額（空・"-" は0、カンマ・円・¥を除去、小数は切り捨て）"""
+    cleaned = text.replace(",", "").replace("円", "").replace("¥", "").strip()
+    if cleaned in ("", "-"):
+        return 0
+    return int(float(cleaned))
+
+
+def make_csv(bank, rows):
+    config = BankCSVParser.BANK_CONFIGS[bank]
+    columns = [config[key] for key in ("date_col", "description_col", "deposit_col", "withdrawal_col", "balance_col")]
+    lines = [",".join(columns)] + [",".join(row) for row in rows]
+    return ("\n".join(lines) + "\n").encode(config["encoding"])
+
+
+def random_rows(bank, count, seed):
+    r = random.Random(seed)
+    date_format = BankCSVParser.BANK_CONFIGS[bank]["date_format"]
+    amounts = ["1000", '"25,000"', "300000円", '"4,800円"', " 120 ", "-", "", "1.5", "不明"]
+    rows = []
+    for _ in range(count):
+        date = datetime(2020 + r.randint(0, 4), r.randint(1, 12), r.randint(1, 28)).strftime(date_format)
+        if r.random() < 0.05:
+            date = "不明"
+        deposit, withdrawal = r.choice(amounts), r.choice(amounts)
+        rows.append([date, r.choice(DESCRIPTIONS), deposit, withdrawal, str(r.randint(0, 10 ** 6))])
+    return rows
+
+
+@pytest.mark.parametrize("bank", ["楽天銀行", "みずほ銀行"])
+def test_vectorized_parse_matches_row_wise_rules(bank):
+    rows = random_rows(bank, 500, seed=7)
+    date_format = BankCSVParser.BANK_CONFIGS[bank]["date_format"]
+
+    result = BankCSVParser(bank).parse_detailed(make_csv(bank, rows))
+
+    expected, errors = [], []
+    for number, (date, description, deposit, withdrawal, balance) in enumerate(rows, start=1):
+        try:
+            date = datetime.strptime(date, date_format).strftime("%Y-%m-%d")
+        except ValueError:
+            errors.append({'row': number, 'reason': "日付を解釈できません"})
+            continue
+        try:
+            deposit, withdrawal = row_wise_amount(deposit.strip('"')), row_wise_amount(withdrawal.strip('"'))
+        except ValueError:
+            errors.append({'row': number, 'reason': "金額を解釈できません"})
+            continue
+        income = deposit > 0
+        expected.append((date, description, deposit if income else withdrawal,
+                         int(balance) or None, "income" if income else "expense"))
+
+    assert [(t.date, t.description, t.amount, t.balance, t.type) for t in result.transactions] == expected
+    assert result.errors == errors
+
+
+def test_numeric_columns_and_missing_values():
+    rows = [["2024/04/01", "ATM", "1000", "", "5000"],
+            ["2024/04/02", "給与", "", "2000", "0"],
+            ["2024/13/01", "ATM", "1", "", "1"]]
+
+    result = BankCSVParser("楽天銀行").parse_detailed(make_csv("楽天銀行", rows))
+
+    assert [(t.date, t.amount, t.balance, t.type) for t in result.transactions] == [
+        ("2024-04-01", 1000, 5000, "income"),
+        ("2024-04-02", 2000, None, "expense"),
+    ]
+    assert result.errors == [{'row': 3, 'reason': "日付を解釈できません"}]
+    assert result.transactions[0].raw_data["摘要"] == "ATM"
+
+
+def test_repeated_strings_are_shared():
+    rows = [["2024/04/01", "ATM", "1000", "", "5000"]] * 3
+
+    transactions = BankCSVParser("楽天銀行").parse(make_csv("楽天銀行", rows))
+
+    assert transactions[0].date is transactions[2].date
+    assert transactions[0].description is transactions[2].description
+
+
+def test_transactions_are_slotted_and_build_raw_data_on_access():
+    rows = [["2024/04/01", "ATM", "1000", "0", "5000"], ["2024/04/02", "給与", "0", "2000", "3000"]]
+
+    first, second = BankCSVParser("楽天銀行").parse(make_csv("楽天銀行", rows))
+
+    assert not hasattr(first, "__dict__")
+    assert first._raw_rows is second._raw_rows  # 元データは1ファイル分を共有
+    assert second.raw_data["摘要"] == "給与"
+    assert first == Transaction("2024-04-01", "ATM", 1000, 5000, "income", raw_data=first.raw_data)
+    assert Transaction("2024-04-01", "ATM", 1000).raw_data is None
+
+
+@pytest.mark.parametrize("memory_map", [False, True])
+def test_chunked_parse_matches_whole_file(tmp_path, memory_map):
+    content = make_csv("楽天銀行", random_rows("楽天銀行", 200, seed=3))
+    path = tmp_path / "rakuten.csv"
+    path.write_bytes(content)
+    whole = BankCSVParser("楽天銀行").parse_detailed(content)
+
+    chunks = list(BankCSVParser("楽天銀行").iter_parse(path, chunksize=37, memory_map=memory_map))
+
+    assert len(chunks) == 6
+    assert [t for c in chunks for t in c.transactions] == whole.transactions
+    # エラー行の番号はファイル全体での通し番号
+    assert [e for c in chunks for e in c.errors] == whole.errors
+    assert any(e['row'] > 37 for e in whole.errors)
+
+
+def header(bank):
+    config = BankCSVParser.BANK_CONFIGS[bank]
+    columns = [v for k, v in config.items() if k.endswith("_col")]
+    return (",".join(columns) + "\n").encode(config["encoding"])
+
+
+@pytest.mark.parametrize("bank", list(BankCSVParser.BANK_CONFIGS))
+def test_detects_every_bank_from_its_header(bank):
+    # ファイル名が別の銀行を指していてもヘッダーを優先する
+    assert BankCSVParser().detect_bank_type(header(bank), "mizuho_rakuten.csv") == (bank, 1.0)
+
+
+def test_filename_is_only_a_low_confidence_hint():
+    parser = BankCSVParser()
+    unknown = "日時,メモ\n".encode("shift_jis")
+
+    assert parser.detect_bank_type(unknown, "rakuten.csv") == ("楽天銀行", parser.FILENAME_CONFIDENCE)
+    assert parser.detect_bank_type(unknown, "statement.csv") == (None, 0.0)
+    with pytest.raises(ValueError):
+        parser.parse_detailed(unknown + "2024/04/01,ATM\n".encode("shift_jis"), "rakuten.csv")
+
+
+def test_auto_detection_is_per_file():
+    parser = BankCSVParser()
+    rakuten = make_csv("楽天銀行", [["2024/04/01", "ATM", "1000", "0", "5000"]])
+    mizuho = make_csv("みずほ銀行", [["2024年04月01日", "ATM", "1000", "0", "5000"]])
+
+    assert parser.parse_detailed(rakuten).bank_type == "楽天銀行"
+    assert parser.parse_detailed(mizuho).bank_type == "みずほ銀行"
+    assert parser.bank_type == "自動検出"
+
+
+def test_files_are_summarized_independently_in_a_process_pool(tmp_path):
+    files = {
+        "a.csv": make_csv("楽天銀行", [["2024/04/01", "ATM", "1000", "0", "5000"],
+                                       ["2024/04/02", "給与", "0", "300", "4700"]]),
+        "b.csv": make_csv("みずほ銀行", [["2024年04月01日", "ATM", "200", "0", "200"],
+                                         ["不明", "ATM", "1", "0", "1"]]),
+        "c.csv": "日時,メモ\n".encode("shift_jis"),
+    }
+    for name, content in files.items():
+        (tmp_path / name).write_bytes(content)
+
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        futures = [pool.submit(summarize_csv_file, "自動検出", str(tmp_path / name), name, True, 1)
+                   for name in files]
+        summaries = [f.result() for f in futures]
+
+    assert [s['filename'] for s in summaries] == list(files)
+    assert [(s['bank_type'], s['transaction_count'], s['total_income'], s['total_expense'])
+            for s in summaries[:2]] == [("楽天銀行", 2, 1000, 300), ("みずほ銀行", 1, 200, 0)]
+    assert summaries[1]['errors'] == [{'row': 2, 'reason': "日付を解釈できません"}]
+    # 読めないファイルは他のファイルの集計を止めない
+    assert "error" in summaries[2]
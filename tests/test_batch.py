@@ -0,0 +1,56 @@
+"""
+一括監査: 対象の指定・集計・クライアントの使い回し
+"""
+import json
+
+import pytest
+
+from core.batch import BatchAuditRunner, BatchTarget, parse_company
+from core.deal_store import DealStore
+from helpers import FakeFreeeClient, make_deal
+
+
+def deals_for(company_id):
+    return [make_deal(company_id * 100 + i, f"2024-0{i}-01",
+                      details=[{'account_item_id': 1, 'tax_code': 21, 'amount': 1000, 'description': ''}])
+            for i in range(1, 4)]
+
+
+def test_targets_are_validated():
+    assert parse_company("123,2024-04-01,2025-03-31,4") == BatchTarget(123, "2024-04-01", "2025-03-31", 4)
+    assert BatchTarget.from_dict({'company_id': "7"}) == BatchTarget(7)
+    with pytest.raises(ValueError):
+        BatchTarget.from_dict({'company_id': 1, 'fiscal_month': 13})
+
+
+def test_run_uses_client_factory_and_writes_summary(tmp_path):
+    clients = {cid: FakeFreeeClient(company_id=cid, deals=deals_for(cid)) for cid in (1, 2)}
+    requested = []
+
+    def factory(company_id):
+        requested.append(company_id)
+        if company_id not in clients:
+            raise ConnectionError("事業所にアクセスできません")
+        return clients[company_id]
+
+    runner = BatchAuditRunner("token", DealStore(tmp_path / "deals.sqlite3"), workers=1,
+                              client_factory=factory)
+    targets = [BatchTarget(1), BatchTarget(2, "2024-02-01"), BatchTarget(3)]
+    progress = []
+
+    summary = runner.run(targets, output_dir=tmp_path / "out",
+                         on_progress=lambda done, total, row: progress.append((done, total)))
+
+    assert sorted(requested) == [1, 2, 3]
+    assert (summary['total'], summary['succeeded'], summary['failed']) == (3, 2, 1)
+    rows = summary['companies']
+    assert [row['company_id'] for row in rows] == [1, 2, 3]
+    assert [row['deal_count'] for row in rows] == [3, 2, 0]
+    assert rows[0]['company_name'] == "事業所1" and rows[0]['issues'] > 0
+    assert rows[2]['status'] == 'failed' and "アクセス" in rows[2]['error']
+    assert sorted(progress) == [(1, 3), (2, 3), (3, 3)]
+
+    written = json.loads((tmp_path / "out" / "summary.json").read_text(encoding="utf-8"))
+    assert written['succeeded'] == 2
+    assert (tmp_path / "out" / f"{targets[0].label}.json").exists()
+    assert not (tmp_path / "out" / f"{targets[2].label}.json").exists()
@@ -0,0 +1,61 @@
+"""
+チェックのレジストリ: 番号の指定・実行順・モジュールの遅延読み込み
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from benchmarks.synthetic import ACCOUNT_MAP, TAX_MAP, generate_deals
+from core.checks.registry import get_rules
+from core.export import issue_to_dict
+from core.tax_inspector import TaxInspector
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def codes(specs):
+    return [spec.code for spec in specs]
+
+
+def test_codes_are_normalized_and_returned_in_run_order():
+    assert codes(get_rules(["17", "1", "15", "15"])) == ["01", "15", "17"]
+
+
+def test_comma_separated_string_is_split():
+    assert codes(get_rules("15")) == ["15"]
+    assert codes(get_rules("16, 15,")) == ["15", "16"]
+
+
+def test_unknown_or_invalid_codes_are_rejected():
+    with pytest.raises(ValueError):
+        get_rules(["15", "99"])
+    with pytest.raises(TypeError):
+        get_rules(15)
+
+
+def test_subset_matches_the_same_checks_in_a_full_run():
+    deals = list(generate_deals(3000, seed=5, tax_error_rate=0.05))
+    inspector = TaxInspector(ACCOUNT_MAP, TAX_MAP)
+
+    full = inspector.inspect_all(deals, fiscal_year_start="2024-04-01")
+    subset = inspector.inspect_all(deals, fiscal_year_start="2024-04-01", checks="15,16,17")
+
+    expected = [issue_to_dict(i) for i in full.issues if i.category.split(".")[0] in ("15", "16", "17")]
+    assert [issue_to_dict(i) for i in subset.issues] == expected
+    assert subset.details['15_tax_code'] == full.details['15_tax_code']
+
+
+def test_only_selected_check_modules_are_imported():
+    script = (
+        "import sys\n"
+        "from core.tax_inspector import TaxInspector\n"
+        "TaxInspector().inspect_all([], checks=['15'])\n"
+        "print(sorted(m for m in sys.modules if m.startswith('core.checks.')))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True)
+    loaded = out.stdout.strip()
+    assert "core.checks.consumption_tax" in loaded
+    for module in ("sales", "personnel", "officer", "expense", "related_party", "records", "summary"):
+        assert f"core.checks.{module}'" not in loaded
@@ -0,0 +1,191 @@
+"""
+DealStore: 同期（初回は要求期間のみ・範囲の拡張・ページごとの書き込みと再開）・リビジョン・カーソル
+"""
+import sqlite3
+import threading
+
+import pytest
+
+from core.deal_store import DealStore
+from helpers import FakeFreeeClient, make_deal
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DealStore(tmp_path / "deals.sqlite3")
+
+
+def test_first_sync_fetches_only_requested_period(store):
+    client = FakeFreeeClient(deals=[make_deal(1, "2023-06-01"), make_deal(2, "2024-06-01")])
+
+    result = store.sync(client, start_date="2024-04-01", end_date="2025-03-31")
+
+    assert result['mode'] == 'full'
+    assert result['covered'] == ["2024-04-01", "2025-03-31"]
+    assert client.calls[0]['start_date'] == "2024-04-01"
+    assert [d.id for d in store.iter_deals(1)] == [2]
+
+
+def test_sync_fetches_only_the_gap_outside_covered_range(store):
+    client = FakeFreeeClient(deals=[make_deal(1, "2023-06-01"), make_deal(2, "2024-06-01")])
+    store.sync(client, start_date="2024-04-01", end_date="2025-03-31")
+    client.calls.clear()
+
+    result = store.sync(client, start_date="2023-04-01", end_date="2025-03-31")
+
+    assert result['mode'] == 'delta'
+    assert result['covered'] == ["2023-04-01", "2025-03-31"]
+    assert client.calls[0]['renewed_since'] is not None  # 取得済みの範囲は差分だけ
+    assert client.calls[1]['renewed_since'] is None
+    assert (client.calls[1]['start_date'], client.calls[1]['end_date']) == ("2023-04-01", "2024-03-31")
+    assert [d.id for d in store.iter_deals(1)] == [1, 2]
+
+
+def test_delta_sync_picks_up_renewed_deals(store):
+    client = FakeFreeeClient(deals=[make_deal(1), make_deal(2)])
+    store.sync(client)
+    client.deals[2] = make_deal(2, details=[{'account_item_id': 1, 'tax_code': 21, 'amount': 5}])
+    client.renewed.add(2)
+
+    result = store.sync(client)
+
+    assert result['mode'] == 'delta' and result['fetched'] == 1
+    assert store.get_deals(1)[1].details[0]['tax_code'] == 21
+
+
+def test_full_sync_removes_deals_deleted_in_freee(store):
+    client = FakeFreeeClient(deals=[make_deal(1), make_deal(2)])
+    store.sync(client)
+    del client.deals[1]
+
+    store.sync(client, full=True)
+
+    assert [d.id for d in store.iter_deals(1)] == [2]
+
+
+def test_interrupted_sync_keeps_committed_pages_and_resumes(store, monkeypatch):
+    monkeypatch.setattr(DealStore, "SYNC_BATCH_SIZE", 2)
+    client = FakeFreeeClient(deals=[make_deal(i) for i in range(1, 6)])
+    client.fail_after_pages = 2
+
+    with pytest.raises(ConnectionError):
+        store.sync(client)
+    # 書き込み済みのページは残り、同期は完了していない
+    assert [d.id for d in store.iter_deals(1)] == [1, 2, 3, 4]
+    assert store.get_sync_point(1) is None
+
+    client.fail_after_pages = None
+    result = store.sync(client)
+
+    assert client.calls[-1]['offset'] == 4
+    assert result['fetched'] == 1
+    assert [d.id for d in store.iter_deals(1)] == [1, 2, 3, 4, 5]
+    assert store.get_sync_point(1) is not None
+
+
+def test_sync_does_not_hold_the_write_lock_between_pages(store, monkeypatch):
+    monkeypatch.setattr(DealStore, "SYNC_BATCH_SIZE", 1)
+    client = FakeFreeeClient(deals=[make_deal(1), make_deal(2)])
+    original = client.iter_deals
+
+    def iter_deals(**kwargs):
+        for deal in original(**kwargs):
+            yield deal
+            # ページの間に他の書き込み（税区分修正の書き戻し）が待たずに通る
+            conn = sqlite3.connect(store.path, timeout=0)
+            conn.execute("BEGIN IMMEDIATE")
+            conn.rollback()
+            conn.close()
+
+    client.iter_deals = iter_deals
+    store.sync(client)
+    assert len(store.get_deals(1)) == 2
+
+
+def test_each_write_batch_gets_its_own_revision(store):
+    store.save_deals(1, [make_deal(1), make_deal(2)])
+    first = store.get_revision(1)
+    store.save_deals(1, [make_deal(2, details=[])])
+
+    revision, reset_revision, changes = store.get_changes(1, first)
+
+    assert revision == first + 1 and reset_revision == 0
+    assert [d.id for d in changes] == [2]
+    assert store.get_changes(1, revision)[2] == []
+
+
+def test_concurrent_writers_never_share_a_revision(store):
+    def write(offset):
+        for i in range(20):
+            store.save_deals(1, [make_deal(offset + i)])
+
+    threads = [threading.Thread(target=write, args=(n * 100,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    conn = sqlite3.connect(store.path)
+    revisions = [r for (r,) in conn.execute("SELECT revision FROM deals WHERE company_id = 1")]
+    conn.close()
+    assert len(set(revisions)) == len(revisions) == 80
+    assert store.get_revision(1) == max(revisions)
+
+
+def test_full_sync_moves_the_reset_revision(store):
+    client = FakeFreeeClient(deals=[make_deal(1)])
+    store.sync(client)
+    before = store.get_revision(1)
+
+    store.sync(client, full=True)
+
+    assert store.get_reset_revision(1) > before
+
+
+def test_iter_deals_streams_in_date_and_id_order_within_the_period(store):
+    store.save_deals(1, [make_deal(3, "2024-05-01"), make_deal(1, "2024-06-01"),
+                         make_deal(2, "2024-05-01"), make_deal(4, "2025-01-01")])
+    store.save_deals(2, [make_deal(9, "2024-05-01")])
+
+    deals = store.iter_deals(1, start_date="2024-05-01", end_date="2024-12-31")
+
+    assert next(deals).id == 2  # 1件ずつ読む
+    assert [d.id for d in deals] == [3, 1]
+    assert [d.id for d in store.iter_deals(2)] == [9]
+
+
+def test_cursor_pages_cover_every_deal_once(store):
+    store.save_deals(1, [make_deal(i, f"2024-0{i % 3 + 4}-01") for i in range(1, 8)])
+    everything = [d.id for d in store.iter_deals(1)]
+
+    seen, after = [], None
+    while True:
+        page = list(store.iter_deals(1, after=after, limit=3))
+        if not page:
+            break
+        seen += [d.id for d in page]
+        after = DealStore.decode_cursor(DealStore.encode_cursor(page[-1]))
+
+    assert seen == everything and len(seen) == 7
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "bnVsbA==", "WyJ4Il0="])
+def test_invalid_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        DealStore.decode_cursor(cursor)
+
+
+def test_read_connections_are_closed(tmp_path, monkeypatch):
+    opened = []
+    connect = DealStore._connect
+    monkeypatch.setattr(DealStore, "_connect", lambda self: opened.append(connect(self)) or opened[-1])
+
+    store = DealStore(tmp_path / "deals.sqlite3")
+    store.sync(FakeFreeeClient(deals=[make_deal(1)]), full=True)
+    store.get_reset_revision(1)
+    store.get_revision(1)
+
+    assert opened
+    for conn in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")  # 閉じた接続
@@ -0,0 +1,126 @@
+"""
+FreeeClient: 取引一覧の並列取得・セッションの使い回しと429の再試行・Deal の省メモリ化
+"""
+import random
+import time
+
+import pytest
+
+from core.freee_client import FreeeClient, RateLimiter
+
+
+def make_client(total, monkeypatch, fail_at=None):
+    client = FreeeClient(access_token="token", company_id=1, rate_limit=0)
+    deals = [{'id': i, 'issue_date': "2024-04-01", 'type': "expense", 'amount': i, 'details': []}
+             for i in range(total)]
+    requested = []
+
+    def get_page(params, offset):
+        requested.append(offset)
+        if offset == fail_at:
+            raise ConnectionError("通信エラー")
+        # 後のページほど早く返る（完了順と offset 順が食い違う）
+        time.sleep(random.uniform(0, 0.01) if offset else 0.02)
+        return {'deals': deals[offset:offset + params['limit']], 'meta': {'total_count': total}}
+
+    monkeypatch.setattr(client, "_get_deals_page", get_page)
+    return client, requested
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_pages_are_returned_in_offset_order(monkeypatch, concurrency):
+    client, requested = make_client(950, monkeypatch)
+    progress = []
+
+    deals = list(client.iter_deals(limit=100, concurrency=concurrency,
+                                   on_page=lambda done, total: progress.append((done, total))))
+
+    assert [d.id for d in deals] == list(range(950))
+    assert sorted(requested) == list(range(0, 950, 100))
+    assert progress == [(page, 10) for page in range(1, 11)]
+
+
+def test_resume_from_offset(monkeypatch):
+    client, requested = make_client(450, monkeypatch)
+
+    deals = list(client.iter_deals(limit=100, concurrency=2, offset=200))
+
+    assert [d.id for d in deals] == list(range(200, 450))
+    assert min(requested) == 200
+
+
+def test_abandoned_iteration_cancels_remaining_pages(monkeypatch):
+    client, requested = make_client(5000, monkeypatch)
+
+    deals = client.iter_deals(limit=100, concurrency=2)
+    next(deals)
+    deals.close()
+
+    assert len(requested) <= 4  # 先読みした分だけ
+
+
+def test_failed_page_stops_iteration(monkeypatch):
+    client, _ = make_client(950, monkeypatch, fail_at=500)
+
+    seen = []
+    with pytest.raises(ConnectionError):
+        for deal in client.iter_deals(limit=100, concurrency=3):
+            seen.append(deal.id)
+    assert seen == list(range(500))
+
+
+def test_rate_limiter_spaces_requests_across_threads():
+    from concurrent.futures import ThreadPoolExecutor
+
+    limiter = RateLimiter(200)
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda _: limiter.wait(), range(21)))
+    assert time.monotonic() - started >= 0.095
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def test_requests_reuse_one_session_and_retry_on_429(monkeypatch):
+    client = FreeeClient(access_token="token", company_id=1, rate_limit=0)
+    responses = [FakeResponse(429, {"Retry-After": "0"}), FakeResponse(429), FakeResponse(200)]
+    sessions, delays = [], []
+
+    def request(method, url, **kwargs):
+        sessions.append(client.session)
+        assert kwargs["timeout"] == client.timeout
+        return responses.pop(0)
+
+    monkeypatch.setattr(client.session, "request", request)
+    monkeypatch.setattr(time, "sleep", delays.append)
+
+    assert client.request("GET", "/deals").status_code == 200
+    assert len(sessions) == 3 and len(set(map(id, sessions))) == 1
+    # Retry-After があればその秒数、なければ指数バックオフ
+    assert delays == [0.0, FreeeClient.RETRY_BACKOFF * 2]
+    assert client.session.headers["Authorization"] == "Bearer token"
+
+
+def test_gives_up_after_max_retries(monkeypatch):
+    client = FreeeClient(access_token="token", company_id=1, rate_limit=0)
+    calls = []
+    monkeypatch.setattr(client.session, "request", lambda *a, **k: calls.append(1) or FakeResponse(429))
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)
+
+    assert client.request("GET", "/deals").status_code == 429
+    assert len(calls) == FreeeClient.MAX_RETRIES + 1
+
+
+def test_parsed_deals_are_slotted_and_share_their_lists():
+    a = FreeeClient.parse_deal({'id': 1, 'issue_date': "".join(["2024-", "04-01"]), 'type': "expense",
+                                'details': [{'amount': 1}]})
+    b = FreeeClient.parse_deal({'id': 2, 'issue_date': "".join(["2024-", "04-01"]), 'type': "expense"})
+
+    assert not hasattr(a, "__dict__")
+    assert a.issue_date is b.issue_date  # intern して共有
+    assert a.to_dict()['details'] is a.details
+    assert (b.amount, b.details, b.payments) == (0, [], [])
@@ -0,0 +1,67 @@
+"""
+JobManager: ジョブの実行・キャンセルと種類ごとの専用ワーカー
+"""
+import threading
+
+from core.jobs import JobManager
+
+
+def test_job_result_and_failure():
+    jobs = JobManager(max_workers=1)
+
+    ok = jobs.submit("analyze", lambda job, x: x * 2, 21)
+    failed = jobs.submit("analyze", lambda job: 1 / 0)
+
+    assert ok.wait(5) and failed.wait(5)
+    assert (ok.status, ok.result) == ("succeeded", 42)
+    assert failed.status == "failed" and "division" in failed.error
+    assert jobs.get(ok.id) is ok
+
+
+def test_cancel_stops_at_next_progress_update():
+    jobs = JobManager(max_workers=1)
+    started, release = threading.Event(), threading.Event()
+
+    def work(job):
+        started.set()
+        release.wait(5)
+        job.update(stage="inspect")
+
+    job = jobs.submit("analyze", work)
+    started.wait(5)
+    assert jobs.cancel(job.id)
+    release.set()
+    job.wait(5)
+    assert job.status == "cancelled"
+    assert not jobs.cancel(job.id)
+
+
+def test_batch_jobs_do_not_block_other_jobs():
+    jobs = JobManager(max_workers=1, kind_workers={"batch": 1})
+    release = threading.Event()
+
+    batches = [jobs.submit("batch", lambda job: release.wait(5)) for _ in range(2)]
+    analysis = jobs.submit("analyze", lambda job: "done")
+
+    assert analysis.wait(5) and analysis.result == "done"
+    # 一括監査は専用のワーカーで1件ずつ
+    assert batches[1].status == "queued"
+    release.set()
+    assert all(job.wait(5) for job in batches)
+
+
+def test_finished_jobs_are_pruned(monkeypatch):
+    monkeypatch.setattr(JobManager, "MAX_FINISHED_JOBS", 2)
+    jobs = JobManager(max_workers=1)
+
+    finished = [jobs.submit("analyze", lambda job: None) for _ in range(3)]
+    for job in finished:
+        job.wait(5)
+    latest = jobs.submit("analyze", lambda job: None)
+    latest.wait(5)
+
+    # 上限を超えた古い完了ジョブから破棄する
+    assert jobs.get(finished[0].id) is None
+    assert jobs.get(finished[2].id) is finished[2]
+    assert jobs.get(latest.id) is latest
+    assert latest.to_dict()['status'] == "succeeded"
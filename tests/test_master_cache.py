@@ -0,0 +1,80 @@
+"""
+MasterDataCache: TTL・ディスク永続化・無効化・事業所ごとの取得ロック
+"""
+import threading
+import time
+
+from core.master_cache import MasterDataCache
+
+
+def test_cached_until_ttl_and_persisted(tmp_path):
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return {1: "現金"}
+
+    cache = MasterDataCache(tmp_path)
+    assert cache.get(1, "account_items", loader) == {1: "現金"}
+    assert cache.get(1, "account_items", loader) == {1: "現金"}
+    # 再起動後もファイルから読む（キーは int のまま復元される）
+    assert MasterDataCache(tmp_path).get(1, "account_items", loader) == {1: "現金"}
+    assert len(calls) == 1
+
+    expired = MasterDataCache(tmp_path, ttl=0)
+    expired.get(1, "account_items", loader)
+    assert len(calls) == 2
+
+
+def test_invalidate_drops_masters_and_derived_values(tmp_path):
+    cache = MasterDataCache(tmp_path)
+    cache.get(1, "account_items", lambda: {1: "現金"})
+    built = []
+    cache.derived(1, "account_index", lambda: built.append(1) or "index")
+    cache.derived(1, "account_index", lambda: built.append(1) or "index")
+    assert built == [1]
+
+    cache.invalidate(1)
+
+    assert cache.get(1, "account_items", lambda: {2: "預金"}) == {2: "預金"}
+    cache.derived(1, "account_index", lambda: built.append(1) or "index")
+    assert built == [1, 1]
+
+
+def test_slow_fetch_does_not_block_other_companies(tmp_path):
+    cache = MasterDataCache(tmp_path)
+    cache.get(2, "account_items", lambda: {1: "現金"})
+    started, release = threading.Event(), threading.Event()
+
+    def slow_loader():
+        started.set()
+        release.wait(5)
+        return {1: "売上高"}
+
+    worker = threading.Thread(target=cache.get, args=(1, "account_items", slow_loader))
+    worker.start()
+    started.wait(5)
+    try:
+        begin = time.monotonic()
+        assert cache.get(2, "account_items", lambda: {}) == {1: "現金"}
+        assert time.monotonic() - begin < 1
+    finally:
+        release.set()
+        worker.join()
+
+
+def test_concurrent_misses_load_once(tmp_path):
+    cache = MasterDataCache(tmp_path)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return {1: "現金"}
+
+    threads = [threading.Thread(target=cache.get, args=(1, "tax_codes", loader)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
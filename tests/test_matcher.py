@@ -0,0 +1,36 @@
+"""
+KeywordMatcher: 摘要キーワードの一括照合
+"""
+from core.checks.matcher import NO_HITS, KeywordMatcher, get_matcher
+
+FAMILIES = [
+    ("relative", ["親族", "妻", "親"]),
+    ("private", ["私用", "家族旅行", "amazon"]),
+]
+
+
+def test_hits_each_family_with_its_highest_priority_keyword():
+    matcher = KeywordMatcher(FAMILIES)
+
+    assert matcher.match("親族 家族旅行") == {"relative": "親族", "private": "家族旅行"}
+    # 長いキーワードの中の短いキーワード（親族の「親」）も取りこぼさない
+    assert matcher.match("父親") == {"relative": "親"}
+    assert matcher.match("妻と私用") == {"relative": "妻", "private": "私用"}
+
+
+def test_matching_is_case_insensitive_and_misses_share_one_result():
+    matcher = KeywordMatcher(FAMILIES)
+
+    assert matcher.match("Amazon 購入") == {"private": "amazon"}
+    assert matcher.match("文房具") is NO_HITS
+    assert matcher.match("") is NO_HITS
+    assert KeywordMatcher([]).match("親族") is NO_HITS
+
+
+def test_results_are_cached_per_description_and_matchers_per_families():
+    matcher = get_matcher(FAMILIES)
+
+    assert get_matcher([(name, tuple(kws)) for name, kws in FAMILIES]) is matcher
+    first = matcher.match("妻 給与")
+    assert matcher.match("妻 給与") is first
+    assert matcher.match.cache_info().hits >= 1
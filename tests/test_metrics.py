@@ -0,0 +1,71 @@
+"""
+監査の計測: チェック単位の計測値と Prometheus 形式の出力
+"""
+import time
+
+from benchmarks.synthetic import ACCOUNT_MAP, TAX_MAP, generate_deals
+from core.export import issue_to_dict
+from core.metrics import AuditMetrics, CheckStats
+from core.tax_inspector import TaxInspector
+
+
+def inspect(deals, **kwargs):
+    return TaxInspector(ACCOUNT_MAP, TAX_MAP).inspect_all(deals, fiscal_year_start="2024-04-01", **kwargs)
+
+
+def test_metrics_do_not_change_results_and_count_routed_details():
+    deals = list(generate_deals(2000, seed=3))
+
+    plain = inspect(deals)
+    measured = inspect(deals, metrics=True)
+
+    assert list(map(issue_to_dict, measured.issues)) == list(map(issue_to_dict, plain.issues))
+    checks = measured.details['metrics']['checks']
+    details = sum(len(d['details']) for d in deals)
+    # 全科目・全取引種別を受け取るチェックは全明細、科目を絞るチェックはその一部
+    assert checks['20']['items'] == details
+    assert 0 < checks['11']['items'] < details
+    assert checks['11']['entries'] == checks['11']['items']
+    assert sum(c['issues'] for c in checks.values()) == len(measured.issues)
+    assert measured.details['metrics']['total_deals'] == len(deals)
+
+
+def test_audit_metrics_accumulates_and_renders():
+    registry = AuditMetrics()
+    metrics = inspect(list(generate_deals(500, seed=1)), metrics=True).details['metrics']
+
+    registry.observe(metrics)
+    registry.observe(metrics)
+    text = registry.render()
+
+    assert "keiri_audits_total 2" in text
+    items = 2 * metrics['checks']['15']['items']
+    assert f'keiri_check_items_total{{check="15",name="税区分エラー"}} {items}' in text
+
+
+def test_slow_visit_is_charged_to_its_own_check(monkeypatch):
+    from core.checks import PoorRecordsCheck
+
+    visit = PoorRecordsCheck.visit
+    monkeypatch.setattr(PoorRecordsCheck, "visit", lambda self, ctx: time.sleep(0.001) or visit(self, ctx))
+    deals = list(generate_deals(300, seed=2))
+
+    checks = inspect(deals, metrics=True).details['metrics']['checks']
+
+    # 抜き取りで計った visit() を走査件数に換算する（全明細で 1ms ずつ寝る分）
+    slow = checks['20']
+    assert slow['visit_seconds'] > 0.5 * slow['items'] * 0.001
+    assert slow['seconds'] >= slow['visit_seconds']
+    assert max(checks.values(), key=lambda c: c['visit_seconds']) is slow
+
+
+def test_every_visit_can_be_timed(monkeypatch):
+    monkeypatch.setattr(CheckStats, "VISIT_SAMPLE_EVERY", 1)
+    deals = list(generate_deals(200, seed=4))
+
+    plain = inspect(deals)
+    measured = inspect(deals, metrics=True)
+
+    assert list(map(issue_to_dict, measured.issues)) == list(map(issue_to_dict, plain.issues))
+    checks = measured.details['metrics']['checks']
+    assert all(c['visit_seconds'] > 0 for c in checks.values() if c['items'])
@@ -0,0 +1,84 @@
+"""
+Reconciler: 入金と売上の1対1の突合（許容日数・対応数の最大化）と売上計上漏れチェックへの反映
+"""
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from core.reconciler import LedgerEntry, Reconciler
+from core.tax_inspector import TaxInspector
+
+
+def deposit(day, amount, description="振込"):
+    return {'date': day, 'amount': amount, 'type': 'income', 'description': description}
+
+
+def test_each_sale_matches_at_most_one_deposit_within_the_window():
+    sales = [LedgerEntry("2024-04-10", 1000, 1), LedgerEntry("2024-04-20", 5000, 2)]
+    deposits = [deposit("2024-04-12", 1000), deposit("2024-04-12", 1000),  # 2件目は対応する売上なし
+                deposit("2024-04-24", 5000),                               # 4日後は範囲外
+                {'date': "2024-04-10", 'amount': 1000, 'type': 'expense'}]  # 出金は対象外
+
+    result = Reconciler(window_days=3).reconcile(deposits, sales)
+
+    assert [(m.sale.ref, m.day_diff) for m in result.matches] == [(1, 2)]
+    assert [(d.date, d.amount) for d in result.unmatched_deposits] == [("2024-04-12", 1000),
+                                                                      ("2024-04-24", 5000)]
+    assert [s.ref for s in result.unmatched_sales] == [2]
+    assert result.to_dict()['unmatched_deposit_total'] == 6000
+
+
+def max_matching(deposits, sales, window):
+    """総当たり（増加路）で求めた最大対応数"""
+    def ordinal(value):
+        return date.fromisoformat(value).toordinal()
+
+    owner = {}
+
+    def assign(i, seen):
+        for j, sale in enumerate(sales):
+            if (j not in seen and sale.amount == deposits[i]['amount']
+                    and abs(ordinal(deposits[i]['date']) - ordinal(sale.date)) <= window):
+                seen.add(j)
+                if j not in owner or assign(owner[j], seen):
+                    owner[j] = i
+                    return True
+        return False
+
+    return sum(assign(i, set()) for i in range(len(deposits)))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_greedy_matching_is_maximal(seed):
+    r = random.Random(seed)
+    start = date(2024, 4, 1)
+
+    def day():
+        return (start + timedelta(days=r.randint(0, 15))).isoformat()
+
+    sales = [LedgerEntry(day(), r.choice([1000, 2000]), i) for i in range(r.randint(0, 12))]
+    deposits = [deposit(day(), r.choice([1000, 2000])) for _ in range(r.randint(0, 12))]
+
+    result = Reconciler(window_days=2).reconcile(deposits, sales)
+
+    assert len(result.matches) == max_matching(deposits, sales, 2)
+    assert len(result.matches) + len(result.unmatched_deposits) == len(deposits)
+    assert len({id(m.sale) for m in result.matches}) == len(result.matches)
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_unmatched_deposits_are_reported_as_sales_omissions(columnar):
+    deals = [{'id': 1, 'issue_date': "2024-05-01", 'type': 'income', 'amount': 30000,
+              'details': [{'account_item_id': 2, 'tax_code': 21, 'amount': 10000},
+                          {'account_item_id': 2, 'tax_code': 21, 'amount': 20000}]}]
+    bank_data = {'transactions': [deposit("2024-05-02", 30000), deposit("2024-05-03", 77000, "カ)ヤマダ")]}
+
+    result = TaxInspector({2: "売上高"}).inspect_all(deals, bank_data=bank_data, columnar=columnar, checks="01")
+
+    # 売上は取引単位（明細の合計）で突合する
+    assert result.details['01_sales']['reconciliation']['matched'] == 1
+    assert result.details['01_unmatched_deposits'] == [
+        {'date': "2024-05-03", 'amount': 77000, 'description': "カ)ヤマダ"}]
+    assert [i.title for i in result.issues] == ["売上に対応しない銀行入金"]
+    assert result.issues[0].amount == 77000
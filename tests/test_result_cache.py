@@ -0,0 +1,114 @@
+"""
+ResultCache: 入力が変われば鍵が変わること・結果の復元・LRUでの追い出し
+"""
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from core import result_cache
+from core.deal_store import DealStore
+from core.export import issue_to_dict
+from core.result_cache import ResultCache
+from core.tax_inspector import TaxInspector
+from helpers import FakeFreeeClient, make_deal
+
+DEALS = [
+    {'id': 1, 'issue_date': "2024-05-10", 'type': "expense", 'amount': 50000,
+     'details': [{'account_item_id': 1, 'tax_code': 21, 'amount': 50000}]},
+    {'id': 2, 'issue_date': "2024-06-10", 'type': "income", 'amount': 8000,
+     'details': [{'account_item_id': 2, 'tax_code': 21, 'amount': 8000}]},
+]
+
+
+@pytest.fixture
+def inspected():
+    return TaxInspector({1: "消耗品費", 2: "売上高"}).inspect_all(DEALS, fiscal_year_start="2024-04-01")
+
+
+def test_result_round_trips_through_disk(tmp_path, inspected):
+    cache = ResultCache(tmp_path)
+    key = cache.make_key(company_id=1)
+    assert cache.get(key) is None
+
+    cache.put(key, inspected)
+    restored = ResultCache(tmp_path).get(key)
+
+    assert [issue_to_dict(i) for i in restored.issues] == [issue_to_dict(i) for i in inspected.issues]
+    assert (restored.errors, restored.warnings) == (inspected.errors, inspected.warnings)
+    assert restored.details['total_deals'] == 2
+
+
+def test_corrupted_entry_is_dropped(tmp_path, inspected):
+    cache = ResultCache(tmp_path)
+    key = cache.make_key(company_id=1)
+    cache.put(key, inspected)
+    (tmp_path / f"{key}.json").write_text("{", encoding="utf-8")
+
+    assert cache.get(key) is None
+    assert not (tmp_path / f"{key}.json").exists()
+
+
+def test_key_changes_with_every_input():
+    base = dict(company_id=1, start_date="2024-04-01", end_date="2025-03-31", period_boundary="2025-04-01",
+                deals="abc", masters=[{1: "消耗品費"}, {21: "課税売上10%"}], bank_files=[], rules="v1")
+    key = ResultCache.make_key(**base)
+
+    assert ResultCache.make_key(**dict(reversed(list(base.items())))) == key
+    for name, value in [("company_id", 2), ("end_date", "2025-02-28"), ("period_boundary", None),
+                        ("deals", "abd"), ("masters", [{1: "事務用品費"}, {21: "課税売上10%"}]),
+                        ("bank_files", [["rakuten.csv", 1]]), ("rules", "v2")]:
+        assert ResultCache.make_key(**dict(base, **{name: value})) != key, name
+
+
+def test_deal_checksum_follows_changes_in_the_period(tmp_path):
+    store = DealStore(tmp_path / "deals.sqlite3")
+    client = FakeFreeeClient(deals=[make_deal(1, "2024-05-01"), make_deal(2, "2024-06-01")])
+    store.sync(client)
+    before = store.checksum(1, "2024-04-01", "2025-03-31")
+
+    store.save_deals(1, [make_deal(3, "2023-06-01")])  # 期間外
+    assert store.checksum(1, "2024-04-01", "2025-03-31") == before
+
+    store.save_deals(1, [make_deal(2, "2024-06-01", details=[{'account_item_id': 1, 'tax_code': 21, 'amount': 5}])])
+    updated = store.checksum(1, "2024-04-01", "2025-03-31")
+    assert updated != before
+
+    del client.deals[1]
+    store.sync(client, full=True)
+    assert store.checksum(1, "2024-04-01", "2025-03-31") not in (before, updated)
+
+
+@pytest.mark.parametrize("source", ["checks/sales.py", "ledger.py", "incremental.py"])
+def test_rules_version_follows_result_sources(tmp_path, monkeypatch, source):
+    core_dir = Path(result_cache.__file__).resolve().parent
+    copy = tmp_path / "core"
+    shutil.copytree(core_dir, copy, ignore=shutil.ignore_patterns("__pycache__"))
+    monkeypatch.setattr(result_cache, "__file__", str(copy / "result_cache.py"))
+    version = result_cache.rules_version.__wrapped__
+
+    before = version()
+    assert before == result_cache.rules_version()
+    (copy / source).write_text("# 変更\n", encoding="utf-8")
+    assert version() != before
+
+    # 結果に関わらないモジュールは版を変えない
+    (copy / source).write_bytes((core_dir / source).read_bytes())
+    (copy / "export.py").write_text("# 変更\n", encoding="utf-8")
+    assert version() == before
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path, inspected):
+    cache = ResultCache(tmp_path, max_entries=2)
+    first, second, third = (cache.make_key(company_id=i) for i in range(3))
+    cache.put(first, inspected)
+    cache.put(second, inspected)
+    os.utime(tmp_path / f"{first}.json", (1000, 1000))
+    os.utime(tmp_path / f"{second}.json", (2000, 2000))
+
+    assert cache.get(first) is not None  # 使われた時刻が更新される
+    cache.put(third, inspected)
+
+    assert cache.get(second) is None
+    assert cache.get(first) is not None and cache.get(third) is not None
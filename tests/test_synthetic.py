@@ -0,0 +1,31 @@
+"""
+ベンチマーク用の合成データ: 税区分の体系と誤りの割合
+"""
+from benchmarks.synthetic import ACCOUNT_MAP, TAX_MAP, generate_deals
+from core.tax_inspector import TaxInspector
+
+
+def expense_details(deals):
+    return [d for deal in deals if deal['type'] == 'expense' for d in deal['details']]
+
+
+def test_tax_codes_follow_the_inspector():
+    assert TAX_MAP == TaxInspector.TAX_CODES
+    deals = list(generate_deals(5000, seed=2, tax_error_rate=0))
+
+    result = TaxInspector(ACCOUNT_MAP, TAX_MAP).inspect_all(deals, fiscal_year_start="2024-04-01")
+
+    # 誤りを混ぜなければ税区分のチェック（15・16）は反応しない
+    assert result.details['15_tax_code'] == 0
+    assert result.details['16_reduced_tax'] == []
+    assert not any(d['tax_code'] == 21 for d in expense_details(deals))
+
+
+def test_tax_error_rate_controls_wrong_codes():
+    details = expense_details(generate_deals(20000, seed=2, tax_error_rate=0.05))
+    taxable = [d for d in details if d['tax_code'] in (136, 21) or
+               (d['tax_code'] == 138 and ACCOUNT_MAP[d['account_item_id']] != "仕入高")]
+    wrong = [d for d in taxable if d['tax_code'] != 136]
+
+    assert 0.03 < len(wrong) / len(taxable) < 0.07
+    assert list(generate_deals(100, seed=4)) == list(generate_deals(100, seed=4))
@@ -0,0 +1,87 @@
+"""
+TaxCodeFixer: 税区分の一括修正（取引ごとに1回の取得・更新）
+"""
+import threading
+
+from core.freee_client import Deal, FreeeClient
+from core.tax_fixer import TaxCodeFixer
+
+
+class Response:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self._body = body
+
+    def json(self):
+        return self._body
+
+
+class FixClient:
+    """取得・更新だけを再現する freee クライアント"""
+
+    company_id = 1
+    parse_deal = staticmethod(FreeeClient.parse_deal)
+
+    def __init__(self, deals):
+        self.deals = deals
+        self.gets, self.puts = [], []
+        self.lock = threading.Lock()
+
+    def get_deal(self, deal_id):
+        with self.lock:
+            self.gets.append(deal_id)
+        return self.deals.get(deal_id)
+
+    def request(self, method, path, json=None):
+        deal_id = int(path.rsplit("/", 1)[1])
+        with self.lock:
+            self.puts.append((deal_id, [d['tax_code'] for d in json['details']]))
+        if deal_id == 3:
+            return Response(400, {'errors': [{'messages': ["更新できません"]}]})
+        return Response(200, {'deal': {'id': deal_id, 'issue_date': "2024-04-01", 'type': "expense",
+                                       'details': json['details']}})
+
+
+def deal(deal_id, *tax_codes):
+    details = [{'account_item_id': 1, 'tax_code': code, 'amount': 100} for code in tax_codes]
+    return Deal(deal_id, "2024-04-01", "expense", 100 * len(tax_codes), details, [])
+
+
+def test_fixes_are_grouped_per_deal_and_applied_in_order():
+    client = FixClient({1: deal(1, 21, 138, 21), 2: deal(2, 21), 3: deal(3, 21)})
+    fixes = [
+        {'deal_id': 1, 'old_tax_code': 21, 'new_tax_code': 136},
+        {'deal_id': 2, 'old_tax_code': 21, 'new_tax_code': 136},
+        {'deal_id': 1, 'old_tax_code': 138, 'new_tax_code': 21},
+        {'deal_id': 3, 'old_tax_code': 21, 'new_tax_code': 136},
+        {'deal_id': 9, 'old_tax_code': 21, 'new_tax_code': 136},
+    ]
+
+    outcomes = {o['deal_id']: o for o in TaxCodeFixer(client, max_workers=3).run(fixes)}
+
+    assert sorted(client.gets) == [1, 2, 3, 9]
+    # 取引1は2つの指示を順に適用して1回だけ更新する
+    assert sorted(client.puts) == [(1, [136, 21, 136]), (2, [136]), (3, [136])]
+    assert [r['success'] for r in outcomes[1]['results']] == [True, True]
+    assert outcomes[1]['deal'].details[1]['tax_code'] == 21
+    assert outcomes[3]['results'][0] == {'deal_id': 3, 'success': False, 'error': "['更新できません']"}
+    assert outcomes[9]['results'][0]['error'] == '取引が見つかりません'
+    assert outcomes[9]['deal'] is None
+
+
+def test_group_keeps_first_seen_order():
+    grouped = TaxCodeFixer.group([{'deal_id': 2}, {'deal_id': 1}, {'deal_id': 2, 'x': 1}])
+
+    assert list(grouped) == [2, 1]
+    assert grouped[2] == [{'deal_id': 2}, {'deal_id': 2, 'x': 1}]
+
+
+def test_abandoned_run_cancels_unstarted_deals():
+    client = FixClient({i: deal(i, 21) for i in range(1, 21)})
+    fixes = [{'deal_id': i, 'old_tax_code': 21, 'new_tax_code': 136} for i in range(1, 21)]
+
+    outcomes = TaxCodeFixer(client, max_workers=1).run(fixes)
+    next(outcomes)
+    outcomes.close()
+
+    assert len(client.gets) < 20
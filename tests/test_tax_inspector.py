@@ -0,0 +1,135 @@
+"""
+TaxInspector: 単一パスの検査・勘定科目の分類・列指向モード・チェックの並列集計
+"""
+import time
+
+import pytest
+
+from core.export import issue_to_dict
+from core.tax_inspector import AccountCategory, TaxInspector
+
+ACCOUNTS = {1: "消耗品費", 2: "売上高", 3: "接待交際費", 4: "役員貸付金", 5: "役員報酬"}
+
+
+def deal(deal_id, issue_date, deal_type, account_id, amount, tax_code=136, description=""):
+    return {
+        'id': deal_id, 'issue_date': issue_date, 'type': deal_type, 'amount': amount,
+        'details': [{'account_item_id': account_id, 'tax_code': tax_code, 'amount': amount,
+                     'description': description}],
+    }
+
+
+CRAFTED = [
+    deal(1, "2024-05-10", "expense", 1, 50000, tax_code=21),
+    deal(2, "2024-06-10", "expense", 3, 9000000, description="ゴルフ接待"),
+    deal(3, "2024-07-10", "expense", 4, 1000000, tax_code=0, description="社長 貸付"),
+    deal(4, "2024-08-10", "income", 2, 500000, tax_code=21, description="売上"),
+    deal(5, "2024-05-25", "expense", 5, 300000, tax_code=0),
+]
+
+
+def snapshot(result):
+    details = {k: v for k, v in result.details.items() if k != 'inspection_date'}
+    return [issue_to_dict(i) for i in result.issues], result.errors, result.warnings, details
+
+
+def categories(result):
+    return [issue.category.split(".")[0] for issue in result.issues]
+
+
+def test_crafted_deals_trigger_expected_checks():
+    result = TaxInspector(ACCOUNTS).inspect_all(CRAFTED, fiscal_year_start="2024-04-01")
+
+    found = categories(result)
+    for code in ("09", "11", "13", "15", "17"):
+        assert code in found
+    # チェック順に並ぶ
+    assert found == sorted(found)
+    assert result.details['total_deals'] == len(CRAFTED)
+    assert result.details['15_tax_code'] == 1
+
+
+def test_deals_are_read_in_a_single_pass():
+    reads = []
+
+    def once():
+        for d in CRAFTED:
+            reads.append(d['id'])
+            yield d
+
+    streamed = TaxInspector(ACCOUNTS).inspect_all(once(), fiscal_year_start="2024-04-01")
+    listed = TaxInspector(ACCOUNTS).inspect_all(CRAFTED, fiscal_year_start="2024-04-01")
+
+    assert reads == [d['id'] for d in CRAFTED]
+    assert [issue_to_dict(i) for i in streamed.issues] == [issue_to_dict(i) for i in listed.issues]
+
+
+def test_inspector_can_be_reused_between_audits():
+    inspector = TaxInspector(ACCOUNTS)
+    first = inspector.inspect_all(CRAFTED, fiscal_year_start="2024-04-01")
+    second = inspector.inspect_all(CRAFTED, fiscal_year_start="2024-04-01")
+
+    assert [issue_to_dict(i) for i in first.issues] == [issue_to_dict(i) for i in second.issues]
+    assert inspector.inspect_all([]).issues == []
+
+
+def test_account_names_are_classified_into_category_bits():
+    classify = TaxInspector.classify_account
+
+    # 1科目が複数の分類に該当する（「報酬」は源泉対象にもあたる）
+    assert classify("役員報酬") == (AccountCategory.PERSONNEL | AccountCategory.WITHHOLDING
+                                    | AccountCategory.OFFICER_COMPENSATION)
+    assert classify("仕入高") == (AccountCategory.PURCHASE | AccountCategory.FOOD)
+    assert classify("接待交際費") == AccountCategory.ENTERTAINMENT
+    assert classify("消耗品費") == 0
+
+
+def test_account_index_is_shared_and_filled_for_unknown_ids():
+    index = TaxInspector.build_account_index(ACCOUNTS)
+    inspector = TaxInspector(ACCOUNTS, account_index=index)
+
+    assert index[4] == ("役員貸付金", AccountCategory.OFFICER_LOAN)
+    inspector.inspect_all([deal(9, "2024-05-01", "expense", 99, 1000)])
+    # マスタにない科目はIDを名称として分類し、インデックスに追加する
+    assert index[99] == ("99", 0)
+    assert TaxInspector(ACCOUNTS, account_index=index).account_index is index
+
+
+def test_columnar_mode_matches_single_pass():
+    from benchmarks.synthetic import ACCOUNT_MAP, TAX_MAP, generate_deals
+    from core.ledger import ColumnarLedger
+
+    deals = list(generate_deals(4000, seed=9, tax_error_rate=0.05)) + CRAFTED
+    accounts = {**ACCOUNT_MAP, **ACCOUNTS}
+    inspector = TaxInspector(accounts, TAX_MAP)
+
+    scan = snapshot(inspector.inspect_all(deals, period_boundary="2024-10-01"))
+    columnar = snapshot(inspector.inspect_all(deals, period_boundary="2024-10-01", columnar=True))
+    ledger = ColumnarLedger.from_deals(deals, inspector)
+    prebuilt = snapshot(inspector.inspect_all(ledger, period_boundary="2024-10-01"))
+
+    assert columnar == scan
+    assert prebuilt == scan
+    assert len(ledger) == sum(len(d['details']) for d in deals)
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_parallel_checks_merge_in_check_order(columnar, monkeypatch):
+    from benchmarks.synthetic import ACCOUNT_MAP, TAX_MAP, generate_deals
+    from core.checks import SalesOmissionCheck
+
+    deals = list(generate_deals(2000, seed=5, tax_error_rate=0.05)) + CRAFTED
+    inspector = TaxInspector({**ACCOUNT_MAP, **ACCOUNTS}, TAX_MAP)
+    codes = []
+    serial = snapshot(inspector.inspect_all(deals, period_boundary="2024-10-01", columnar=columnar,
+                                            on_check=lambda code, n, total: codes.append(code)))
+
+    # 先頭のチェックを遅らせ、完了順がチェック順と食い違うようにする
+    finish = SalesOmissionCheck.finish
+    monkeypatch.setattr(SalesOmissionCheck, "finish", lambda self, *a: time.sleep(0.05) or finish(self, *a))
+    done = []
+    parallel = inspector.inspect_all(deals, period_boundary="2024-10-01", columnar=columnar, parallel=4,
+                                     on_check=lambda code, n, total: done.append(code))
+
+    assert snapshot(parallel) == serial
+    assert done[-1] == "01" and sorted(done) == codes